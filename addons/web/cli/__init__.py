@@ -1 +1,2 @@
 import test_js
+import build_assets
@@ -0,0 +1,86 @@
+import logging
+import optparse
+import os
+import sys
+
+import simplejson
+
+import openerp
+from openerp import http
+from openerp.addons.web.controllers import main
+
+_logger = logging.getLogger(__name__)
+
+class BuildAssets(openerp.cli.Command):
+    """ Prebuilds the js, css and qweb bundles (and their compressed
+    variants) of the web client for each database, so that the bundle
+    routes serve them from the bundle directory right after a restart::
+
+        openerp-server build-assets -d db1,db2 --bundle-dir=/path/to/bundles
+
+    The bundles are built in the parts requested by the pages (see
+    ``main.manifest_list``): the base modules, shared by the databases,
+    then the other modules of each database. A manifest mapping each
+    database and bundle type to the modules and checksum of each part is
+    written next to the bundle directory (in ``<bundle dir>.manifest.json``
+    by default), as the server evicts the files of the directory itself.
+    """
+    def run(self, args):
+        self.parser = parser = optparse.OptionParser()
+        parser.add_option("--bundle-dir", dest="bundle_dir", default=False,
+                          help="directory to write the bundles to, defaults to the web_bundle_dir option")
+        parser.add_option("--manifest", dest="manifest", default=False,
+                          help="file to write the manifest to, defaults to <bundle dir>.manifest.json")
+        # all other arguments are server options, among which -d/--database:
+        # a comma separated list of databases, defaults to all databases
+        own = ('--bundle-dir=', '--manifest=')
+        opt, _ = parser.parse_args([a for a in args if a.startswith(own)])
+
+        config = openerp.tools.config
+        config.parse_config([a for a in args if not a.startswith(own)])
+        openerp.netsvc.init_alternative_logger()
+        # loads the web addons, hence http.addons_manifest
+        openerp.service.server.load_server_wide_modules()
+
+        bundle_dir = opt.bundle_dir or config.get('web_bundle_dir') or main.bundle_path()
+        # nothing is kept in memory, bundles are only written to disk
+        cache = main.BundleCache(bundle_dir, max_bytes=0)
+        dbs = config['db_name'].split(',') if config['db_name'] else http.db_list(True)
+        if not dbs:
+            _logger.error("No database to build the bundles of")
+            sys.exit(1)
+
+        if not os.path.isdir(bundle_dir):
+            os.makedirs(bundle_dir, 0700)
+        manifest = self.build(cache, dbs)
+        with open(opt.manifest or bundle_dir.rstrip(os.sep) + '.manifest.json', 'wb') as fp:
+            simplejson.dump(manifest, fp, indent=4, sort_keys=True)
+
+    def build(self, cache, dbs):
+        """ Builds the bundles of ``dbs`` into ``cache``, along with the
+        fragments they are built from
+
+        :returns: ``{db: {extension: [{mods, checksum}]}}``
+        :rtype: dict
+        """
+        manifest = {}
+        for db in dbs:
+            manifest[db] = {}
+            for extension in main.BUNDLE_MIMETYPES:
+                manifest[db][extension] = []
+                for mods, checksum, files in main.bundle_parts(extension, db=db, cache=cache):
+                    files = [f for f in files if f[0] is not None]
+                    # the base part, shared by the databases, is only built once
+                    main.bundle_content(
+                        '%s.%s' % (checksum, extension),
+                        lambda: main.build_bundle(extension, files, cache=cache),
+                        cache=cache)
+                    manifest[db][extension].append({'mods': mods, 'checksum': checksum})
+                    _logger.info("Built %s bundle %s (%s) of database %s",
+                                 extension, checksum, mods, db)
+        return manifest
+
+# commands are named after their class by default
+openerp.cli.commands['build-assets'] = BuildAssets
+
+# vim:et:ts=4:sw=4:
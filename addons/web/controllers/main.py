@@ -2,9 +2,15 @@
 
 import ast
 import base64
+import bisect
+import codecs
+import collections
 import csv
+import errno
 import functools
+import getpass
 import glob
+import gzip
 import itertools
 import logging
 import operator
@@ -13,10 +19,14 @@ import hashlib
 import os
 import re
 import simplejson
+import stat
+import tempfile
+import threading
 import time
 import urllib
 import urllib2
 import urlparse
+import weakref
 import xmlrpclib
 import zlib
 from xml.etree import ElementTree
@@ -29,6 +39,10 @@ try:
     import xlwt
 except ImportError:
     xlwt = None
+try:
+    import pyinotify
+except ImportError:
+    pyinotify = None
 
 import openerp
 import openerp.modules.registry
@@ -38,6 +52,8 @@ from openerp import http
 
 from openerp.http import request, serialize_exception as _serialize_exception
 
+from . import qweb
+
 _logger = logging.getLogger(__name__)
 
 #----------------------------------------------------------
@@ -88,9 +104,222 @@ def rjsmin(script):
     ).strip()
     return result
 
-db_list = http.db_list
+def _make_jsmin():
+    """ Builds :func:`jsmin`, compiling the patterns of its tokens once """
+    space = r'(?:[\000-\011\013\014\016-\040]|/\*[^*]*\*+(?:[^/*][^*]*\*+)*/)'
+    newline = r'(?:(?://[^\r\n]*)?[\r\n])'
+    run = r'[^\047"/\000-\040]*'
+    strings = (
+        r'(?:\047[^\047\\\r\n]*(?:\\(?:[^\r\n]|\r?\n|\r)[^\047\\\r\n]*)*\047'
+        r'|"[^"\\\r\n]*(?:\\(?:[^\r\n]|\r?\n|\r)[^"\\\r\n]*)*")')
+    charclass = r'(?:\[[^\\\]\r\n]*(?:\\[^\r\n][^\\\]\r\n]*)*\])'
+    regex = r'(?:/(?![\r\n/*])[^/\\\[\r\n]*(?:(?:\\[^\r\n]|%s)[^/\\\[\r\n]*)*/)' % charclass
+
+    match_run = re.compile(r'[^\047"/\000-\040]+').match
+    match_string = re.compile(strings + run).match
+    match_regex = re.compile(r'%s*(%s%s)' % (space, regex, run)).match
+    match_gap = re.compile(r'(%s*)((?:%s%s*)*)' % (space, newline, space)).match
+
+    def chars(test):
+        return frozenset(chr(c) for c in xrange(256) if test(chr(c)))
+    # non-ascii characters are considered part of identifiers
+    id_literal = chars(lambda c: c.isalnum() and c < '\177' or c in '_$' or c >= '\177')
+    id_literal_open = id_literal | frozenset('{[(!+-')
+    id_literal_close = id_literal | frozenset('}])"\047+-')
+    not_id_literal = chars(lambda c: c < '\177') - id_literal
+    preregex = frozenset('(,=:[!&|?{};\r\n')
+    quotes = frozenset('\047"')
+    special = chars(lambda c: c <= ' ') | quotes | frozenset('/')
+
+    def jsmin(script, positions=None):
+        """ Minify js with a single-pass tokenizer.
+
+        Produces the same output as :func:`rjsmin`, but walks the script
+        once, token by token (identifier and punctuation runs, strings,
+        regular expression literals, whitespace and comments), each token
+        being matched by an unambiguous pattern instead of trying the
+        alternatives of a single regex at each position.
+
+        :param list positions: if provided, filled with an
+                               ``(output offset, script offset)`` pair for
+                               each token of the output
+        """
+        s = '\n%s\n' % script
+        out = []
+        append = out.append
+        track = positions is not None
+        i, end = 0, len(s)
+        while i < end:
+            c = s[i]
+            if c not in special:
+                m = match_run(s, i)
+                append(m.group())
+                if track:
+                    positions.append((len(out) - 1, i - 1))
+                i = m.end()
+                continue
+            if c in quotes:
+                m = match_string(s, i)
+                if m:
+                    append(m.group())
+                    i = m.end()
+                else:
+                    # unterminated string, kept as-is
+                    append(c)
+                    i += 1
+                if track:
+                    positions.append((len(out) - 1, m.start() - 1 if m else i - 2))
+                continue
+
+            prev = s[i - 1] if i else ''
+            if c == ' ' and s[i + 1] not in special:
+                # fast path for the most common gap, a single space
+                nxt = s[i + 1]
+                if (prev in id_literal and nxt in id_literal) \
+                        or (prev == nxt == '+') or (prev == nxt == '-'):
+                    append(' ')
+                i += 1
+                continue
+            # regular expression literal, only allowed after an operator
+            # or a return statement
+            if prev in preregex or (
+                    i >= 7 and s[i - 7] in not_id_literal and s[i - 6:i] == 'return'):
+                m = match_regex(s, i)
+                if m:
+                    append(m.group(1))
+                    if track:
+                        positions.append((len(out) - 1, m.start(1) - 1))
+                    i = m.end()
+                    continue
+
+            # whitespace and comments, which may contain newlines
+            m = match_gap(s, i)
+            spaces, gap = m.end(1), m.end()
+            nxt = s[gap:gap + 1]
+            if gap > spaces and prev in id_literal_close and nxt in id_literal_open:
+                append('\n')
+                i = gap
+                continue
+            if spaces > i:
+                nxt = s[spaces:spaces + 1]
+                if (prev in id_literal and nxt in id_literal) \
+                        or (prev == nxt == '+') or (prev == nxt == '-'):
+                    append(' ')
+                i = spaces
+            elif gap > i:
+                i = gap
+            else:
+                # lone slash (division) or control character
+                append(c)
+                if track:
+                    positions.append((len(out) - 1, i - 1))
+                i += 1
+        result = ''.join(out)
+        if track:
+            # turn indexes of tokens into offsets in the (stripped) output
+            offsets = [len(result.lstrip()) - len(result)]
+            for piece in out:
+                offsets.append(offsets[-1] + len(piece))
+            positions[:] = [(offsets[index], pos) for index, pos in positions
+                            if offsets[index] >= 0]
+        return result.strip()
+    return jsmin
+
+jsmin = _make_jsmin()
+
+#: available js minification engines, selected by the web_js_minifier option
+JS_MINIFIERS = {
+    'rjsmin': rjsmin,
+    'tokenizer': jsmin,
+}
+
+class DatabaseListCache(object):
+    """ Cache of the lists of databases, which are read from the postgres
+    catalog, expiring after ``ttl`` seconds.
+
+    Lists are kept per ``force`` flag and per dbfilter, resolved for the
+    HTTP host of the request (which the client chooses, so at most
+    ``max_entries`` lists are kept and expired ones are dropped). The
+    ``Database`` controller invalidates the cache when it creates or
+    removes databases, changes made by other means (or other processes)
+    are seen once the entries expire.
+
+    :param float ttl: lifetime of the entries in seconds, 0 disables the cache
+    :param int max_entries: maximum number of lists kept
+    """
+    def __init__(self, ttl=0, max_entries=64):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def db_filter(self, httprequest):
+        """ The server's dbfilter for the HTTP host of ``httprequest``, as
+        :func:`openerp.http.db_filter` resolves it
+        """
+        host = httprequest.environ.get('HTTP_HOST', '').split(':')[0]
+        domain = host.split('.')[0]
+        return (config.get('dbfilter') or '.*').replace('%h', host).replace('%d', domain)
+
+    def get(self, force=False, httprequest=None):
+        httprequest = httprequest or request.httprequest
+        key = (bool(force), self.db_filter(httprequest))
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] < self.ttl:
+                self.hits += 1
+                return list(entry[1])
+            self.misses += 1
+        dbs = http.db_list(force, httprequest)
+        if self.ttl:
+            with self._lock:
+                for stale in [k for k, e in self._entries.iteritems() if now - e[0] >= self.ttl]:
+                    del self._entries[stale]
+                while len(self._entries) >= self.max_entries:
+                    oldest = min(self._entries, key=lambda k: self._entries[k][0])
+                    del self._entries[oldest]
+                self._entries[key] = (now, dbs)
+        _logger.debug("Database list cache miss, hit rate %.1f%%",
+                      100 * self.stats()['hit_rate'])
+        return list(dbs)
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': float(self.hits) / lookups if lookups else 0.0,
+            }
+
+db_list_cache = DatabaseListCache(float(config.get('web_db_list_ttl') or 60))
 
-db_monodb = http.db_monodb
+def db_list(force=False, httprequest=None):
+    """ Cached :func:`openerp.http.db_list` """
+    return db_list_cache.get(force, httprequest)
+
+def db_monodb(httprequest=None):
+    """ :func:`openerp.http.db_monodb` on top of the cached database list
+    """
+    httprequest = httprequest or request.httprequest
+    dbs = db_list(True, httprequest)
+    # try the db already in the session
+    db_session = httprequest.session.db
+    if db_session in dbs:
+        return db_session
+    # if dbfilters was specified when launching the server and there is
+    # only one possible db, we take that one
+    if config['dbfilter'] != ".*" and len(dbs) == 1:
+        return dbs[0]
+    return None
 
 def serialize_exception(f):
     @functools.wraps(f)
@@ -160,46 +389,105 @@ def module_topological_sort(modules):
     return L
 
 def module_installed():
-    # Candidates module the current heuristic is the /static dir
-    loadable = http.addons_manifest.keys()
-    modules = {}
+    """ Sorted list of the web modules installed in the session's database,
+    see :class:`ModuleGraphCache`. Errors reading the database are raised:
+    unlike the pages, the session routes can report them to the client.
+    """
+    return module_graph_cache.get(request.session.db)
+
+def module_graph(cr, registry, loadable):
+    """ Reads the dependencies of the installed web modules
+
+    Runs a fixed number of queries whatever the number of modules (instead
+    of one read of ``ir.module.module.dependency`` per module)
 
-    # Retrieve database installed modules
+    :param loadable: names of the web modules
+    :returns: {module_name: dependencies}
+    :rtype: dict
+    """
+    Modules = registry.get('ir.module.module')
+    Dependencies = registry.get('ir.module.module.dependency')
     # TODO The following code should move to ir.module.module.list_installed_modules()
-    Modules = request.session.model('ir.module.module')
-    domain = [('state','=','installed'), ('name','in', loadable)]
-    for module in Modules.search_read(domain, ['name', 'dependencies_id']):
-        modules[module['name']] = []
-        deps = module.get('dependencies_id')
-        if deps:
-            deps_read = request.session.model('ir.module.module.dependency').read(deps, ['name'])
-            dependencies = [i['name'] for i in deps_read]
-            modules[module['name']] = dependencies
-
-    sorted_modules = module_topological_sort(modules)
-    return sorted_modules
+    ids = Modules.search(cr, openerp.SUPERUSER_ID, [('state','=','installed'), ('name','in', list(loadable))])
+    names = dict((module['id'], module['name'])
+                 for module in Modules.read(cr, openerp.SUPERUSER_ID, ids, ['name']))
+    modules = dict((name, []) for name in names.itervalues())
+    dependency_ids = Dependencies.search(cr, openerp.SUPERUSER_ID, [('module_id', 'in', ids)])
+    for dependency in Dependencies.read(cr, openerp.SUPERUSER_ID, dependency_ids, ['name', 'module_id']):
+        modules[names[dependency['module_id'][0]]].append(dependency['name'])
+    return modules
+
+class ModuleGraphCache(object):
+    """ Per database cache of the sorted list of installed web modules
+
+    An entry is valid as long as the database's registry is the one it was
+    computed with: installing, upgrading or removing modules creates a new
+    registry, in this process or, through the registry signaling, in the
+    other ones. It is also computed again if the web modules of the server
+    changed, e.g. when the addons are still being loaded.
+
+    Errors reading the database are raised, and nothing is cached.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        #: {dbname: (weakref to the registry, signaling sequence, web modules, modules)}
+        self._entries = {}
 
-def module_installed_bypass_session(dbname):
-    loadable = http.addons_manifest.keys()
-    modules = {}
-    try:
+    def get(self, dbname):
         registry = openerp.modules.registry.RegistryManager.get(dbname)
+        sequence = getattr(registry, 'base_registry_signaling_sequence', None)
+        loadable = frozenset(http.addons_manifest)
+        with self._lock:
+            entry = self._entries.get(dbname)
+        if entry and entry[0]() is registry and entry[1] == sequence and entry[2] == loadable:
+            return list(entry[3])
+
         with registry.cursor() as cr:
-            m = registry.get('ir.module.module')
-            # TODO The following code should move to ir.module.module.list_installed_modules()
-            domain = [('state','=','installed'), ('name','in', loadable)]
-            ids = m.search(cr, 1, [('state','=','installed'), ('name','in', loadable)])
-            for module in m.read(cr, 1, ids, ['name', 'dependencies_id']):
-                modules[module['name']] = []
-                deps = module.get('dependencies_id')
-                if deps:
-                    deps_read = registry.get('ir.module.module.dependency').read(cr, 1, deps, ['name'])
-                    dependencies = [i['name'] for i in deps_read]
-                    modules[module['name']] = dependencies
-    except Exception,e:
-        pass
-    sorted_modules = module_topological_sort(modules)
-    return sorted_modules
+            modules = module_topological_sort(module_graph(cr, registry, loadable))
+        with self._lock:
+            self._entries[dbname] = (weakref.ref(registry), sequence, loadable, modules)
+        return list(modules)
+
+    def invalidate(self, dbname=None):
+        with self._lock:
+            if dbname is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(dbname, None)
+
+module_graph_cache = ModuleGraphCache()
+
+def module_installed_bypass_session(dbname):
+    """ Sorted list of the web modules installed in ``dbname``, empty if the
+    database can not be read (the result is then not cached)
+    """
+    try:
+        return module_graph_cache.get(dbname)
+    except Exception:
+        _logger.warning("Could not list the modules installed in %s", dbname, exc_info=True)
+        return []
+
+def module_lazy(modules):
+    """ Subset of ``modules`` the web client only loads on demand, e.g. on
+    first use of one of the view types of their ``web_views`` (mapping the
+    view types to their label): those whose manifest sets ``web_preload``
+    to ``False`` and lists ``web_views``,
+    unless a module loaded at startup depends on them. Without ``web_views``
+    nothing would ever load them, they are loaded at startup.
+
+    :param list modules: names of the modules
+    :rtype: set
+    """
+    manifests = dict((m, http.addons_manifest.get(m, {})) for m in modules)
+    lazy = set(m for m in modules
+               if not manifests[m].get('web_preload', True) and manifests[m].get('web_views'))
+    preloaded = [m for m in modules if m not in lazy]
+    while preloaded:
+        for dependency in manifests[preloaded.pop()].get('depends', []):
+            if dependency in lazy:
+                lazy.discard(dependency)
+                preloaded.append(dependency)
+    return lazy
 
 def module_boot(db=None):
     server_wide_modules = openerp.conf.server_wide_modules or ['web']
@@ -213,7 +501,91 @@ def module_boot(db=None):
         dbside = module_installed_bypass_session(monodb)
         dbside = [i for i in dbside if i not in serverside]
     addons = serverside + dbside
-    return addons
+    lazy = module_lazy(addons)
+    return [i for i in addons if i not in lazy]
+
+def translations_bundle(cr, uid, registry, mods, lang):
+    """ Reads the web client's translations of ``mods`` in ``lang`` along
+    with the parameters of the language
+    """
+    res_lang = registry.get('res.lang')
+    ids = res_lang.search(cr, uid, [("code", "=", lang)])
+    lang_params = None
+    if ids:
+        lang_params = res_lang.read(cr, uid, ids[0], ["direction", "date_format", "time_format",
+                                            "grouping", "decimal_point", "thousands_sep"])
+
+    # Regional languages (ll_CC) must inherit/override their parent lang (ll), but this is
+    # done server-side when the language is loaded, so we only need to load the user's lang.
+    ir_translation = registry.get('ir.translation')
+    translations_per_module = {}
+    messages = ir_translation.search_read(cr, uid, [('module','in',mods),('lang','=',lang),
+                                           ('comments','like','openerp-web'),('value','!=',False),
+                                           ('value','!=','')],
+                                          ['module','src','value','lang'], order='module')
+    for mod, msg_group in itertools.groupby(messages, key=operator.itemgetter('module')):
+        translations_per_module.setdefault(mod,{'messages':[]})
+        translations_per_module[mod]['messages'].extend({'id': m['src'],
+                                                         'string': m['value']} \
+                                                            for m in msg_group)
+    return {"modules": translations_per_module,
+            "lang_parameters": lang_params}
+
+class RegistryCache(object):
+    """ Per database cache of payloads read from the models, along with their
+    checksum
+
+    As for :class:`ModuleGraphCache`, an entry is only valid for the registry
+    it was read with. It is also dropped when the registry's cache signaling
+    sequence changes: writing translations, languages, menus or groups clears
+    the models' caches, which is signaled to the other processes.
+
+    :param int max_entries: number of payloads kept, the least recently used
+                            ones are dropped first
+    """
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        #: {(dbname, key): (weakref to the registry, signaling sequence,
+        #:                  checksum, payload)}
+        self._entries = collections.OrderedDict()
+
+    def get(self, registry, key, build):
+        """ Returns the checksum and the payload stored under ``key``, calling
+        ``build()`` to read the payload if it is missing or outdated
+
+        :param key: hashable identifier of the payload in the database
+        :rtype: (str, object)
+        """
+        key = (registry.db_name, key)
+        sequence = getattr(registry, 'base_cache_signaling_sequence', None)
+        # caches cleared by the current transaction are not signaled yet
+        cleared = getattr(registry, '_any_cache_cleared', False)
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry and not cleared and entry[0]() is registry and entry[1] == sequence:
+                self._entries[key] = entry
+                return entry[2], entry[3]
+
+        payload = build()
+        checksum = hashlib.sha1(simplejson.dumps(payload, sort_keys=True)).hexdigest()
+        if not cleared:
+            with self._lock:
+                self._entries[key] = (weakref.ref(registry), sequence, checksum, payload)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return checksum, payload
+
+    def invalidate(self, dbname=None):
+        with self._lock:
+            for key in self._entries.keys():
+                if dbname is None or key[0] == dbname:
+                    del self._entries[key]
+
+#: translations bundles, per language and module set
+translations_cache = RegistryCache()
+#: menu trees, per user and language
+menus_cache = RegistryCache(max_entries=256)
 
 def concat_xml(file_list):
     """Concatenate xml files
@@ -243,6 +615,15 @@ def concat_xml(file_list):
             root.append(child)
     return ElementTree.tostring(root, 'utf-8'), checksum.hexdigest()
 
+def read_utf8(fname):
+    """ Reads a text file, stripping its BOM if any
+
+    :returns: the file's content, utf-8 encoded
+    :rtype: str
+    """
+    with codecs.open(fname, 'rb', "utf-8-sig") as fp:
+        return fp.read().encode("utf-8")
+
 def concat_files(file_list, reader=None, intersperse=""):
     """ Concatenates contents of all provided files
 
@@ -257,10 +638,7 @@ def concat_files(file_list, reader=None, intersperse=""):
         return '', checksum.hexdigest()
 
     if reader is None:
-        def reader(f):
-            import codecs
-            with codecs.open(f, 'rb', "utf-8-sig") as fp:
-                return fp.read().encode("utf-8")
+        reader = read_utf8
 
     files_content = []
     for fname in file_list:
@@ -271,59 +649,991 @@ def concat_files(file_list, reader=None, intersperse=""):
     files_concat = intersperse.join(files_content)
     return files_concat, checksum.hexdigest()
 
-concat_js_cache = {}
+#: version of the code turning sources into bundles (css rewriting and
+#: minification, js minification, source maps, templates compilation), part
+#: of all the bundle cache keys: bump it when changing their output so the
+#: entries built by the previous code are not served anymore
+BUNDLE_PIPELINE_VERSION = '2'
+
+def bundle_key(*parts):
+    """ Bundle cache key of the fragment built from ``parts`` (its source
+    and the parameters of its build) by the current bundle pipeline
+
+    :rtype: str
+    """
+    return hashlib.sha1('\0'.join((BUNDLE_PIPELINE_VERSION,) + parts)).hexdigest()
+
+def bundle_path():
+    """ Default location of the on-disk bundle store, shared by all the
+    workers of a server: in the server's data directory, or in the temporary
+    directory for servers without one
+    """
+    if config.get('data_dir'):
+        return os.path.join(config['data_dir'], 'web_bundles')
+    try:
+        username = getpass.getuser()
+    except Exception:
+        username = "unknown"
+    return os.path.join(tempfile.gettempdir(), "oe-bundles-" + username)
+
+class BundleCache(object):
+    """ Content-addressed store of built asset bundles.
+
+    Entries are keyed by a checksum of their sources and of the
+    :data:`BUNDLE_PIPELINE_VERSION` (see :func:`bundle_key` and
+    :func:`bundle_checksum`) and kept in two layers:
+
+    * a bounded in-memory LRU, accounted in bytes, local to the process
+    * a directory on disk shared by all workers, written through an atomic
+      rename so a reader never sees a partially written bundle
+
+    Since keys are content-addressed, entries never need to be invalidated:
+    a change in the sources yields a new key. Outdated entries are evicted
+    from the disk once it holds more than ``max_disk_bytes``, least recently
+    used first (reading an entry from the disk refreshes its mtime).
+
+    As its content is served to the clients, the store is only used if its
+    directory belongs to the user running the server and is only accessible
+    to it (mode 0700), otherwise another local user could plant bundles.
+
+    :param str path: directory of the on-disk store, ``None`` disables it
+    :param int max_bytes: size limit of the in-memory layer
+    :param int max_disk_bytes: size limit of the on-disk layer
+    """
+    def __init__(self, path=None, max_bytes=64 * 1024 * 1024,
+                 max_disk_bytes=256 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        #: size of the on-disk layer, ``None`` until the store is checked
+        self.disk_size = None
+        self.size = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.RLock()
+
+    def _filename(self, key):
+        return os.path.join(self.path, key[:2], key)
+
+    def _check_store(self):
+        """ Creates the directory of the on-disk store or checks the existing
+        one is private to the server's user, disables the store otherwise
+
+        :returns: whether the on-disk store can be used
+        """
+        with self._lock:
+            if self.path and self.disk_size is None:
+                try:
+                    try:
+                        os.makedirs(self.path, 0700)
+                    except OSError, e:
+                        if e.errno != errno.EEXIST:
+                            raise
+                    st = os.lstat(self.path)
+                except OSError:
+                    _logger.warning("Could not create the bundle directory %s, bundles "
+                                    "will not be stored on disk", self.path, exc_info=True)
+                    self.path = None
+                else:
+                    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() \
+                            or st.st_mode & 0077:
+                        _logger.error("The bundle directory %s must be a directory owned by "
+                                      "the server's user with mode 0700, bundles will not be "
+                                      "stored on disk", self.path)
+                        self.path = None
+                    else:
+                        self.disk_size = sum(size for _f, _m, size in self._disk_entries())
+            return bool(self.path)
+
+    def _disk_entries(self):
+        """ ``(filename, mtime, size)`` of the entries of the on-disk store
+        """
+        for dirpath, _dirnames, filenames in os.walk(self.path):
+            for filename in filenames:
+                if filename.startswith('.'):
+                    # being written
+                    continue
+                filename = os.path.join(dirpath, filename)
+                try:
+                    st = os.stat(filename)
+                except OSError:
+                    # evicted by another worker
+                    continue
+                yield filename, st.st_mtime, st.st_size
+
+    def prune(self):
+        """ Evicts the least recently used entries of the on-disk store
+        until it holds less than three quarters of ``max_disk_bytes``
+        """
+        entries = sorted(self._disk_entries(), key=operator.itemgetter(1))
+        size = sum(entry[2] for entry in entries)
+        for filename, _mtime, entry_size in entries:
+            if size <= self.max_disk_bytes * 3 / 4:
+                break
+            try:
+                os.unlink(filename)
+            except OSError:
+                pass
+            size -= entry_size
+        with self._lock:
+            self.disk_size = size
+
+    def _remember(self, key, content):
+        with self._lock:
+            if key in self._entries:
+                self.size -= len(self._entries.pop(key))
+            if len(content) > self.max_bytes:
+                return
+            self._entries[key] = content
+            self.size += len(content)
+            while self.size > self.max_bytes:
+                _key, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def get(self, key):
+        """ Returns the content stored under ``key``, or ``None``
+        """
+        with self._lock:
+            content = self._entries.pop(key, None)
+            if content is not None:
+                # re-insert as most recently used
+                self._entries[key] = content
+                self.hits += 1
+                return content
+        if self.path and self._check_store():
+            try:
+                with open(self._filename(key), 'rb') as fp:
+                    content = fp.read()
+            except IOError:
+                pass
+            else:
+                try:
+                    # recently used, see prune()
+                    os.utime(self._filename(key), None)
+                except OSError:
+                    pass
+                self._remember(key, content)
+                with self._lock:
+                    self.disk_hits += 1
+                return content
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key, content):
+        """ Stores ``content`` under ``key`` in both layers
+        """
+        self._remember(key, content)
+        if not self.path or not self._check_store():
+            return
+        filename = self._filename(key)
+        dirname = os.path.dirname(filename)
+        try:
+            try:
+                os.makedirs(dirname, 0700)
+            except OSError, e:
+                if e.errno != errno.EEXIST:
+                    raise
+            fd, tmp = tempfile.mkstemp(dir=dirname, prefix='.' + key)
+            try:
+                with os.fdopen(fd, 'wb') as fp:
+                    fp.write(content)
+                # atomic on POSIX, concurrent writers of a given key write
+                # the same bytes anyway
+                os.rename(tmp, filename)
+            except Exception:
+                os.unlink(tmp)
+                raise
+        except (IOError, OSError):
+            _logger.warning("Could not write bundle %s to %s", key, dirname, exc_info=True)
+            return
+        with self._lock:
+            self.disk_size += len(content)
+            full = self.disk_size > self.max_disk_bytes
+        if full:
+            self.prune()
+
+    def get_or_build(self, key, build):
+        """ Returns the content stored under ``key``, calling ``build()`` to
+        create (and store) it if it is missing
+        """
+        content = self.get(key)
+        if content is None:
+            content = build()
+            self.set(key, content)
+        return content
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'size': self.size,
+                'max_size': self.max_bytes,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+            }
+
+bundle_cache = BundleCache(
+    config.get('web_bundle_dir') or bundle_path(),
+    int(config.get('web_bundle_cache_size') or 64 * 1024 * 1024),
+    int(config.get('web_bundle_dir_size') or 256 * 1024 * 1024))
+
+rx_css_import = re.compile(r"""@import\s+('|")(?!'|"|/|https?://)""", re.U)
+rx_css_url = re.compile(r"""url\s*\(\s*('|"|)(?!'|"|/|https?://|data:)""", re.U)
+rx_css_import_rule = re.compile(
+    r"""@import\s+(?:url\(\s*(['"]?)(?P<url>[^'")]+)\1\s*\)|(['"])(?P<string>.+?)\3)"""
+    r"""\s*(?P<media>[^;]*);""", re.U)
+rx_css_charset = re.compile(r"""@charset[^;]*;\s*""", re.U)
+
+def web2fs(path):
+    """ convert the web path of an addon file into its FS path
+
+    :returns: the FS path, or ``None`` if ``path`` is not in a loaded addon
+    """
+    addon = path.lstrip('/').split('/', 1)[0]
+    manifest = http.addons_manifest.get(addon)
+    if not manifest or not path.startswith('/') or path.startswith('//'):
+        return None
+    path = path.split('?', 1)[0].split('#', 1)[0]
+    return os.path.normpath(os.path.join(manifest['addons_path'], *path.split('/')))
+
+class StaticFileCache(object):
+    """ In-memory cache of the static files of the addons (``/<addon>/static/...``)
+
+    Entries are validated against the ``(mtime, size)`` of their file on each
+    access, and kept in a LRU accounted in bytes.
+
+    :param int max_bytes: size limit of the cache
+    """
+    def __init__(self, max_bytes=16 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        #: {path: ((mtime, size), content)}
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def resolve(self, path):
+        """ FS path of the static addon file at the web ``path``, ``None`` if
+        ``path`` does not designate one
+        """
+        fs_path = web2fs(path)
+        if fs_path is None:
+            return None
+        addon = path.lstrip('/').split('/', 1)[0]
+        static = os.path.join(http.addons_manifest[addon]['addons_path'], addon, 'static')
+        if not fs_path.startswith(static + os.sep):
+            return None
+        return fs_path
+
+    def get(self, path):
+        """ Content of the static addon file at the web ``path``, ``None`` if
+        ``path`` does not designate an existing one
+        """
+        fs_path = self.resolve(path)
+        if fs_path is None:
+            return None
+        try:
+            st = os.stat(fs_path)
+        except OSError:
+            return None
+        signature = (st.st_mtime, st.st_size)
+        with self._lock:
+            entry = self._entries.pop(fs_path, None)
+            if entry is not None:
+                self.size -= len(entry[1])
+        if entry is None or entry[0] != signature:
+            try:
+                with open(fs_path, 'rb') as fp:
+                    entry = (signature, fp.read())
+            except IOError:
+                return None
+        with self._lock:
+            if len(entry[1]) <= self.max_bytes:
+                self._entries[fs_path] = entry
+                self.size += len(entry[1])
+            while self.size > self.max_bytes:
+                _path, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted[1])
+        return entry[1]
+
+static_file_cache = StaticFileCache(
+    int(config.get('web_static_cache_size') or 16 * 1024 * 1024))
+
+def css_rewrite(content, web_dir, cache=None):
+    """ Absolutifies all relative uris of a css content, memoized by the
+    checksum of the content
+
+    :param str content: css content
+    :param str web_dir: web path of the directory of the css file
+    :param BundleCache cache: cache to use instead of the default one
+    :rtype: str
+    """
+    def rewrite():
+        data = content.decode('utf-8')
+        data = re.sub(rx_css_import, r"""@import \1%s/""" % (web_dir,), data)
+        data = re.sub(rx_css_url, r"url(\1%s/" % (web_dir,), data)
+        return data.encode('utf-8')
+    key = bundle_key(web_dir, content) + '.rewrite.css'
+    return (cache or bundle_cache).get_or_build(key, rewrite)
+
+def css_imports(path, cache=None):
+    """ Lists the local css files imported by the css file at ``path``,
+    memoized by the path and the checksum of the file
+
+    :param BundleCache cache: cache to use instead of the default one
+    :rtype: list(str)
+    """
+    def imports():
+        with open(path, 'rb') as fp:
+            content = fp.read()
+        result = []
+        for match in rx_css_import_rule.finditer(content):
+            url = match.group('url') or match.group('string')
+            if url.startswith('/'):
+                fs_path = web2fs(url)
+            elif not re.match(r'(?:https?:|data:)', url):
+                fs_path = os.path.normpath(os.path.join(
+                    os.path.dirname(path), url.split('?', 1)[0].split('#', 1)[0]))
+            else:
+                fs_path = None
+            if fs_path:
+                result.append(fs_path)
+        return simplejson.dumps(result)
+    # relative imports depend on the directory of the file
+    key = bundle_key(path, manifest_index.stat(path)[2]) + '.imports.json'
+    return simplejson.loads((cache or bundle_cache).get_or_build(key, imports))
+
+def css_inline(path, web_path, stack=(), cache=None):
+    """ Reads the css file at ``path``, absolutifying its uris and recursively
+    inlining the local stylesheets it ``@import``\ s
+
+    :param str path: FS path of the file
+    :param str web_path: web path of the file
+    :param tuple stack: FS paths of the files being inlined, to break cycles
+    :param BundleCache cache: cache to use instead of the default one
+    :rtype: str
+    """
+    with open(path, 'rb') as fp:
+        content = css_rewrite(fp.read(), os.path.dirname(web_path), cache=cache)
+    stack += (path,)
+
+    def inline(match):
+        url = match.group('url') or match.group('string')
+        fs_path = web2fs(url)
+        if not fs_path or fs_path in stack or not os.path.isfile(fs_path):
+            return match.group(0)
+        imported = rx_css_charset.sub('', css_inline(fs_path, url, stack, cache=cache))
+        media = match.group('media').strip()
+        if media:
+            return '@media %s {\n%s\n}' % (media, imported)
+        return imported
+    return rx_css_import_rule.sub(inline, content)
+
+rx_css_comments = re.compile(
+    r"""("(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*')|/\*.*?\*/|\s+""", re.S)
+rx_css_punctuation = re.compile(
+    r"""("(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*')|\s*;+\s*(?=})|\s*([{};,])\s*|(:)\s+""", re.S)
+
+def minify_css(content):
+    """ Minifies css: strips comments and spaces which are not meaningful
+    """
+    content = rx_css_comments.sub(lambda m: m.group(1) or ' ', content)
+    return rx_css_punctuation.sub(
+        lambda m: m.group(1) or m.group(2) or m.group(3) or '', content).strip()
+
+def concat_css(files, cache=None):
+    """ Concatenates css files, absolutifying their relative uris, inlining
+    the local stylesheets they import and moving all remaining ``@import``
+    and ``@charset`` rules to the top. The result is minified.
+
+    :param list((str, str)) files: (filesystem path, web path) of the files
+    :param BundleCache cache: cache to use instead of the default one
+    :returns: (concatenation_result, checksum)
+    :rtype: (str, str)
+    """
+    content = '\n'.join(css_inline(path, web_path, cache=cache) for path, web_path in files)
+
+    # move up all @import and @charset rules to the top
+    matches = []
+    def push(matchobj):
+        matches.append(matchobj.group(0))
+        return ''
+
+    content = re.sub(re.compile("(@charset.+;$)", re.M), push, content)
+    # only the first @charset of a stylesheet is meaningful
+    del matches[1:]
+    content = re.sub(re.compile("(@import.+;$)", re.M), push, content)
+
+    matches.append(content)
+    content = '\n'.join(matches)
+    return minify_css(content), bundle_checksum((f[0] for f in files), cache=cache)
+
+def bundle_checksum(file_list, cache=None):
+    """ Computes the checksum identifying the bundle of the provided files
+
+    :param list(str) file_list: paths of the files in the bundle
+    :param BundleCache cache: cache to use instead of the default one
+    :rtype: str
+    """
+    checksum = hashlib.new('sha1')
+    # the same sources yield another bundle once the pipeline changes
+    checksum.update(BUNDLE_PIPELINE_VERSION)
+    for fname in file_list:
+        checksum.update(manifest_index.stat(fname)[2])
+        if fname.endswith('.css'):
+            # stylesheets imported by css files are inlined in the bundle
+            stack = [fname]
+            seen = set(stack)
+            while stack:
+                for imported in css_imports(stack.pop(), cache=cache):
+                    if imported not in seen and os.path.isfile(imported):
+                        seen.add(imported)
+                        stack.append(imported)
+                        checksum.update(manifest_index.stat(imported)[2])
+    return checksum.hexdigest()
+
+BUNDLE_MIMETYPES = {
+    'js': 'application/javascript',
+    'css': 'text/css',
+    'qweb': 'text/xml',
+    'qwebjs': 'application/javascript',
+}
+
+#: bundles built from the files of another kind of bundle
+BUNDLE_SOURCES = {
+    'qwebjs': 'qweb',
+}
+
+def build_bundle(extension, files, cache=None):
+    """ Builds the content of a bundle
+
+    :param str extension: type of bundle (a key of :data:`BUNDLE_MIMETYPES`)
+    :param list((str, str)) files: (filesystem path, web path) of the
+                                   bundle's files, as from :func:`manifest_glob`
+    :param BundleCache cache: cache memoizing the fragments of the bundle
+                              instead of the default one
+    :rtype: str
+    """
+    if extension == 'css':
+        return concat_css(files, cache=cache)[0]
+    file_list = [f[0] for f in files]
+    if extension == 'js':
+        return minify_js(file_list, cache=cache)
+    if extension == 'qwebjs':
+        return precompile_qweb(file_list)
+    return concat_xml(file_list)[0]
+
+def precompile_qweb(file_list):
+    """ Compiles the templates of qweb files into a javascript module
+    registering their render functions on the web client's engine, see
+    :mod:`.qweb`
+
+    :param list(str) file_list: paths of the qweb files
+    :rtype: str
+    """
+    sources = []
+    for fname in file_list:
+        with open(fname, 'rb') as fp:
+            sources.append(fp.read())
+    minifier = JS_MINIFIERS[config.get('web_js_minifier') or 'rjsmin']
+    return minifier(qweb.precompile(sources))
+
+#: content codings of the precompressed bundle variants, by preference
+BUNDLE_ENCODINGS = ('gzip', 'deflate')
+
+def bundle_compress(content, encoding):
+    """ Encodes ``content`` with the HTTP content-coding ``encoding``
+    """
+    if encoding == 'deflate':
+        # HTTP's "deflate" is the zlib format
+        return zlib.compress(content, 9)
+    assert encoding == 'gzip', "Unknown content-coding %r" % encoding
+    buf = StringIO()
+    # fixed mtime so the variant only depends on the content
+    with gzip.GzipFile(fileobj=buf, mode='wb', compresslevel=9, mtime=0) as fp:
+        fp.write(content)
+    return buf.getvalue()
+
+def bundle_content(key, build, cache=None):
+    """ Returns the bundle stored under ``key`` in the bundle cache. If it is
+    missing, builds it by calling ``build()`` and stores it alongside its
+    precompressed variants (under ``key.<encoding>``)
+
+    :param BundleCache cache: cache to use instead of the default one
+    """
+    cache = cache or bundle_cache
+    content = cache.get(key)
+    if content is None:
+        content = build()
+        cache.set(key, content)
+        for encoding in BUNDLE_ENCODINGS:
+            cache.set('%s.%s' % (key, encoding), bundle_compress(content, encoding))
+    return content
+
+def minify_js(file_list, cache=None):
+    """ Minifies and concatenates js files.
+
+    Each file is minified on its own and memoized in the bundle cache under
+    the checksum of its content, so rebuilding a bundle only minifies the
+    files which changed. Minified fragments are separated by ``;`` so a
+    file missing its final semicolon does not run into the next one.
+
+    :param list(str) file_list: paths of the files to minify
+    :param BundleCache cache: cache to use instead of the default one
+    :rtype: str
+    """
+    engine = config.get('web_js_minifier') or 'rjsmin'
+    minifier = JS_MINIFIERS[engine]
+    cache = cache or bundle_cache
+    fragments = []
+    for fname in file_list:
+        content = read_utf8(fname)
+        fragments.append(cache.get_or_build(
+            '%s.%s.min.js' % (bundle_key(content), engine),
+            functools.partial(minifier, content)))
+    return ';'.join(fragments)
+
+BASE64_DIGITS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/'
+
+def base64_vlq(value):
+    """ Encodes an integer as a base64 VLQ, as used in source maps
+    """
+    value = (-value << 1) | 1 if value < 0 else value << 1
+    result = ''
+    while True:
+        digit, value = value & 0x1f, value >> 5
+        if value:
+            digit |= 0x20
+        result += BASE64_DIGITS[digit]
+        if not value:
+            return result
+
+def js_source_mapping(script):
+    """ Maps the minified version of a js script back to the script.
+
+    Positions are mapped at the granularity of the script's lines: the
+    first token of each line gets a segment. As mandated by the source map
+    format, columns are counted in UTF-16 code units.
+
+    :returns: the number of lines of the minified script, the length of
+              its last line, and a list of segments
+              ``[output line, output column, script line, script column]``
+    :rtype: (int, int, list)
+    """
+    positions = []
+    minified = jsmin(script, positions)
+    script_lines = LineIndex(script)
+    minified_lines = LineIndex(minified)
+
+    segments = []
+    last = None
+    for offset, script_offset in positions:
+        line, col = minified_lines.line_col(offset)
+        script_line, script_col = script_lines.line_col(script_offset)
+        if last != (line, script_line):
+            segments.append([line, col, script_line, script_col])
+            last = (line, script_line)
+    return len(minified_lines.newlines), minified_lines.line_col(len(minified))[1], segments
+
+def utf16_length(data):
+    """ Length of the utf-8 encoded ``data`` in UTF-16 code units
+    """
+    try:
+        data.decode('ascii')
+    except UnicodeDecodeError:
+        return len(data.decode('utf-8').encode('utf-16-le')) // 2
+    return len(data)
+
+class LineIndex(object):
+    """ Converts byte offsets of the utf-8 encoded ``text`` to lines and
+    columns in UTF-16 code units. Converting increasing offsets only
+    measures the text between them.
+    """
+    def __init__(self, text):
+        self.text = text
+        self.newlines = [i for i, c in enumerate(text) if c == '\n']
+        # last converted offset and its column
+        self._offset, self._col = 0, 0
+
+    def line_col(self, offset):
+        line = bisect.bisect_left(self.newlines, offset)
+        start = self.newlines[line - 1] + 1 if line else 0
+        if not start <= self._offset <= offset:
+            self._offset, self._col = start, 0
+        self._col += utf16_length(self.text[self._offset:offset])
+        self._offset = offset
+        return line, self._col
+
+def build_js_sourcemap(files, url=None):
+    """ Builds the v3 source map of the js bundle of ``files`` (see
+    :func:`minify_js`), mapping it back to the web paths of its files
+
+    :param list((str, str)) files: (filesystem path, web path) of the files
+    :param str url: url of the bundle
+    :returns: the source map, as json
+    :rtype: str
+    """
+    # segments of each line of the bundle
+    lines = collections.defaultdict(list)
+    line, col = 0, 0
+    for index, (path, _web_path) in enumerate(files):
+        content = read_utf8(path)
+        newlines, tail, segments = simplejson.loads(bundle_cache.get_or_build(
+            bundle_key(content) + '.map.json',
+            lambda: simplejson.dumps(js_source_mapping(content))))
+        for out_line, out_col, src_line, src_col in segments:
+            if out_line == 0:
+                out_col += col
+            lines[line + out_line].append((out_col, index, src_line, src_col))
+        if newlines:
+            line += newlines
+            col = tail
+        else:
+            col += tail
+        # ';' separating fragments
+        col += 1
+
+    # all fields but the output column are relative to the previous segment
+    mappings = []
+    previous = [0, 0, 0]
+    for segments in (lines[l] for l in xrange(line + 1)):
+        encoded = []
+        previous_col = 0
+        for out_col, index, src_line, src_col in segments:
+            current = [index, src_line, src_col]
+            encoded.append(''.join(base64_vlq(v) for v in [out_col - previous_col] + [
+                c - p for c, p in itertools.izip(current, previous)]))
+            previous_col, previous = out_col, current
+        mappings.append(','.join(encoded))
+
+    sourcemap = {
+        'version': 3,
+        'sources': [web_path for _path, web_path in files],
+        'names': [],
+        'mappings': ';'.join(mappings),
+    }
+    if url:
+        sourcemap['file'] = url
+    return simplejson.dumps(sourcemap)
 
 def concat_js(file_list):
-    content, checksum = concat_files(file_list, intersperse=';')
-    if checksum in concat_js_cache:
-        content = concat_js_cache[checksum]
-    else:
-        content = rjsmin(content)
-        concat_js_cache[checksum] = content
+    checksum = bundle_checksum(file_list)
+    content = bundle_content(checksum + '.js', lambda: minify_js(file_list))
     return content, checksum
 
 def fs2web(path):
     """convert FS path into web path"""
     return '/'.join(path.split(os.path.sep))
 
+class ManifestIndex(object):
+    """ Per-process index of the asset files listed in the addons manifests.
+
+    Keeps the resolved file list of each (addon, extension) pair, and the
+    ``(mtime, size, sha1)`` of each file, so that bundle checksums and
+    modification dates can be computed without opening any file.
+
+    Entries are revalidated with ``os.stat`` calls (of the files, and of the
+    directories their glob patterns are resolved in) at most every
+    ``interval`` seconds; a file is only read again when its mtime or size
+    changed.
+
+    :param float interval: minimum delay between two revalidations of an
+                           entry, ``0`` revalidates on every access
+    """
+    def __init__(self, interval=0):
+        self.interval = interval
+        # (addon, extension): (checked_at, directory mtimes, files)
+        self._globs = {}
+        # path: (checked_at, (mtime, size, sha1))
+        self._files = {}
+
+    def _fresh(self, checked_at):
+        return self.interval and time.time() - checked_at < self.interval
+
+    def invalidate(self, path=None):
+        """ Drops the entries related to ``path``, or all entries
+        """
+        if path is None:
+            self._globs.clear()
+            self._files.clear()
+            return
+        self._files.pop(path, None)
+        for key, (_checked_at, dirs, _files) in self._globs.items():
+            if dirs is None or any(path == d or path.startswith(os.path.join(d, ''))
+                                   for d in dirs):
+                self._globs.pop(key, None)
+
+    def expire_unwatchable(self):
+        """ Drops the glob entries which can not be revalidated through the
+        mtimes of their directories
+        """
+        for key, (_checked_at, dirs, _files) in self._globs.items():
+            if dirs is None:
+                self._globs.pop(key, None)
+
+    def _dirs_mtimes(self, dirs):
+        mtimes = []
+        for d in dirs:
+            try:
+                mtimes.append(os.stat(d).st_mtime)
+            except OSError:
+                mtimes.append(None)
+        return mtimes
+
+    def glob(self, addon, extension):
+        """ Resolves the ``extension`` globs of ``addon``'s manifest
+
+        :returns: (filesystem path, web path) of the local files, and
+                  ``(None, url)`` for remote resources
+        :rtype: list((str, str))
+        """
+        key = (addon, extension)
+        entry = self._globs.get(key)
+        if entry:
+            checked_at, dirs, files = entry
+            if self._fresh(checked_at):
+                return files
+            # patterns are resolved the same as long as their directories
+            # did not change
+            if dirs is not None and \
+                    self._dirs_mtimes(dirs.keys()) == dirs.values():
+                self._globs[key] = (time.time(), dirs, files)
+                return files
+
+        manifest = http.addons_manifest.get(addon)
+        if not manifest:
+            return []
+        # ensure does not ends with /
+        addons_path = os.path.join(manifest['addons_path'], '')[:-1]
+        files = []
+        dirs = set()
+        for pattern in manifest.get(extension, []):
+            if pattern.startswith(('http://', 'https://', '//')):
+                files.append((None, pattern))
+                continue
+            pattern = os.path.normpath(os.path.join(addons_path, addon, pattern))
+            dirs.add(os.path.dirname(pattern))
+            for path in glob.glob(pattern):
+                files.append((path, fs2web(path[len(addons_path):])))
+        if any(glob.has_magic(d) for d in dirs):
+            # can't cheaply check patterns spanning several directories,
+            # they are resolved again on each revalidation
+            mtimes = None
+        else:
+            mtimes = dict(itertools.izip(dirs, self._dirs_mtimes(dirs)))
+        self._globs[key] = (time.time(), mtimes, files)
+        return files
+
+    def stat(self, path):
+        """ Returns the ``(mtime, size, sha1)`` of the file at ``path``
+        """
+        entry = self._files.get(path)
+        if entry and self._fresh(entry[0]):
+            return entry[1]
+        st = os.stat(path)
+        if entry and entry[1][:2] == (st.st_mtime, st.st_size):
+            info = entry[1]
+        else:
+            with open(path, 'rb') as fp:
+                info = (st.st_mtime, st.st_size, hashlib.sha1(fp.read()).hexdigest())
+        self._files[path] = (time.time(), info)
+        return info
+
+    def paths(self):
+        """ Returns the files and directories currently indexed, with their
+        last known mtime (``None`` for directories that must be globbed on
+        each revalidation)
+        """
+        result = {}
+        for _checked_at, dirs, _files in self._globs.values():
+            if dirs is not None:
+                result.update(dirs)
+        for path, (_checked_at, info) in self._files.items():
+            result[path] = info[0]
+        return result
+
+manifest_index = ManifestIndex(
+    float(config.get('web_manifest_check_interval') or 0))
+
+class AssetsWatcher(object):
+    """ Watches the asset files of the addons and invalidates the
+    :class:`ManifestIndex` entries of the files which changed.
+
+    Once the watcher runs, the index does not need to check the filesystem
+    anymore, so the bundle routes do not make any filesystem access on the
+    hot path. Bundles are content-addressed: once the index is invalidated,
+    changed sources resolve to new bundle keys and outdated bundles simply
+    age out of the :class:`BundleCache`.
+
+    Uses inotify (through pyinotify) when available, otherwise polls the
+    indexed files from a background thread every ``interval`` seconds.
+
+    :param ManifestIndex index: the index to invalidate
+    :param str mode: ``inotify``, ``poll`` or ``auto`` (inotify if available)
+    :param float interval: polling delay
+    """
+    def __init__(self, index, mode='auto', interval=2):
+        if mode == 'auto':
+            mode = 'inotify' if pyinotify else 'poll'
+        if mode == 'inotify' and not pyinotify:
+            _logger.warning("pyinotify is not available, polling for asset changes")
+            mode = 'poll'
+        self.index = index
+        self.mode = mode
+        self.interval = interval
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def ensure_started(self):
+        """ Starts watching if not already done by the current process
+        (threads do not survive the fork of prefork workers)
+        """
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            if self.mode == 'inotify':
+                self._start_inotify()
+            else:
+                self._start_polling()
+            # filesystem checks are now done by the watcher only
+            self.index.interval = float('inf')
+            self.index.invalidate()
+            _logger.info("Watching asset files for changes (%s)", self.mode)
+
+    def changed(self, path):
+        _logger.debug("Asset %s changed", path)
+        self.index.invalidate(path)
+
+    def _start_inotify(self):
+        manager = pyinotify.WatchManager()
+        notifier = pyinotify.ThreadedNotifier(
+            manager, lambda event: self.changed(event.pathname))
+        notifier.daemon = True
+        notifier.start()
+        mask = pyinotify.IN_CLOSE_WRITE | pyinotify.IN_CREATE | \
+            pyinotify.IN_DELETE | pyinotify.IN_MOVED_FROM | pyinotify.IN_MOVED_TO
+        for addon, manifest in http.addons_manifest.items():
+            static = os.path.join(manifest['addons_path'], addon, 'static')
+            if os.path.isdir(static):
+                manager.add_watch(static, mask, rec=True, auto_add=True)
+
+    def _start_polling(self):
+        def poll():
+            while True:
+                time.sleep(self.interval)
+                try:
+                    self.poll()
+                except Exception:
+                    _logger.exception("Error while checking assets for changes")
+        t = threading.Thread(target=poll, name='openerp.web.assets_watcher')
+        t.daemon = True
+        t.start()
+
+    def poll(self):
+        """ Checks the indexed files and directories for changes
+        """
+        self.index.expire_unwatchable()
+        for path, mtime in self.index.paths().iteritems():
+            try:
+                current = os.stat(path).st_mtime
+            except OSError:
+                current = None
+            if current != mtime:
+                self.changed(path)
+
+assets_watcher = None
+if config.get('web_assets_watcher'):
+    assets_watcher = AssetsWatcher(
+        manifest_index, config['web_assets_watcher'],
+        float(config.get('web_assets_watcher_interval') or 2))
+
 def manifest_glob(extension, addons=None, db=None, include_remotes=False):
+    if assets_watcher:
+        assets_watcher.ensure_started()
     if addons is None:
         addons = module_boot(db=db)
     else:
         addons = addons.split(',')
+    extension = BUNDLE_SOURCES.get(extension, extension)
     r = []
     for addon in addons:
-        manifest = http.addons_manifest.get(addon, None)
-        if not manifest:
-            continue
-        # ensure does not ends with /
-        addons_path = os.path.join(manifest['addons_path'], '')[:-1]
-        globlist = manifest.get(extension, [])
-        for pattern in globlist:
-            if pattern.startswith(('http://', 'https://', '//')):
-                if include_remotes:
-                    r.append((None, pattern))
-            else:
-                for path in glob.glob(os.path.normpath(os.path.join(addons_path, addon, pattern))):
-                    r.append((path, fs2web(path[len(addons_path):])))
+        for path, web_path in manifest_index.glob(addon, extension):
+            if path is not None or include_remotes:
+                r.append((path, web_path))
     return r
 
+def bundle_base_modules():
+    """ Modules of the base bundles, shared by all the databases: the
+    ``web_base_bundle_modules`` option (comma-separated), by default the
+    server-wide modules and the auto-installed modules depending on them,
+    which are installed wherever their dependencies are.
+
+    :rtype: set
+    """
+    if config.get('web_base_bundle_modules'):
+        return set(m.strip() for m in config['web_base_bundle_modules'].split(','))
+    base = set(openerp.conf.server_wide_modules or ['web'])
+    base.add('web')
+    extended = True
+    while extended:
+        extended = False
+        for name, manifest in http.addons_manifest.iteritems():
+            if name not in base and manifest.get('auto_install') \
+                    and set(manifest.get('depends', [])) <= base:
+                base.add(name)
+                extended = True
+    return base
+
 def manifest_list(extension, mods=None, db=None, debug=False):
     """ list ressources to load specifying either:
     mods: a comma separated string listing modules
     db: a database name (return all installed modules in that database)
-    """
-    files = manifest_glob(extension, addons=mods, db=db, include_remotes=True)
-    if not debug:
-        path = '/web/webclient/' + extension
-        if mods is not None:
-            path += '?' + urllib.urlencode({'mods': mods})
-        elif db:
-            path += '?' + urllib.urlencode({'db': db})
 
-        remotes = [wp for fp, wp in files if fp is None]
-        return [path] + remotes
-    return [wp for _fp, wp in files]
+    Outside of debug mode, the files are bundled in two parts: the base
+    modules (see :func:`bundle_base_modules`), whose bundle is the same for
+    all the databases having them, then the other modules.
+    """
+    if debug:
+        files = manifest_glob(extension, addons=mods, db=db, include_remotes=True)
+        return [wp for _fp, wp in files]
+
+    paths = []
+    remotes = []
+    for part, checksum, files in bundle_parts(extension, mods=mods, db=db):
+        # the checksum makes the bundle's url change with its content, so
+        # the bundle can be cached forever by clients
+        paths.append('/web/webclient/%s/%s?%s' % (
+            extension, checksum, urllib.urlencode({'mods': part})))
+        remotes.extend(wp for fp, wp in files if fp is None)
+    return paths + remotes
+
+def bundle_parts(extension, mods=None, db=None, cache=None):
+    """ Parts of the ``extension`` bundle of the provided modules (or of
+    the modules installed in ``db``), as requested by the pages outside of
+    debug mode (see :func:`manifest_list`)
+
+    :param BundleCache cache: cache to use instead of the default one
+    :returns: the modules of each part (comma-separated), the checksum of
+              its bundle and its files as from :func:`manifest_glob`,
+              remote ones included
+    :rtype: list((str, str, list((str, str))))
+    """
+    modules = module_boot(db=db) if mods is None else mods.split(',')
+    base = bundle_base_modules()
+    parts = [[m for m in modules if m in base], [m for m in modules if m not in base]]
+    result = []
+    for part in [part for part in parts if part] or [modules]:
+        part = ','.join(part)
+        files = manifest_glob(extension, addons=part, include_remotes=True)
+        checksum = bundle_checksum((fp for fp, wp in files if fp is not None), cache=cache)
+        result.append((part, checksum, files))
+    return result
 
 def get_last_modified(files):
     """ Returns the modification time of the most recently modified
@@ -335,8 +1645,8 @@ def get_last_modified(files):
     """
     files = list(files)
     if files:
-        return max(datetime.datetime.fromtimestamp(os.path.getmtime(f))
-                   for f in files)
+        return datetime.datetime.fromtimestamp(
+            max(manifest_index.stat(f)[0] for f in files))
     return datetime.datetime(1970, 1, 1)
 
 def make_conditional(response, last_modified=None, etag=None):
@@ -361,6 +1671,55 @@ def make_conditional(response, last_modified=None, etag=None):
         response.set_etag(etag)
     return response.make_conditional(request.httprequest)
 
+#: lifetime of the responses to checksummed bundle urls (one year)
+BUNDLE_MAX_AGE = 365 * 24 * 60 * 60
+#: checksums of the bundle urls, see :func:`bundle_checksum`
+rx_bundle_checksum = re.compile(r'^[0-9a-f]{40}$')
+
+def make_bundle_response(key, content, mimetype, last_modified=None, etag=None, immutable=False,
+                         headers=None, private=False):
+    """ Creates a conditional response for the bundle ``content`` stored
+    under ``key``, serving its precompressed variant for the best content
+    coding accepted by the client
+
+    Unless ``immutable`` is set, clients must revalidate the response (see
+    :func:`make_conditional`), otherwise they may cache it forever.
+
+    :param str key: bundle cache key of the bundle
+    :param str content: raw (identity-coded) bundle
+    :param str mimetype: content type of the bundle
+    :param datetime.datetime last_modified: last modification date of the bundle
+    :param str etag: checksum of the bundle
+    :param bool immutable: whether ``content`` will never change for the
+                           requested url
+    :param list headers: additional headers
+    :param bool private: whether only the client may cache the response,
+                         not the shared caches (e.g. proxies)
+    :rtype: werkzeug.wrappers.Response
+    """
+    headers = [('Content-Type', mimetype), ('Vary', 'Accept-Encoding')] + (headers or [])
+    accepted = request.httprequest.accept_encodings
+    for encoding in BUNDLE_ENCODINGS:
+        if accepted[encoding]:
+            content = bundle_cache.get_or_build(
+                '%s.%s' % (key, encoding),
+                functools.partial(bundle_compress, content, encoding))
+            headers.append(('Content-Encoding', encoding))
+            if etag:
+                # representations differ, so must their entity tags
+                etag = '%s-%s' % (etag, encoding)
+            break
+    response = request.make_response(content, headers)
+    if not immutable:
+        if private:
+            response.cache_control.private = True
+        return make_conditional(response, last_modified, etag)
+    response.headers['Cache-Control'] = '%s, max-age=%d, immutable' % (
+        'private' if private else 'public', BUNDLE_MAX_AGE)
+    if etag:
+        response.set_etag(etag)
+    return response.make_conditional(request.httprequest)
+
 def login_and_redirect(db, login, key, redirect_url='/web'):
     request.session.authenticate(db, login, key)
     return set_cookie_and_redirect(redirect_url)
@@ -457,16 +1816,32 @@ def fix_view_modes(action):
 
     return action
 
+#: {path: (modification time, web client messages)} of the parsed po files
+_local_web_translations_cache = {}
+
 def _local_web_translations(trans_file):
+    """ Web client messages of the ``trans_file`` po file, which is only
+    parsed again when it is modified
+    """
+    try:
+        mtime = os.path.getmtime(trans_file)
+    except OSError:
+        return
+    entry = _local_web_translations_cache.get(trans_file)
+    if entry and entry[0] == mtime:
+        return entry[1]
+
     messages = []
     try:
         with open(trans_file) as t_file:
             po = babel.messages.pofile.read_po(t_file)
     except Exception:
-        return
-    for x in po:
-        if x.id and x.string and "openerp-web" in x.auto_comments:
-            messages.append({'id': x.id, 'string': x.string})
+        messages = None
+    else:
+        for x in po:
+            if x.id and x.string and "openerp-web" in x.auto_comments:
+                messages.append({'id': x.id, 'string': x.string})
+    _local_web_translations_cache[trans_file] = (mtime, messages)
     return messages
 
 def xml2json_from_elementtree(el, preserve_whitespaces=False):
@@ -550,10 +1925,10 @@ class Home(http.Controller):
     def web_client(self, s_action=None, db=None, debug=False, **kw):
         debug = debug != False
 
-        lst = http.db_list(True)
+        lst = db_list(True)
         if db not in lst:
             db = None
-        guessed_db = http.db_monodb(request.httprequest)
+        guessed_db = db_monodb(request.httprequest)
         if guessed_db is None and len(lst) > 0:
             guessed_db = lst[0]
 
@@ -571,16 +1946,47 @@ class Home(http.Controller):
             request.session.db = db
             guessed_db = db
 
-        js = "\n        ".join('<script type="text/javascript" src="%s"></script>' % i for i in manifest_list('js', db=guessed_db, debug=debug))
-        css = "\n        ".join('<link rel="stylesheet" href="%s">' % i for i in manifest_list('css', db=guessed_db, debug=debug))
+        modules = module_boot(db=guessed_db)
+        js_files = manifest_list('js', db=guessed_db, debug=debug)
+        css_files = manifest_list('css', db=guessed_db, debug=debug)
+
+        def render():
+            js = "\n        ".join('<script type="text/javascript" src="%s"></script>' % i for i in js_files)
+            css = "\n        ".join('<link rel="stylesheet" href="%s">' % i for i in css_files)
+            return html_template % {
+                'js': js,
+                'css': css,
+                'modules': simplejson.dumps(modules),
+                'init': 'var wc = new s.web.WebClient();wc.appendTo($(document.body));'
+            }
 
-        r = html_template % {
-            'js': js,
-            'css': css,
-            'modules': simplejson.dumps(module_boot(db=guessed_db)),
-            'init': 'var wc = new s.web.WebClient();wc.appendTo($(document.body));'
-        }
-        return request.make_response(r, {'Cache-Control': 'no-cache', 'Content-Type': 'text/html; charset=utf-8'})
+        # bundle urls change with their content, so the page only depends on
+        # the database, the debug mode and the modules (and the template)
+        checksum = hashlib.sha1(simplejson.dumps(
+            [BUNDLE_PIPELINE_VERSION, html_template, guessed_db, debug, modules,
+             js_files, css_files])).hexdigest()
+        headers = [('Content-Type', 'text/html; charset=utf-8')]
+        if not debug:
+            headers.append(('Link', self.preload_links(modules, js_files, css_files)))
+        if checksum in request.httprequest.if_none_match:
+            content = ''
+        else:
+            content = bundle_cache.get_or_build(checksum + '.html', render)
+        response = request.make_response(content, headers)
+        return make_conditional(response, etag=checksum)
+
+    def preload_links(self, modules, js_files, css_files):
+        """ ``Link`` header letting browsers fetch the bundles of the page
+        (including the templates, loaded by the client once started) before
+        they parse it
+        """
+        # modules of the client's session, see openerp.init
+        mods = ','.join(['web'] + [m for m in modules if m != 'web'])
+        qweb_files = WebClient().qwebjslist(mods=mods)
+        return ', '.join('<%s>; rel=preload; as=%s' % link for link in itertools.chain(
+            ((f, 'style') for f in css_files),
+            ((f, 'script') for f in js_files),
+            ((f, 'script') for f in qweb_files)))
 
     @http.route('/login', type='http', auth="none")
     def login(self, db, login, key):
@@ -600,82 +2006,184 @@ class WebClient(http.Controller):
     def qweblist(self, mods=None):
         return manifest_list('qweb', mods=mods)
 
-    @http.route('/web/webclient/css', type='http', auth="none")
-    def css(self, mods=None, db=None):
-        files = list(manifest_glob('css', addons=mods, db=db))
-        last_modified = get_last_modified(f[0] for f in files)
-        if request.httprequest.if_modified_since and request.httprequest.if_modified_since >= last_modified:
-            return werkzeug.wrappers.Response(status=304)
-
-        file_map = dict(files)
-
-        rx_import = re.compile(r"""@import\s+('|")(?!'|"|/|https?://)""", re.U)
-        rx_url = re.compile(r"""url\s*\(\s*('|"|)(?!'|"|/|https?://|data:)""", re.U)
-
-        def reader(f):
-            """read the a css file and absolutify all relative uris"""
-            with open(f, 'rb') as fp:
-                data = fp.read().decode('utf-8')
-
-            path = file_map[f]
-            web_dir = os.path.dirname(path)
-
-            data = re.sub(
-                rx_import,
-                r"""@import \1%s/""" % (web_dir,),
-                data,
-            )
-
-            data = re.sub(
-                rx_url,
-                r"url(\1%s/" % (web_dir,),
-                data,
-            )
-            return data.encode('utf-8')
-
-        content, checksum = concat_files((f[0] for f in files), reader)
+    @http.route('/web/webclient/qwebjslist', type='json', auth="none")
+    def qwebjslist(self, mods=None):
+        """ Lists the bundles of precompiled templates of the provided
+        modules, empty if the client has to load the templates as xml
+        """
+        files = manifest_list('qwebjs', mods=mods)
+        # remote templates can not be precompiled
+        if all(f.startswith('/web/webclient/qwebjs/') for f in files):
+            return files
+        return []
+
+    def templatelist(self, mods=None, debug=False):
+        """ Lists the templates of the provided modules the way the client
+        loads them: bundles of precompiled templates, xml files in debug mode
+        """
+        if debug:
+            return self.qweblist(mods=mods)
+        return self.qwebjslist(mods=mods)
 
-        # move up all @import and @charset rules to the top
-        matches = []
-        def push(matchobj):
-            matches.append(matchobj.group(0))
-            return ''
+    def assets(self, mods, debug=False):
+        """ css, js and template files of the provided modules, as the client
+        loads them
+        """
+        if not mods:
+            return {'css': [], 'js': [], 'templates': []}
+        mods = ','.join(mods)
+        return {
+            'css': self.csslist(mods=mods),
+            'js': self.jslist(mods=mods),
+            'templates': self.templatelist(mods, debug),
+        }
 
-        content = re.sub(re.compile("(@charset.+;$)", re.M), push, content)
-        content = re.sub(re.compile("(@import.+;$)", re.M), push, content)
+    @http.route('/web/webclient/checksums', type='json', auth="user")
+    def checksums(self, mods=None, lang=None):
+        """ Checksums of the payloads the client may keep in a persistent
+        cache: the translations of ``mods`` in ``lang`` (see
+        :meth:`translations_entry`) and the menus of the user
+        """
+        return {
+            'translations': self.translations_entry(mods, lang)[0],
+            'menus': Menu().load_entry()[0],
+        }
 
-        matches.append(content)
-        content = '\n'.join(matches)
+    @http.route('/web/webclient/bootstrap', type='json', auth="none")
+    def bootstrap(self, mods=None, debug=False, cached=None):
+        """ Returns in a single response what the client otherwise fetches
+        through successive requests when it starts: the session's
+        information, the templates of the modules it already loaded and, if
+        the session is authenticated, the installed modules, the assets of
+        those it has yet to load, the URL of the translations and the menus.
+
+        Modules loaded on demand (see :func:`module_lazy`) are listed apart,
+        each with the view types it provides, the modules loaded on demand it
+        depends on and its own assets.
+
+        The checksums of the translations and the menus are provided as well,
+        and the menus are left out if the client already has them.
+
+        :param list mods: modules already loaded by the client
+        :param bool debug: whether the client is in debug mode
+        :param dict cached: checksums of the payloads the client has in its
+                            persistent cache
+        """
+        mods = mods or []
+        cached = cached or {}
+        request.uid = request.session.uid
+        request.disable_db = False
+        result = {
+            'session': Session().session_info(),
+            'templates': self.templatelist(','.join(mods), debug),
+        }
+        if not request.session.uid:
+            return result
+
+        installed = module_installed()
+        lazy = module_lazy(installed)
+        modules = [m for m in installed if m not in lazy]
+        result['modules'] = modules
+        result['assets'] = self.assets(
+            [m for m in modules if m not in mods], debug)
+        result['lazy'] = dict(
+            (m, {'views': http.addons_manifest[m].get('web_views', {}),
+                 'depends': [d for d in http.addons_manifest[m].get('depends', []) if d in lazy],
+                 'assets': self.assets([m], debug)})
+            for m in lazy if m not in mods)
+        all_modules = mods + [m for m in installed if m not in mods]
+        lang = result['session']['user_context'].get('lang')
+        result['translations_url'] = self.translations_url(mods=all_modules, lang=lang)
+        menus_checksum, menus = Menu().load_entry()
+        result['checksums'] = {
+            'translations': self.translations_entry(all_modules, lang)[0],
+            'menus': menus_checksum,
+        }
+        if cached.get('menus') != menus_checksum:
+            result['menus'] = menus
+        return result
 
-        return make_conditional(
-            request.make_response(content, [('Content-Type', 'text/css')]),
-            last_modified, checksum)
+    def bundle(self, extension, mods=None, db=None, checksum=None):
+        """ Serves the ``extension`` bundle of the provided modules (or of the
+        modules installed in ``db``).
 
-    @http.route('/web/webclient/js', type='http', auth="none")
-    def js(self, mods=None, db=None):
-        files = [f[0] for f in manifest_glob('js', addons=mods, db=db)]
-        last_modified = get_last_modified(files)
-        if request.httprequest.if_modified_since and request.httprequest.if_modified_since >= last_modified:
+        If ``checksum`` is provided and matches the bundle being served, the
+        response can be cached forever: any change to the bundle's sources
+        yields a new checksum, hence a new URL (see :func:`manifest_list`).
+        """
+        mimetype = BUNDLE_MIMETYPES[extension]
+        if checksum:
+            # it is part of the bundle cache keys, hence of file names
+            if not rx_bundle_checksum.match(checksum):
+                return request.not_found()
+            key = '%s.%s' % (checksum, extension)
+            content = bundle_cache.get(key)
+            if content is not None:
+                return make_bundle_response(
+                    key, content, mimetype, etag=checksum, immutable=True,
+                    headers=self.bundle_headers(extension, checksum, mods, db))
+
+        files = manifest_glob(extension, addons=mods, db=db)
+        last_modified = get_last_modified(f[0] for f in files)
+        if not checksum and request.httprequest.if_modified_since \
+                and request.httprequest.if_modified_since >= last_modified:
             return werkzeug.wrappers.Response(status=304)
 
-        content, checksum = concat_js(files)
+        current = bundle_checksum(f[0] for f in files)
+        key = '%s.%s' % (current, extension)
+        content = bundle_content(key, lambda: build_bundle(extension, files))
+        # a stale checksum (e.g. page generated before an update) gets the
+        # current bundle, but that one must not be cached under the old URL
+        return make_bundle_response(key, content, mimetype, last_modified,
+                                    current, immutable=checksum == current,
+                                    headers=self.bundle_headers(extension, current, mods, db))
+
+    def bundle_headers(self, extension, checksum, mods=None, db=None):
+        """ Additional headers of the ``extension`` bundle identified by
+        ``checksum``: links js bundles to their source map
+        """
+        if extension != 'js':
+            return []
+        url = '/web/webclient/jsmap/' + checksum
+        if mods is not None:
+            url += '?' + urllib.urlencode({'mods': mods})
+        elif db:
+            url += '?' + urllib.urlencode({'db': db})
+        return [('SourceMap', url), ('X-SourceMap', url)]
 
-        return make_conditional(
-            request.make_response(content, [('Content-Type', 'application/javascript')]),
-            last_modified, checksum)
+    @http.route(['/web/webclient/css', '/web/webclient/css/<string:checksum>'], type='http', auth="none")
+    def css(self, mods=None, db=None, checksum=None):
+        return self.bundle('css', mods=mods, db=db, checksum=checksum)
 
-    @http.route('/web/webclient/qweb', type='http', auth="none")
-    def qweb(self, mods=None, db=None):
-        files = [f[0] for f in manifest_glob('qweb', addons=mods, db=db)]
-        last_modified = get_last_modified(files)
-        if request.httprequest.if_modified_since and request.httprequest.if_modified_since >= last_modified:
-            return werkzeug.wrappers.Response(status=304)
+    @http.route(['/web/webclient/js', '/web/webclient/js/<string:checksum>'], type='http', auth="none")
+    def js(self, mods=None, db=None, checksum=None):
+        return self.bundle('js', mods=mods, db=db, checksum=checksum)
 
-        content, checksum = concat_xml(files)
+    @http.route(['/web/webclient/qweb', '/web/webclient/qweb/<string:checksum>'], type='http', auth="none")
+    def qweb(self, mods=None, db=None, checksum=None):
+        return self.bundle('qweb', mods=mods, db=db, checksum=checksum)
 
-        return make_conditional(
-            request.make_response(content, [('Content-Type', 'text/xml')]),
-            last_modified, checksum)
+    @http.route(['/web/webclient/qwebjs', '/web/webclient/qwebjs/<string:checksum>'], type='http', auth="none")
+    def qwebjs(self, mods=None, db=None, checksum=None):
+        return self.bundle('qwebjs', mods=mods, db=db, checksum=checksum)
+
+    @http.route('/web/webclient/jsmap/<string:checksum>', type='http', auth="none")
+    def jsmap(self, checksum, mods=None, db=None):
+        """ Source map of the js bundle identified by ``checksum``
+        """
+        if not rx_bundle_checksum.match(checksum):
+            return request.not_found()
+        key = checksum + '.js.map'
+        content = bundle_cache.get(key)
+        if content is None:
+            files = manifest_glob('js', addons=mods, db=db)
+            if bundle_checksum(f[0] for f in files) != checksum:
+                # the sources of an outdated bundle are gone
+                return request.not_found()
+            content = bundle_content(key, lambda: build_js_sourcemap(
+                files, '/web/webclient/js/' + checksum))
+        return make_bundle_response(key, content, 'application/json',
+                                    etag=checksum, immutable=True)
 
     @http.route('/web/webclient/bootstrap_translations', type='json', auth="none")
     def bootstrap_translations(self, mods):
@@ -700,36 +2208,73 @@ class WebClient(http.Controller):
         return {"modules": translations_per_module,
                 "lang_parameters": None}
 
-    @http.route('/web/webclient/translations', type='json', auth="admin")
-    def translations(self, mods=None, lang=None):
+    def translations_entry(self, mods=None, lang=None):
+        """ Checksum and bundle of the translations of ``mods`` (the installed
+        modules by default) in ``lang`` (the user's language by default)
+
+        :rtype: (str, dict)
+        """
         if mods is None:
             m = request.registry.get('ir.module.module')
-            mods = [x['name'] for x in m.search_read(request.cr, request.uid,
+            mods = [x['name'] for x in m.search_read(request.cr, openerp.SUPERUSER_ID,
                 [('state','=','installed')], ['name'])]
         if lang is None:
             lang = request.context["lang"]
-        res_lang = request.registry.get('res.lang')
-        ids = res_lang.search(request.cr, request.uid, [("code", "=", lang)])
-        lang_params = None
-        if ids:
-            lang_params = res_lang.read(request.cr, request.uid, ids[0], ["direction", "date_format", "time_format",
-                                                "grouping", "decimal_point", "thousands_sep"])
-
-        # Regional languages (ll_CC) must inherit/override their parent lang (ll), but this is
-        # done server-side when the language is loaded, so we only need to load the user's lang.
-        ir_translation = request.registry.get('ir.translation')
-        translations_per_module = {}
-        messages = ir_translation.search_read(request.cr, request.uid, [('module','in',mods),('lang','=',lang),
-                                               ('comments','like','openerp-web'),('value','!=',False),
-                                               ('value','!=','')],
-                                              ['module','src','value','lang'], order='module')
-        for mod, msg_group in itertools.groupby(messages, key=operator.itemgetter('module')):
-            translations_per_module.setdefault(mod,{'messages':[]})
-            translations_per_module[mod]['messages'].extend({'id': m['src'],
-                                                             'string': m['value']} \
-                                                                for m in msg_group)
-        return {"modules": translations_per_module,
-                "lang_parameters": lang_params}
+        # the bundle is shared by all the users
+        return translations_cache.get(
+            request.registry, (lang, tuple(sorted(set(mods)))), functools.partial(
+                translations_bundle, request.cr, openerp.SUPERUSER_ID, request.registry, mods, lang))
+
+    def translations_url(self, mods=None, lang=None):
+        """ Cacheable URL of the translations of ``mods`` in ``lang``, see
+        :meth:`translations_entry`
+
+        The URL is keyed on a checksum of the modules, the language and the
+        translations, rather than carrying the (long) list of modules: the
+        modules and the language are kept in the bundle cache under that
+        key for :meth:`translations_get`.
+        """
+        params = simplejson.dumps([mods and sorted(set(mods)), lang or request.context["lang"]])
+        key = self.translations_key(params)
+        bundle_cache.get_or_build(key + '.translations.params.json', lambda: params)
+        return '/web/webclient/translations/' + key
+
+    def translations_key(self, params):
+        """ Key of the translations of the ``[mods, lang]`` pair ``params``
+        (as json), changing with the translations themselves
+
+        :rtype: str
+        """
+        mods, lang = simplejson.loads(params)
+        checksum, _bundle = self.translations_entry(mods, lang)
+        return hashlib.sha1(params + '\0' + checksum).hexdigest()
+
+    @http.route('/web/webclient/translations', type='json', auth="admin")
+    def translations(self, mods=None, lang=None):
+        return self.translations_entry(mods, lang)[1]
+
+    @http.route('/web/webclient/translations/<string:key>', type='http', auth="user")
+    def translations_get(self, key):
+        """ Serves the translations bundle of the URL built by
+        :meth:`translations_url`. As for the asset bundles, the response can
+        be cached forever (by the client only, as it needs a session) if
+        ``key`` matches the served bundle.
+        """
+        if not rx_bundle_checksum.match(key):
+            return request.not_found()
+        params = bundle_cache.get(key + '.translations.params.json')
+        if params is None:
+            # evicted, or cached by another worker without a bundle directory,
+            # the client falls back to the translations rpc
+            return request.not_found()
+        mods, lang = simplejson.loads(params)
+        current = self.translations_key(params)
+        checksum, bundle = self.translations_entry(mods, lang)
+        content_key = '%s.translations.json' % checksum
+        content = bundle_content(content_key, lambda: simplejson.dumps(bundle))
+        # a stale key gets the current bundle, which must be revalidated
+        return make_bundle_response(content_key, content, 'application/json',
+                                    etag=current, immutable=key == current, private=True)
 
     @http.route('/web/webclient/version_info', type='json', auth="none")
     def version_info(self):
@@ -747,6 +2292,11 @@ class Proxy(http.Controller):
         :param path: actual request path
         :return: file content
         """
+        # static addon files are read directly, without dispatching a request
+        content = static_file_cache.get(path)
+        if content is not None:
+            return content
+
         from werkzeug.test import Client
         from werkzeug.wrappers import BaseResponse
 
@@ -758,7 +2308,7 @@ class Database(http.Controller):
     def get_list(self):
         # TODO change js to avoid calling this method if in monodb mode
         try:
-            return http.db_list()
+            return db_list()
         except openerp.exceptions.AccessDenied:
             monodb = db_monodb()
             if monodb:
@@ -768,12 +2318,15 @@ class Database(http.Controller):
     @http.route('/web/database/create', type='json', auth="none")
     def create(self, fields):
         params = dict(map(operator.itemgetter('name', 'value'), fields))
-        return request.session.proxy("db").create_database(
-            params['super_admin_pwd'],
-            params['db_name'],
-            bool(params.get('demo_data')),
-            params['db_lang'],
-            params['create_admin_pwd'])
+        try:
+            return request.session.proxy("db").create_database(
+                params['super_admin_pwd'],
+                params['db_name'],
+                bool(params.get('demo_data')),
+                params['db_lang'],
+                params['create_admin_pwd'])
+        finally:
+            db_list_cache.invalidate()
 
     @http.route('/web/database/duplicate', type='json', auth="none")
     def duplicate(self, fields):
@@ -784,7 +2337,10 @@ class Database(http.Controller):
             params['db_name'],
         )
 
-        return request.session.proxy("db").duplicate_database(*duplicate_attrs)
+        try:
+            return request.session.proxy("db").duplicate_database(*duplicate_attrs)
+        finally:
+            db_list_cache.invalidate()
 
     @http.route('/web/database/drop', type='json', auth="none")
     def drop(self, fields):
@@ -801,6 +2357,8 @@ class Database(http.Controller):
             return {'error': 'AccessDenied', 'title': 'Drop Database'}
         except Exception:
             return {'error': _('Could not drop database !'), 'title': _('Drop Database')}
+        finally:
+            db_list_cache.invalidate()
 
     @http.route('/web/database/backup', type='http', auth="none")
     def backup(self, backup_db, backup_pwd, token):
@@ -828,6 +2386,8 @@ class Database(http.Controller):
             return ''
         except openerp.exceptions.AccessDenied, e:
             raise Exception("AccessDenied")
+        finally:
+            db_list_cache.invalidate()
 
     @http.route('/web/database/change_password', type='json', auth="none")
     def change_password(self, fields):
@@ -971,6 +2531,15 @@ class Menu(http.Controller):
 
         return Menus.search(menu_domain, 0, False, False, request.context)
 
+    def load_entry(self):
+        """ Checksum and tree of the menus of the user, see :meth:`load`
+
+        :rtype: (str, dict)
+        """
+        # the language is the only part of the context menus depend on
+        key = (request.session.uid, request.context.get('lang'))
+        return menus_cache.get(request.registry, key, self.read_menus)
+
     @http.route('/web/menu/load', type='json', auth="user")
     def load(self):
         """ Loads all menu items (all applications and their sub-menus).
@@ -978,6 +2547,10 @@ class Menu(http.Controller):
         :return: the menu root
         :rtype: dict('children': menu_nodes)
         """
+        return self.load_entry()[1]
+
+    def read_menus(self):
+        """ Reads the menu tree of the user, see :meth:`load` """
         Menus = request.session.model('ir.ui.menu')
 
         fields = ['name', 'sequence', 'parent_id', 'action']
@@ -1031,16 +2604,131 @@ class Menu(http.Controller):
         """
         return request.session.model('ir.ui.menu').get_needaction_data(menu_ids, request.context)
 
+#: below this estimate, records are counted (see ``DataSet.do_search_read``)
+COUNT_ESTIMATE_THRESHOLD = int(config.get('web_count_estimate_threshold') or 10000)
+#: estimated number of rows of the top node of a query plan
+rx_plan_rows = re.compile(r'\brows=(\d+)')
+#: a sorting directive, e.g. ``date_order desc``
+rx_order_term = re.compile(r'^\s*"?(\w+)"?(?:\s+(asc|desc))?\s*$', re.IGNORECASE)
+#: types of the columns whose values can be compared to page through records
+KEYSET_TYPES = ('char', 'text', 'selection', 'integer', 'float', 'date', 'datetime')
+#: number of records read at once when streaming them, see ``DataSet.stream``
+STREAM_CHUNK_SIZE = int(config.get('web_stream_chunk_size') or 500)
+
+def keyset_values(cr, table, keys, record_id):
+    """ Values of the sort ``keys`` of the record ``record_id`` of ``table``,
+    read from its row as read() turns NULL numbers into 0, which would not
+    compare the same
+    """
+    cr.execute('SELECT %s FROM "%s" WHERE id = %%s' % (
+        ', '.join('"%s"' % name for name, _direction in keys), table), (record_id,))
+    row = cr.fetchone()
+    return list(row) if row else None
+
+def keyset_predicate(keys, values):
+    """ Domain of the records sorted after the one with the ``values`` of
+    the sort ``keys``: those with a greater (or lesser, in descending order)
+    first key, or an equal first key and a greater second key, and so on.
+    NULL values come last in ascending order and first in descending order.
+    """
+    branches = []
+    for index, ((name, direction), value) in enumerate(zip(keys, values)):
+        if value is None:
+            after = [] if direction == 'asc' else [(name, '!=', False)]
+        elif direction == 'asc' and name != 'id':
+            after = ['|', (name, '>', value), (name, '=', False)]
+        elif direction == 'asc':
+            after = [(name, '>', value)]
+        else:
+            after = [(name, '<', value)]
+        if after:
+            equal = [(key, '=', False if v is None else v)
+                     for (key, _direction), v in zip(keys[:index], values[:index])]
+            branches.append(['&'] * len(equal) + equal + after)
+    return ['|'] * (len(branches) - 1) + sum(branches, [])
+
+def columnar(records, fields=None, many2one=()):
+    """ Encodes ``records`` (as returned by read()) in the ``columnar``
+    format: the names of their fields once and the values of each field as
+    a column. The ``(id, name)`` pairs of many2one fields are listed once
+    in ``relations`` and referred to by their index in the column.
+
+    :param list records: records to encode
+    :param list fields: names of the fields, if there are no records
+    :param many2one: names of the many2one fields of the records
+    :rtype: dict
+    """
+    names = list(records[0]) if records else list(fields or [])
+    columns, relations = [], {}
+    for name in names:
+        column = [record.get(name, False) for record in records]
+        if name in many2one:
+            pairs, index = [], {}
+            for position, value in enumerate(column):
+                if value:
+                    key = tuple(value)
+                    if key not in index:
+                        index[key] = len(pairs)
+                        pairs.append(value)
+                    column[position] = index[key]
+            relations[name] = pairs
+        columns.append(column)
+    return {
+        'format': 'columnar',
+        'length': len(records),
+        'fields': names,
+        'columns': columns,
+        'relations': relations,
+    }
+
+def format_records(model, records, format=None, fields=None):
+    """ Encodes ``records`` of ``model`` in the requested ``format``,
+    ``records`` is returned as is if it is not a list of records or no
+    format is requested
+    """
+    if format == 'columnar' and isinstance(records, list) \
+            and all(isinstance(record, dict) for record in records):
+        Model = request.registry.get(model)
+        many2one = ()
+        if Model is not None:
+            many2one = set(name for name, info in Model._all_columns.iteritems()
+                           if info.column._type == 'many2one')
+        return columnar(records, fields, many2one)
+    if format not in (None, 'columnar'):
+        raise ValueError("Unknown records format %r" % format)
+    return records
+
 class DataSet(http.Controller):
 
     @http.route('/web/dataset/search_read', type='json', auth="user")
-    def search_read(self, model, fields=False, offset=0, limit=False, domain=None, sort=None):
-        return self.do_search_read(model, fields, offset, limit, domain, sort)
+    def search_read(self, model, fields=False, offset=0, limit=False, domain=None, sort=None,
+                    count='exact', cursor=None, format=None):
+        result = self.do_search_read(model, fields, offset, limit, domain, sort, count, cursor)
+        result['records'] = format_records(model, result['records'], format, fields)
+        return result
     def do_search_read(self, model, fields=False, offset=0, limit=False, domain=None
-                       , sort=None):
+                       , sort=None, count='exact', cursor=None):
         """ Performs a search() followed by a read() (if needed) using the
         provided search criteria
 
+        When a full page of records is returned, the number of matching
+        records is computed according to ``count``:
+
+        * ``exact`` counts them
+        * ``estimate`` uses the database planner's estimate (flagged by
+          ``length_estimated``), unless it is below
+          ``web_count_estimate_threshold`` in which case they are counted
+        * ``lazy`` does not count them, ``length`` is ``None`` and the client
+          has to count them separately
+
+        With a ``cursor``, full pages of records come with a ``cursor`` token
+        to fetch the next page from, by comparing the sort keys of the
+        records to those of the last record returned rather than skipping
+        ``offset`` records (which is then only used to compute ``length``).
+        The first page is requested with ``cursor=True``. Records are
+        fetched by offset (and no token is returned) when they are sorted on
+        columns which can not be compared, see ``keyset_order``.
+
         :param str model: the name of the model to search on
         :param fields: a list of the fields to return in the result records
         :type fields: [str]
@@ -1048,6 +2736,8 @@ class DataSet(http.Controller):
         :param int limit: the maximum number of records to return
         :param list domain: the search domain for the query
         :param list sort: sorting directives
+        :param str count: counting mode of the matching records
+        :param cursor: ``True`` or the token of the previous page
         :returns: A structure (dict) with two keys: ids (all the ids matching
                   the (domain, context) pair) and records (paginated records
                   matching fields selection set)
@@ -1055,21 +2745,252 @@ class DataSet(http.Controller):
         """
         Model = request.session.model(model)
 
-        records = Model.search_read(domain, fields, offset or 0, limit or False, sort or False,
-                           request.context)
+        keys = cursor and limit and self.keyset_order(model, sort)
+        search_domain, search_offset, search_sort = domain, offset or 0, sort or False
+        if keys:
+            search_sort = ', '.join('%s %s' % key for key in keys)
+            if isinstance(cursor, basestring):
+                predicate = self.keyset_domain(model, keys, cursor)
+                if predicate is not None:
+                    search_domain = predicate + (domain or [])
+                    search_offset = 0
+
+        records = Model.search_read(search_domain, fields, search_offset, limit or False,
+                                    search_sort, request.context)
         if not records:
             return {
                 'length': 0,
                 'records': []
             }
+        result = {'records': records}
+        if keys:
+            result['cursor'] = len(records) == limit and \
+                self.keyset_cursor(model, keys, records[-1]['id'])
         if limit and len(records) == limit:
-            length = Model.search_count(domain, request.context)
+            if count == 'lazy':
+                result['length'] = None
+                return result
+            if count == 'estimate':
+                estimate = self.estimate_count(model, domain)
+                if estimate is not None and estimate >= COUNT_ESTIMATE_THRESHOLD:
+                    # there may be more records than the planner thinks, and
+                    # at least one after a full page or the pager would stop
+                    result['length'] = max(estimate, (offset or 0) + len(records) + 1)
+                    result['length_estimated'] = True
+                    return result
+            result['length'] = Model.search_count(domain, request.context)
         else:
-            length = len(records) + (offset or 0)
-        return {
-            'length': length,
-            'records': records
-        }
+            result['length'] = len(records) + (offset or 0)
+        return result
+
+    @http.route('/web/dataset/search_read/stream', type='http', auth="user")
+    def stream(self, data):
+        """ Sends the records of a search_read without limit, or of the read
+        of ``ids``, as a JSON-RPC response encoded as the records are read
+        ``web_stream_chunk_size`` at a time, so they are never all held in
+        memory.
+
+        Errors reading the first chunk are returned as JSON-RPC errors,
+        later ones (once the response has started) leave it truncated.
+
+        :param str data: JSON object of the ``model``, ``fields``,
+                         ``domain``, ``sort`` and ``context`` of the
+                         search_read, or of the ``ids`` to read
+        """
+        params = simplejson.loads(data)
+        chunks = self.read_chunks(
+            params['model'], params.get('fields') or False, params.get('domain') or [],
+            params.get('sort'), params.get('ids'),
+            params.get('context') or dict(request.session.context))
+        try:
+            first = next(chunks, [])
+        except Exception, e:
+            _logger.exception("Could not read the records of %s", params['model'])
+            return request.make_response(simplejson.dumps({
+                'jsonrpc': '2.0',
+                'id': None,
+                'error': {
+                    'code': 200,
+                    'message': "OpenERP Server Error",
+                    'data': _serialize_exception(e),
+                }
+            }), headers=[('Content-Type', 'application/json')])
+
+        def body():
+            yield '{"jsonrpc": "2.0", "id": null, "result": {"records": ['
+            length = 0
+            try:
+                for records in itertools.chain([first], chunks):
+                    if records:
+                        yield (', ' if length else '') + simplejson.dumps(records)[1:-1]
+                        length += len(records)
+            except Exception:
+                _logger.exception("Could not stream the records of %s", params['model'])
+                return
+            yield '], "length": %d}}' % length
+        return request.make_response(body(), headers=[('Content-Type', 'application/json')])
+
+    def read_chunks(self, model, fields=False, domain=None, sort=None, ids=None, context=None):
+        """ Reads the records of ``model`` matching ``domain`` (through
+        keyset pagination if their sort allows it, see ``keyset_order``),
+        or ``ids``, by chunks of ``web_stream_chunk_size`` records.
+
+        The first chunk is read with the request's cursor, the following
+        ones with a cursor of their own as they are read once the request
+        is over, while its response is sent.
+
+        :returns: generator of lists of records
+        """
+        registry, uid = request.registry, request.uid
+        Model = registry.get(model)
+        if Model is None:
+            raise KeyError(model)
+        keys = ids is None and self.keyset_order(model, sort)
+        order = ', '.join('%s %s' % key for key in keys) if keys else sort or None
+        domain = domain or []
+
+        def read(cr, position, values):
+            """ Reads the chunk of records from ``position``, returns them
+            with whether there may be more and the keys of the last one
+            """
+            if ids is not None:
+                records = Model.read(cr, uid, ids[position:position + STREAM_CHUNK_SIZE],
+                                     fields, context)
+                return records, position + STREAM_CHUNK_SIZE < len(ids), None
+            if keys:
+                records = Model.search_read(
+                    cr, uid, (keyset_predicate(keys, values) if values else []) + domain,
+                    fields, 0, STREAM_CHUNK_SIZE, order, context)
+            else:
+                records = Model.search_read(cr, uid, domain, fields, position,
+                                            STREAM_CHUNK_SIZE, order, context)
+            more = len(records) == STREAM_CHUNK_SIZE
+            if keys and more:
+                values = keyset_values(cr, Model._table, keys, records[-1]['id'])
+            return records, more, values
+
+        records, more, values = read(request.cr, 0, None)
+        yield records
+        if not more:
+            return
+        with registry.cursor() as cr:
+            position = STREAM_CHUNK_SIZE
+            while more:
+                records, more, values = read(cr, position, values)
+                position += STREAM_CHUNK_SIZE
+                yield records
+
+    def keyset_order(self, model, sort=None):
+        """ Parses the sorting directives of records of ``model`` (its
+        ``_order`` by default) into ``(column, direction)`` pairs ending with
+        ``id``, so records can be paged through by comparing these columns.
+
+        :returns: the sort keys, ``None`` if the records are sorted on
+                  columns which are not stored on the model's table, are
+                  translated or relational (sorted by the related records),
+                  or which the user may not read (as their values are read
+                  bypassing read())
+        :rtype: [(str, str)]
+        """
+        Model = request.registry.get(model)
+        if Model is None:
+            return None
+        keys = self.parse_keyset_order(Model, sort)
+        if not keys:
+            return None
+        try:
+            Model.check_field_access_rights(request.cr, request.uid, 'read',
+                                            [name for name, _direction in keys if name != 'id'],
+                                            context=request.context)
+        except openerp.exceptions.AccessError:
+            return None
+        return keys
+
+    def parse_keyset_order(self, Model, sort=None):
+        """ Sort keys of ``sort``, see ``keyset_order``, regardless of the
+        access rights of the user
+        """
+        keys = []
+        for term in (sort or Model._order or 'id').split(','):
+            match = rx_order_term.match(term)
+            if not match:
+                return None
+            name, direction = match.group(1), (match.group(2) or 'asc').lower()
+            if name != 'id':
+                info = Model._all_columns.get(name)
+                column = info and info.column
+                if not column or info.parent_model or column._type not in KEYSET_TYPES \
+                        or getattr(column, 'translate', False) \
+                        or getattr(column, 'password', False) or name == 'password' \
+                        or not (column._classic_write or getattr(column, 'store', False)):
+                    return None
+            keys.append((name, direction))
+            if name == 'id':
+                # unique, following keys are irrelevant
+                return keys
+        keys.append(('id', 'asc'))
+        return keys
+
+    def keyset_cursor(self, model, keys, last_id):
+        """ Opaque token of the record ``last_id``, to fetch the records
+        sorted after it. It only holds the sort ``keys`` and the id of the
+        record, the values of the keys are read again by ``keyset_domain``.
+
+        :rtype: str
+        """
+        return base64.urlsafe_b64encode(simplejson.dumps([keys, last_id]))
+
+    def keyset_domain(self, model, keys, cursor):
+        """ Domain of the records sorted after the record of ``cursor``
+
+        :param keys: sort keys, see ``keyset_order``
+        :param str cursor: token returned by ``keyset_cursor``
+        :returns: the domain, ``None`` if the record is gone
+        :rtype: list
+        """
+        try:
+            cursor_keys, record_id = simplejson.loads(base64.urlsafe_b64decode(str(cursor)))
+        except (TypeError, ValueError):
+            raise ValueError("Invalid pagination cursor %r" % cursor)
+        if [tuple(key) for key in cursor_keys] != list(keys) \
+                or not isinstance(record_id, (int, long)):
+            raise ValueError("Pagination cursor %r does not match the sort order" % cursor)
+
+        Model = request.registry.get(model)
+        cr, uid = request.cr, request.uid
+        # the values of the record must not be compared to those of the
+        # records unless the user may read it
+        context = dict(request.context, active_test=False)
+        if not Model.search(cr, uid, [('id', '=', record_id)], context=context):
+            return None
+        values = keyset_values(cr, Model._table, keys, record_id)
+        return keyset_predicate(keys, values) if values is not None else None
+
+    def estimate_count(self, model, domain=None):
+        """ Database planner's estimate of the number of records of ``model``
+        matching ``domain``, ``None`` if it can not be obtained
+
+        :rtype: int
+        """
+        Model = request.registry.get(model)
+        cr, uid, context = request.cr, request.uid, request.context
+        if Model is None or not Model.check_access_rights(cr, uid, 'read', raise_exception=False):
+            return None
+        cr.execute('SAVEPOINT "web_estimate_count"')
+        try:
+            query = Model._where_calc(cr, uid, domain or [], context=context)
+            Model._apply_ir_rules(cr, uid, query, 'read', context=context)
+            from_clause, where_clause, params = query.get_sql()
+            where = where_clause and ' WHERE %s' % where_clause or ''
+            cr.execute('EXPLAIN SELECT 1 FROM ' + from_clause + where, params)
+            plan = cr.fetchone()[0]
+        except Exception:
+            cr.execute('ROLLBACK TO SAVEPOINT "web_estimate_count"')
+            _logger.debug("Could not estimate the count of %s", model, exc_info=True)
+            return None
+        cr.execute('RELEASE SAVEPOINT "web_estimate_count"')
+        match = rx_plan_rows.search(plan)
+        return int(match.group(1)) if match else None
 
     @http.route('/web/dataset/load', type='json', auth="user")
     def load(self, model, id, fields):
@@ -1105,8 +3026,50 @@ class DataSet(http.Controller):
         return self._call_kw(model, method, args, {})
 
     @http.route(['/web/dataset/call_kw', '/web/dataset/call_kw/<path:path>'], type='json', auth="user")
-    def call_kw(self, model, method, args, kwargs, path=None):
-        return self._call_kw(model, method, args, kwargs)
+    def call_kw(self, model, method, args, kwargs, path=None, format=None):
+        """ Calls ``method`` of ``model``, the records returned by read and
+        search_read can be encoded in another ``format``, see
+        ``format_records``
+        """
+        result = self._call_kw(model, method, args, kwargs)
+        if method in ('read', 'search_read'):
+            result = format_records(model, result, format)
+        return result
+
+    @http.route('/web/dataset/batch', type='json', auth="user")
+    def batch(self, calls):
+        """ Performs the provided calls in order, within a single transaction.
+
+        Each call fails on its own: its changes are rolled back (to a
+        savepoint taken before it) and its error is returned in place of its
+        result, the other calls are performed regardless.
+
+        :param list calls: ``{model, method, args, kwargs}`` of each call,
+                           and the ``format`` of its records, see call_kw
+        :returns: ``{'result': result}`` or ``{'error': error}`` for each call
+        :rtype: list
+        """
+        results = []
+        for index, call in enumerate(calls):
+            savepoint = 'web_dataset_batch_%d' % index
+            request.cr.execute('SAVEPOINT "%s"' % savepoint)
+            try:
+                result = self._call_kw(call['model'], call['method'],
+                                       call.get('args') or [], call.get('kwargs') or {})
+                if call['method'] in ('read', 'search_read'):
+                    result = format_records(call['model'], result, call.get('format'))
+            except Exception, e:
+                request.cr.execute('ROLLBACK TO SAVEPOINT "%s"' % savepoint)
+                _logger.exception("An exception occured during a batched call")
+                results.append({'error': {
+                    'code': 200,
+                    'message': "OpenERP Server Error",
+                    'data': _serialize_exception(e),
+                }})
+            else:
+                request.cr.execute('RELEASE SAVEPOINT "%s"' % savepoint)
+                results.append({'result': result})
+        return results
 
     @http.route('/web/dataset/call_button', type='json', auth="user")
     def call_button(self, model, method, args, domain_id=None, context_id=None):
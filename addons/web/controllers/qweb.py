@@ -0,0 +1,647 @@
+# -*- coding: utf-8 -*-
+""" Server-side precompilation of the web client's QWeb templates
+
+Ports the compiler of ``static/lib/qweb/qweb2.js`` so the templates of a
+``qweb`` bundle can be shipped as ready-made render functions instead of XML
+parsed and compiled by each browser at startup. The generated functions are
+equivalent to the ones ``QWeb2.Engine.compile`` generates for the web
+client's engine, the translation of template strings done by its
+``preprocess_node`` hook happening at render time.
+
+Templates which can not be reproduced exactly (``t-js``, extensions running
+javascript or using selectors the small selector engine below does not
+know, ...) are left to the client, which compiles them from XML as before.
+"""
+import collections
+import logging
+import re
+from xml.parsers import expat
+
+import simplejson
+
+_logger = logging.getLogger(__name__)
+
+PREFIX = 't'
+RESERVED_WORDS = frozenset('true,false,NaN,null,undefined,debugger,console,window,in,instanceof,new,function,return,this,typeof,eval,void,Math,RegExp,Array,Object,Date'.split(','))
+ACTIONS_PRECEDENCE = 'foreach,if,call,set,esc,raw,js,debug,log'.split(',')
+WORD_REPLACEMENT = {
+    'and': '&&',
+    'or': '||',
+    'gt': '>',
+    'gte': '>=',
+    'lt': '<',
+    'lte': '<=',
+}
+#: attributes translated by the web client's ``preprocess_node``
+TRANSLATED_ATTRIBUTES = ('label', 'title', 'alt', 'placeholder')
+
+ELEMENT, TEXT, CDATA, COMMENT = 1, 3, 4, 8
+
+class QWebUnsupported(Exception):
+    """ The template can not be precompiled, the client has to compile it """
+
+class Node(object):
+    """ Minimal DOM node: the compiler and the extension mechanism need text
+    nodes, comments and ordered attributes, as the browser's DOM has them
+    """
+    __slots__ = ('type', 'tag', 'attributes', 'data', 'children', 'parent')
+
+    def __init__(self, type, tag=None, attributes=None, data=None):
+        self.type = type
+        self.tag = tag
+        self.attributes = collections.OrderedDict(attributes or ())
+        self.data = data
+        self.children = []
+        self.parent = None
+
+    def append(self, node):
+        node.parent = self
+        self.children.append(node)
+
+    def clone(self):
+        node = Node(self.type, self.tag, self.attributes.items(), self.data)
+        for child in self.children:
+            node.append(child.clone())
+        return node
+
+    def elements(self):
+        return [c for c in self.children if c.type == ELEMENT]
+
+    def descendants(self):
+        for child in self.elements():
+            yield child
+            for node in child.descendants():
+                yield node
+
+    def to_xml(self):
+        if self.type in (TEXT, CDATA):
+            if self.type == CDATA:
+                return u'<![CDATA[%s]]>' % self.data
+            return xml_escape(self.data)
+        if self.type == COMMENT:
+            return u'<!--%s-->' % self.data
+        tag = u'<' + self.tag + u''.join(
+            u' %s="%s"' % (k, xml_escape(v, True))
+            for k, v in self.attributes.iteritems())
+        if not self.children:
+            return tag + u'/>'
+        return u'%s>%s</%s>' % (
+            tag, u''.join(c.to_xml() for c in self.children), self.tag)
+
+def xml_escape(s, attribute=False):
+    s = s.replace(u'&', u'&amp;').replace(u'<', u'&lt;').replace(u'>', u'&gt;')
+    if attribute:
+        s = s.replace(u'"', u'&quot;').replace(u'\n', u'&#10;')
+    return s
+
+def parse(source):
+    """ Parses an xml document into :class:`Node` s
+
+    :param str source: xml document
+    :returns: the root element
+    """
+    parser = expat.ParserCreate()
+    parser.buffer_text = True
+    parser.ordered_attributes = True
+    stack = [Node(ELEMENT, '#document')]
+    state = {'cdata': False}
+
+    def start(tag, attrs):
+        node = Node(ELEMENT, tag, zip(attrs[::2], attrs[1::2]))
+        stack[-1].append(node)
+        stack.append(node)
+
+    def end(tag):
+        stack.pop()
+
+    def text(data):
+        parent = stack[-1]
+        kind = CDATA if state['cdata'] else TEXT
+        if parent.children and parent.children[-1].type == kind:
+            parent.children[-1].data += data
+        else:
+            parent.append(Node(kind, data=data))
+
+    def comment(data):
+        stack[-1].append(Node(COMMENT, data=data))
+
+    def cdata(flag):
+        def handler():
+            state['cdata'] = flag
+            if flag:
+                # an empty CDATA section is still a node
+                stack[-1].append(Node(CDATA, data=u''))
+        return handler
+
+    parser.StartElementHandler = start
+    parser.EndElementHandler = end
+    parser.CharacterDataHandler = text
+    parser.CommentHandler = comment
+    parser.StartCdataSectionHandler = cdata(True)
+    parser.EndCdataSectionHandler = cdata(False)
+    parser.Parse(source, True)
+    # text outside of the root element is not part of the document
+    return stack[0].elements()[0]
+
+# --------------------------------------------------------------------------
+# jQuery selectors, as used by t-jquery
+# --------------------------------------------------------------------------
+rx_selector_token = re.compile(r"""
+    \s*(?P<combinator>>)\s*
+  | (?P<space>\s+)
+  | (?P<tag>[\w\-]+|\*)
+  | \#(?P<id>[\w\-]+)
+  | \.(?P<class>[\w\-]+)
+  | \[\s*(?P<attr>[\w\-]+)\s*(?:=\s*(?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?P<uq>[\w\-]+))\s*)?\]
+  | :(?P<pseudo>first-child|last-child|first|last|eq\((?P<eq>\d+)\))
+""", re.X | re.U)
+
+def select(selector, context):
+    """ Evaluates a (subset of) jQuery selector: compound selectors made of
+    tag, id, class, attribute and ``:first-child``/``:last-child`` filters,
+    joined by descendant or child combinators. The positional filters
+    ``:first``, ``:last`` and ``:eq(n)`` are supported at the end of the
+    selector, where they filter the whole matched set.
+
+    :param unicode selector:
+    :param Node context: element whose descendants are searched
+    :returns: matched elements, in document order
+    :raises QWebUnsupported: if the selector is not supported
+    """
+    steps = []
+    compound, combinator = [], ' '
+    position = None
+    pos = 0
+    selector = selector.strip()
+    while pos < len(selector):
+        m = rx_selector_token.match(selector, pos)
+        if not m or m.end() == pos:
+            raise QWebUnsupported("selector %r" % selector)
+        pos = m.end()
+        if position is not None:
+            raise QWebUnsupported("positional filter in %r" % selector)
+        if m.group('combinator') or m.group('space'):
+            if compound:
+                steps.append((combinator, compound))
+                compound = []
+            elif steps or m.group('space'):
+                raise QWebUnsupported("selector %r" % selector)
+            combinator = m.group('combinator') or ' '
+            continue
+        pseudo = m.group('pseudo')
+        if pseudo in ('first', 'last') or m.group('eq'):
+            position = pseudo if not m.group('eq') else int(m.group('eq'))
+            # a lone positional filter applies to any element
+            compound.append(('tag', '*'))
+            continue
+        if m.group('tag'):
+            if compound:
+                raise QWebUnsupported("selector %r" % selector)
+            compound.append(('tag', m.group('tag')))
+        elif m.group('id'):
+            compound.append(('attr', 'id', m.group('id')))
+        elif m.group('class'):
+            compound.append(('class', m.group('class')))
+        elif m.group('attr'):
+            value = m.group('dq')
+            if value is None:
+                value = m.group('sq')
+            if value is None:
+                value = m.group('uq')
+            compound.append(('attr', m.group('attr'), value))
+        else:
+            compound.append(('pseudo', pseudo))
+    if not compound:
+        raise QWebUnsupported("selector %r" % selector)
+    steps.append((combinator, compound))
+
+    def matches(node, compound):
+        for f in compound:
+            if f[0] == 'tag':
+                if f[1] != '*' and node.tag != f[1]:
+                    return False
+            elif f[0] == 'class':
+                if f[1] not in node.attributes.get('class', '').split():
+                    return False
+            elif f[0] == 'attr':
+                if f[1] not in node.attributes or \
+                        f[2] is not None and node.attributes[f[1]] != f[2]:
+                    return False
+            else:
+                siblings = node.parent.elements()
+                index = 0 if f[1] == 'first-child' else -1
+                if siblings[index] is not node:
+                    return False
+        return True
+
+    current = [context]
+    for combinator, compound in steps:
+        found, seen = [], set()
+        for node in current:
+            candidates = node.elements() if combinator == '>' else node.descendants()
+            for candidate in candidates:
+                if id(candidate) not in seen and matches(candidate, compound):
+                    seen.add(id(candidate))
+                    found.append(candidate)
+        # keep document order
+        order = dict((id(n), i) for i, n in enumerate(context.descendants()))
+        current = sorted(found, key=lambda n: order[id(n)])
+
+    if position == 'first':
+        return current[:1]
+    if position == 'last':
+        return current[-1:]
+    if position is not None:
+        return current[position:position + 1]
+    return current
+
+def extend(template, extension):
+    """ Applies the ``t-jquery`` rules of ``extension`` to ``template`` like
+    ``QWeb2.Engine.extend`` does
+
+    :raises QWebUnsupported: if a rule is javascript or its selector is not
+                             supported
+    """
+    for child in extension.elements():
+        jquery = child.attributes.get(PREFIX + '-jquery')
+        operation = child.attributes.get(PREFIX + '-operation')
+        if not jquery:
+            raise QWebUnsupported("extension without expression")
+        if operation not in ('append', 'prepend', 'before', 'after', 'replace', 'inner'):
+            raise QWebUnsupported("extension operation %r" % operation)
+        for target in select(jquery, template):
+            content = [node.clone() for node in child.children]
+            if operation == 'inner':
+                for node in target.children:
+                    node.parent = None
+                target.children = []
+                operation_target, index = target, 0
+            elif operation == 'append':
+                operation_target, index = target, len(target.children)
+            elif operation == 'prepend':
+                operation_target, index = target, 0
+            else:
+                operation_target = target.parent
+                index = operation_target.children.index(target)
+                if operation == 'after':
+                    index += 1
+                elif operation == 'replace':
+                    operation_target.children.pop(index)
+                    target.parent = None
+            for node in content:
+                node.parent = operation_target
+            operation_target.children[index:index] = content
+
+# --------------------------------------------------------------------------
+# Compiler
+# --------------------------------------------------------------------------
+def js_escape(s, noquotes=False):
+    """ ``QWeb2.tools.js_escape``
+
+    :raises QWebUnsupported: if ``s`` contains backslashes, which are not
+        escaped: the resulting code may differ from its source or not even
+        be valid, it is up to the client to fail alike
+    """
+    if u'\\' in s:
+        raise QWebUnsupported("backslash in template string")
+    s = re.sub(r'\r?\n', r'\\n', s).replace(u"'", u"\\'")
+    # line separators are not allowed in javascript string literals
+    s = s.replace(u'\u2028', u'\\u2028').replace(u'\u2029', u'\\u2029')
+    return s if noquotes else u"'%s'" % s
+
+def html_escape(s, attribute=False):
+    """ ``QWeb2.tools.html_escape`` """
+    s = s.replace(u'&', u'&amp;').replace(u'<', u'&lt;').replace(u'>', u'&gt;')
+    if attribute:
+        s = s.replace(u'"', u'&quot;')
+    return s
+
+rx_word_start = re.compile(r'[a-zA-Z_\$]')
+rx_non_word = re.compile(r'\W')
+
+def format_expression(e):
+    """ ``QWeb2.Element.format_expression``: prefixes the variables of the
+    expression with ``dict``
+    """
+    chars = list(e) + [u' ']
+    instring = invar = u''
+    invar_pos = 0
+    r = []
+    for i, c in enumerate(chars):
+        if instring:
+            if c == instring and chars[i - 1] != u'\\':
+                instring = u''
+        elif c in (u'"', u"'"):
+            instring = c
+        elif rx_word_start.match(c) and not invar:
+            invar = c
+            invar_pos = i
+            continue
+        elif rx_non_word.match(c) and invar:
+            if (invar_pos == 0 or chars[invar_pos - 1] != u'.') \
+                    and invar not in RESERVED_WORDS:
+                invar = WORD_REPLACEMENT.get(invar) or u"dict['%s']" % invar
+            r.append(invar)
+            invar = u''
+        elif invar:
+            invar += c
+            continue
+        r.append(c)
+    return u''.join(r)[:-1]
+
+def string_interpolation(s):
+    """ ``QWeb2.Element.string_interpolation`` """
+    if not s:
+        return u"''"
+    r = []
+    for i, val in enumerate(s.split(u'#')):
+        m = re.match(r'^{(.*)}(.*)', val, re.S)
+        if m:
+            r.append(u'(%s)' % format_expression(m.group(1)))
+            if m.group(2):
+                r.append(js_escape(m.group(2)))
+        elif not (i == 0 and val == u''):
+            r.append(js_escape((u'' if i == 0 else u'#') + val))
+    return u' + '.join(r)
+
+rx_translatable = re.compile(r'^(\s*)([\s\S]+?)(\s*)$', re.U)
+
+class Element(object):
+    """ ``QWeb2.Element``: compiles a node into a list of operations, either
+    ``(True, escaped_string)`` (static output) or ``(False, code)``
+    """
+    def __init__(self, node):
+        self.node = node
+        self.children = [Element(child) for child in node.children]
+        self.actions = collections.OrderedDict()
+        self.attributes = collections.OrderedDict()
+        for name, value in node.attributes.iteritems():
+            if name.startswith(PREFIX + '-'):
+                name = name[len(PREFIX) + 1:]
+                if name == 'name':
+                    continue
+                self.actions[name] = value
+            else:
+                self.attributes[name] = value
+        self.process_children = True
+        self._top = []
+        self._bottom = []
+
+    def top(self, code):
+        self._top.append((False, code))
+
+    def bottom(self, code):
+        self._bottom.insert(0, (False, code))
+
+    def top_string(self, s):
+        self._top.append((True, js_escape(s, True)))
+
+    def translatable(self, s):
+        """ javascript expression of ``s`` translated as the web client's
+        ``preprocess_node`` does, or ``None`` if ``s`` is not translated
+        """
+        parent = self.node.parent
+        if parent is not None and parent.attributes.get(PREFIX + '-translation') == 'off':
+            return None
+        m = rx_translatable.match(s)
+        if not m or not m.group(2).strip():
+            return None
+        parts = [u'_t(%s)' % js_escape(m.group(2))]
+        if m.group(1):
+            parts.insert(0, js_escape(m.group(1)))
+        if m.group(3):
+            parts.append(js_escape(m.group(3)))
+        return u' + '.join(parts)
+
+    def compile(self):
+        if self.node.type in (TEXT, CDATA):
+            translated = self.translatable(self.node.data)
+            if translated is None:
+                self.top_string(self.node.data)
+            else:
+                self.top(u'r.push(%s);' % translated)
+        elif self.node.type == ELEMENT:
+            self.compile_element()
+        ops = list(self._top)
+        if self.process_children:
+            for child in self.children:
+                ops.extend(child.compile())
+        ops.extend(self._bottom)
+        return ops
+
+    def compile_element(self):
+        for action in ACTIONS_PRECEDENCE:
+            if action in self.actions:
+                getattr(self, 'compile_action_' + action)(self.actions[action])
+        if self.node.tag.lower() == PREFIX:
+            return
+        tag = u'<' + self.node.tag
+        for name, value in self.attributes.iteritems():
+            if name in TRANSLATED_ATTRIBUTES and value:
+                self.top_string(tag)
+                tag = u''
+                self.top(u"r.push(context.engine.tools.gen_attribute([%s, _t(%s)]));" % (
+                    js_escape(name), js_escape(value)))
+            else:
+                tag += u' %s="%s"' % (name, html_escape(value, True))
+        self.top_string(tag)
+        if self.actions.get('att'):
+            self.top(u"r.push(context.engine.tools.gen_attribute(%s));" % format_expression(self.actions['att']))
+        for name, value in self.actions.iteritems():
+            m = re.search(r'att-(.+)', name)
+            if m:
+                self.top(u"r.push(context.engine.tools.gen_attribute(['%s', (%s)]));" % (
+                    m.group(1), format_expression(value)))
+            m = re.search(r'attf-(.+)', name)
+            if m:
+                self.top(u"r.push(context.engine.tools.gen_attribute(['%s', (%s)]));" % (
+                    m.group(1), string_interpolation(value)))
+        if self.children or self.actions.get('opentag') == 'true':
+            self.top_string(u'>')
+            self._bottom.insert(0, (True, js_escape(u'</%s>' % self.node.tag, True)))
+        else:
+            self.top_string(u'/>')
+
+    def compile_action_if(self, value):
+        self.top(u'if (%s) {' % format_expression(value))
+        self.bottom(u'}')
+
+    def compile_action_foreach(self, value):
+        as_ = self.actions.get('as') or re.sub(r'[^a-zA-Z0-9]', '_', value)
+        self.top(u'context.engine.tools.foreach(context, %s, %s, dict, function(context, dict) {' % (
+            format_expression(value), js_escape(as_)))
+        self.bottom(u'});')
+
+    def compile_action_call(self, value):
+        _import = self.actions.get('import') or u''
+        if not self.children:
+            self.top(u'r.push(context.engine.tools.call(context, %s, dict, %s));' % (
+                js_escape(value), js_escape(_import)))
+        else:
+            self.top(u'r.push(context.engine.tools.call(context, %s, dict, %s, function(context, dict) {' % (
+                js_escape(value), js_escape(_import)))
+            self.bottom(u'}));')
+            self.top(u'var r = [];')
+            self.bottom(u"return r.join('');")
+
+    def compile_action_set(self, value):
+        variable = format_expression(value)
+        if self.actions.get('value'):
+            self.top(u'%s = (%s);' % (variable, format_expression(self.actions['value'])))
+            self.process_children = False
+        elif not self.children:
+            self.top(u"%s = '';" % variable)
+        elif len(self.children) == 1 and self.children[0].node.type == TEXT:
+            data = self.children[0].node.data
+            translated = self.children[0].translatable(data)
+            if translated is None:
+                translated = js_escape(data)
+            self.top(u'%s = %s;' % (variable, translated))
+            self.process_children = False
+        else:
+            self.top(u'%s = (function(dict) {' % variable)
+            self.bottom(u'})(dict);')
+            self.top(u'var r = [];')
+            self.bottom(u"return r.join('');")
+
+    def compile_action_esc(self, value):
+        self.top(u'r.push(context.engine.tools.html_escape(%s));' % format_expression(value))
+
+    def compile_action_raw(self, value):
+        self.top(u'r.push(%s);' % format_expression(value))
+
+    def compile_action_js(self, value):
+        raise QWebUnsupported("t-js")
+
+    def compile_action_debug(self, value):
+        self.top(u'debugger;')
+
+    def compile_action_log(self, value):
+        self.top(u'console.log(%s);' % format_expression(value))
+
+def compile_template(node):
+    """ Compiles a template like ``QWeb2.Engine.compile`` (out of debug mode)
+
+    :param Node node: the template's root element
+    :returns: javascript source of the render function
+    :rtype: unicode
+    :raises QWebUnsupported: if the template can not be precompiled
+    """
+    name = node.attributes.get(PREFIX + '-name', u'')
+    lines = [
+        u'function(dict) {',
+        u'var context = { engine : this, template : %s };' % js_escape(name),
+        u'dict = dict || {};',
+        u"dict['__template__'] = %s;" % js_escape(name),
+        u'var r = [];',
+        u'try {',
+    ]
+    strings = []
+    for is_string, op in Element(node).compile():
+        if is_string:
+            strings.append(op)
+            continue
+        if strings:
+            lines.append(u"r.push('%s');" % u''.join(strings))
+            strings = []
+        lines.append(op)
+    if strings:
+        lines.append(u"r.push('%s');" % u''.join(strings))
+    lines += [
+        u'} catch(error) {',
+        u'if (console && console.exception) console.exception(error);',
+        u"context.engine.tools.exception('Runtime Error: ' + error, context);",
+        u'}',
+        u"return r.join('');",
+        u'}',
+    ]
+    return u'\n'.join(lines)
+
+def precompile(sources):
+    """ Compiles the templates of a set of qweb files, mimicking the way
+    successive ``QWeb2.Engine.add_template`` calls register them.
+
+    Each template defined by the files is registered with its render
+    function and the source of its (extended) definition, so the client can
+    extend it further. Templates which can not be precompiled are registered
+    with their raw definition and their pending extensions instead, for the
+    client to apply and compile them on first render.
+
+    Nodes cloning or extending templates the files do not define are passed
+    to the client's ``add_template``, as they depend on templates it loaded
+    beforehand.
+
+    :param list(str) sources: content of the xml files, in loading order
+    :returns: javascript code registering the templates on the web client's
+              engine
+    :rtype: str
+    """
+    templates = collections.OrderedDict()
+    extensions = collections.defaultdict(list)
+    # nodes handed to the client's add_template, and the names they define
+    leftovers, tainted = [], set()
+
+    def leave(node, name=None):
+        leftovers.append(node)
+        if name and name not in tainted:
+            tainted.add(name)
+            # this node overrides the definition of the template, previous
+            # extensions apply to it on the client
+            templates.pop(name, None)
+            leftovers.extend(extensions.pop(name, []))
+
+    position = {}
+    for source in sources:
+        for node in parse(source).elements():
+            position[id(node)] = len(position)
+            name = node.attributes.get(PREFIX + '-name')
+            extend_name = node.attributes.get(PREFIX + '-extend')
+            if name and extend_name:
+                # clone template and extend it
+                if name in tainted or extend_name not in templates:
+                    leave(node, name)
+                    continue
+                templates.pop(name, None)
+                templates[name] = templates[extend_name].clone()
+                extensions[name].append(node)
+            elif name:
+                if name in tainted:
+                    leave(node)
+                    continue
+                templates.pop(name, None)
+                templates[name] = node
+            elif extend_name:
+                if extend_name in tainted:
+                    leave(node)
+                    continue
+                extensions[extend_name].append(node)
+
+    registered = []
+    for name, node in templates.iteritems():
+        template = node.clone()
+        template_extensions = extensions.pop(name, [])
+        try:
+            for extension in template_extensions:
+                extend(template, extension)
+            entry = u'[%s, %s]' % (compile_template(template),
+                                   simplejson.dumps(template.to_xml()))
+        except QWebUnsupported, e:
+            _logger.debug("Template %s left to the client: %s", name, e)
+            entry = u'[null, %s, %s]' % (simplejson.dumps(node.to_xml()), simplejson.dumps(
+                [extension.to_xml() for extension in template_extensions]))
+        registered.append(u'%s: %s' % (simplejson.dumps(name), entry))
+    # extensions of templates of other bundles
+    for nodes in extensions.itervalues():
+        leftovers.extend(nodes)
+
+    leftovers.sort(key=lambda node: position[id(node)])
+    xml = u''
+    if leftovers:
+        xml = u'<templates>%s</templates>' % u''.join(
+            node.to_xml() for node in leftovers)
+    return (
+        u"(function () {\n"
+        u"var _t = function (s) { return openerp.web._t(s); };\n"
+        u"openerp.web.qweb.add_precompiled({\n%s\n}, %s);\n"
+        u"})();\n" % (u',\n'.join(registered), simplejson.dumps(xml))
+    ).encode('utf-8')
@@ -220,6 +220,7 @@ QWeb2.Engine = (function() {
         this.actions_precedence = QWeb2.ACTIONS_PRECEDENCE.slice(0);
         this.word_replacement = QWeb2.tools.extend({}, QWeb2.WORD_REPLACEMENT);
         this.preprocess_node = null;
+        this.precompiled_count = 0;
         for (var i = 0; i < arguments.length; i++) {
             this.add_template(arguments[i]);
         }
@@ -262,7 +263,7 @@ QWeb2.Engine = (function() {
                         if (!this.templates[extend]) {
                             return this.tools.exception("Can't clone undefined template " + extend);
                         }
-                        this.templates[name] = this.templates[extend].cloneNode(true);
+                        this.templates[name] = this.get_template_node(extend).cloneNode(true);
                         extend = name;
                         name = undefined;
                     }
@@ -284,6 +285,39 @@ QWeb2.Engine = (function() {
             }
             return true;
         },
+        /**
+         * Add templates compiled beforehand (e.g. server-side)
+         *
+         * @param {Object} templates Maps template names to [render function or null, source of the template, [sources of its pending extensions]]
+         * @param {String} [xml] Templates to add afterwards with add_template
+         */
+        add_precompiled : function(templates, xml) {
+            for (var name in templates) {
+                if (templates.hasOwnProperty(name)) {
+                    var t = templates[name];
+                    var pending = (this.extend_templates[name] || []).concat(t[2] || []);
+                    this.templates[name] = t[1];
+                    this.compiled_templates[name] = pending.length ? null : t[0];
+                    if (pending.length) {
+                        this.extend_templates[name] = pending;
+                    }
+                }
+            }
+            if (xml) {
+                this.add_template(xml);
+            }
+            this.precompiled_count++;
+        },
+        /**
+         * Returns the node of a template, parsing the source of precompiled templates on demand
+         */
+        get_template_node : function(template) {
+            var node = this.templates[template];
+            if (node && node.constructor === String) {
+                node = this.templates[template] = this.load_xml_string(node).documentElement;
+            }
+            return node;
+        },
         load_xml : function(s, callback) {
             var self = this;
             var async = !!callback;
@@ -402,10 +436,13 @@ QWeb2.Engine = (function() {
                 if (ext = this.extend_templates[template]) {
                     var extend_node;
                     while (extend_node = ext.shift()) {
+                        if (extend_node.constructor === String) {
+                            extend_node = this.load_xml_string(extend_node).documentElement;
+                        }
                         this.extend(template, extend_node);
                     }
                 }
-                var code = this.compile(this.templates[template]), tcompiled;
+                var code = this.compile(this.get_template_node(template)), tcompiled;
                 try {
                     tcompiled = new Function(['dict'], code);
                 } catch (error) {
@@ -427,7 +464,7 @@ QWeb2.Engine = (function() {
             if (!this.jQuery) {
                 return this.tools.exception("Can't extend template " + template + " without jQuery");
             }
-            var template_dest = this.templates[template];
+            var template_dest = this.get_template_node(template);
             for (var i = 0, ilen = extend_node.childNodes.length; i < ilen; i++) {
                 var child = extend_node.childNodes[i];
                 if (child.nodeType === 1) {
@@ -936,7 +936,18 @@ instance.web.Menu =  instance.web.Widget.extend({
     },
     do_reload: function() {
         var self = this;
-        return this.rpc("/web/menu/load", {}).done(function(r) {
+        var session = this.session;
+        // menus fetched along with the modules at startup
+        var menus = session.bootstrap_menus;
+        session.bootstrap_menus = null;
+        if (!menus && !session.bootstrap_unavailable) {
+            menus = this.rpc("/web/webclient/checksums", {}).then(function(checksums) {
+                return session.load_cached('menus', checksums.menus, function() {
+                    return self.rpc("/web/menu/load", {});
+                });
+            });
+        }
+        return $.when(menus || this.rpc("/web/menu/load", {})).done(function(r) {
             self.menu_loaded(r);
         });
     },
@@ -218,6 +218,7 @@ instance.web.Session.include( /** @lends instance.web.Session# */{
         this.user_context= {};
         this.db = null;
         this.module_list = instance._modules.slice();
+        this.lazy_modules = {};
         this.module_loaded = {};
         _(this.module_list).each(function (mod) {
             self.module_loaded[mod] = true;
@@ -230,9 +231,9 @@ instance.web.Session.include( /** @lends instance.web.Session# */{
      */
     session_init: function () {
         var self = this;
-        return this.session_reload().then(function(result) {
+        return this.session_bootstrap().then(function(result) {
             var modules = instance._modules.join(',');
-            var deferred = self.rpc('/web/webclient/qweblist', {mods: modules}).then(self.load_qweb.bind(self));
+            var deferred = self.load_templates(modules, result && result.templates);
             if(self.session_is_valid()) {
                 return deferred.then(function() { return self.load_modules(); });
             }
@@ -244,6 +245,128 @@ instance.web.Session.include( /** @lends instance.web.Session# */{
             );
         });
     },
+    /**
+     * Reloads the session along with what the client needs to start, in a
+     * single request when the server provides it
+     *
+     * @returns {$.Deferred} resolved with the bootstrap data, or null
+     */
+    session_bootstrap: function() {
+        var self = this;
+        return this.fetch_bootstrap(instance._modules).then(function(result) {
+            if (!result) {
+                return self.session_reload().then(function() { return null; });
+            }
+            delete result.session.session_id;
+            _.extend(self, result.session);
+            // kept for load_modules, only useful to an authenticated session
+            self.bootstrap = result.modules ? result : null;
+            return result;
+        });
+    },
+    /**
+     * Fetches in a single request the session's information and, for an
+     * authenticated session, the modules to load, their assets, the
+     * translations and the menus
+     *
+     * @param {Array} mods modules already loaded by the client
+     * @returns {$.Deferred} resolved with the bootstrap data, or null if it
+     *                       could not be fetched
+     */
+    fetch_bootstrap: function(mods) {
+        var self = this;
+        if (this.bootstrap_unavailable) {
+            return $.when(null);
+        }
+        var fetched = $.Deferred();
+        this.cache_get('menus').then(function(menus) {
+            var params = {mods: mods, debug: self.debug, cached: {menus: menus && menus.checksum}};
+            var attempt = function(retries) {
+                self.rpc('/web/webclient/bootstrap', params).then(function(result) {
+                    if (result.checksums) {
+                        // the server leaves out the menus we already have
+                        if (result.menus) {
+                            self.cache_set('menus', result.checksums.menus, result.menus);
+                        } else {
+                            result.menus = menus.payload;
+                        }
+                    }
+                    fetched.resolve(result);
+                }, function(error, event) {
+                    event.preventDefault();
+                    var xhr = error.code === -32098 && error.data.objects[0];
+                    if (xhr && xhr.status === 404) {
+                        // the server does not provide the endpoint, do not ask again
+                        self.bootstrap_unavailable = true;
+                    } else if (xhr && retries) {
+                        // network hiccup
+                        setTimeout(function() { attempt(retries - 1); }, 500);
+                        return;
+                    }
+                    fetched.resolve(null);
+                });
+            };
+            attempt(1);
+        });
+        return fetched;
+    },
+    /**
+     * Persistent store of the payloads the server identifies by a checksum
+     * (translations, menus), null if the browser does not support it
+     */
+    payload_store: function() {
+        if (this._payload_store === undefined) {
+            var store = new instance.web.SimpleIndexedDB({name: 'openerp.web.cache'});
+            this._payload_store = store.isSupportedByBrowser() ? store : null;
+        }
+        return this._payload_store;
+    },
+    /**
+     * Reads the payload cached under ``name``
+     *
+     * @returns {$.Deferred} resolved with the cached {checksum, payload}, or
+     *                       null if there is none
+     */
+    cache_get: function(name) {
+        var store = this.payload_store();
+        var def = $.Deferred();
+        if (!store) {
+            return def.resolve(null);
+        }
+        store.getItem(name).then(function(entry) {
+            def.resolve(entry || null);
+        }, function() {
+            def.resolve(null);
+        });
+        return def;
+    },
+    cache_set: function(name, checksum, payload) {
+        var store = this.payload_store();
+        if (store) {
+            // a failure only costs a fetch at the next start
+            store.setItem(name, {checksum: checksum, payload: payload});
+        }
+    },
+    /**
+     * Returns the payload cached under ``name`` if its checksum is the
+     * provided one, otherwise fetches it and caches it
+     *
+     * @param {String} name
+     * @param {String} checksum current checksum of the payload
+     * @param {Function} fetch returns a deferred resolved with the payload
+     * @returns {$.Deferred}
+     */
+    load_cached: function(name, checksum, fetch) {
+        var self = this;
+        return this.cache_get(name).then(function(entry) {
+            if (entry && entry.checksum === checksum) {
+                return entry.payload;
+            }
+            return fetch().done(function(payload) {
+                self.cache_set(name, checksum, payload);
+            });
+        });
+    },
     session_is_valid: function() {
         var db = $.deparam.querystring().db;
         if (db && this.db !== db) {
@@ -300,39 +423,133 @@ instance.web.Session.include( /** @lends instance.web.Session# */{
      */
     load_modules: function() {
         var self = this;
-        return this.rpc('/web/session/modules', {}).then(function(result) {
-            var all_modules = _.uniq(self.module_list.concat(result));
-            var to_load = _.difference(result, self.module_list).join(',');
-            self.module_list = all_modules;
-
-            var loaded = self.load_translations();
-            var datejs_locale = "/web/static/lib/datejs/globalization/" + self.user_context.lang.replace("_", "-") + ".js";
-
-            var file_list = [ datejs_locale ];
-            if(to_load.length) {
-                loaded = $.when(
-                    loaded,
-                    self.rpc('/web/webclient/csslist', {mods: to_load}).done(self.load_css.bind(self)),
-                    self.rpc('/web/webclient/qweblist', {mods: to_load}).then(self.load_qweb.bind(self)),
-                    self.rpc('/web/webclient/jslist', {mods: to_load}).done(function(files) {
-                        file_list = file_list.concat(files);
-                    })
-                );
+        var bootstrap = this.bootstrap;
+        this.bootstrap = null;
+        return $.when(bootstrap || this.fetch_bootstrap(this.module_list)).then(function(bootstrap) {
+            if (bootstrap && bootstrap.modules) {
+                // consumed by the menu's first load
+                self.bootstrap_menus = bootstrap.menus;
+                _.extend(self.lazy_modules, bootstrap.lazy);
+                var translations = self.load_cached('translations', bootstrap.checksums.translations, function() {
+                    // cacheable by the browser, unlike an rpc
+                    return $.ajax({
+                        url: self.url(bootstrap.translations_url, null),
+                        dataType: 'json'
+                    });
+                }).then(function(trans) {
+                    instance.web._t.database.set_bundle(trans);
+                }, function() {
+                    return self.load_translations();
+                });
+                return self.load_addons(bootstrap.modules, translations, function(to_load, file_list) {
+                    self.load_css(bootstrap.assets.css);
+                    file_list.push.apply(file_list, bootstrap.assets.js);
+                    return self.load_templates(to_load, bootstrap.assets.templates);
+                });
+            }
+            return self.rpc('/web/session/modules', {}).then(function(result) {
+                return self.load_addons(result, self.load_translations(), function(to_load, file_list) {
+                    return $.when(
+                        self.rpc('/web/webclient/csslist', {mods: to_load}).done(self.load_css.bind(self)),
+                        self.load_templates(to_load),
+                        self.rpc('/web/webclient/jslist', {mods: to_load}).done(function(files) {
+                            file_list.push.apply(file_list, files);
+                        })
+                    );
+                });
+            });
+        });
+    },
+    /**
+     * Loads and initializes the provided modules the client did not load yet
+     *
+     * @param {Array} modules installed modules
+     * @param {$.Deferred} loaded translations loading
+     * @param {Function} load_assets loads the css and templates of the
+     *                   comma-separated modules it is given, and adds their
+     *                   javascript files to the provided list
+     */
+    load_addons: function(modules, loaded, load_assets) {
+        var self = this;
+        var all_modules = _.uniq(self.module_list.concat(modules));
+        var to_load = _.difference(modules, self.module_list).join(',');
+        self.module_list = all_modules;
+
+        var datejs_locale = "/web/static/lib/datejs/globalization/" + self.user_context.lang.replace("_", "-") + ".js";
+
+        var file_list = [ datejs_locale ];
+        if(to_load.length) {
+            loaded = $.when(loaded, load_assets(to_load, file_list));
+        }
+        return loaded.then(function () {
+            return self.load_js(file_list);
+        }).done(function() {
+            self.on_modules_loaded();
+            self.trigger('module_loaded');
+            if (!Date.CultureInfo.pmDesignator) {
+                // If no am/pm designator is specified but the openerp
+                // datetime format uses %i, date.js won't be able to
+                // correctly format a date. See bug#938497.
+                Date.CultureInfo.amDesignator = 'AM';
+                Date.CultureInfo.pmDesignator = 'PM';
             }
-            return loaded.then(function () {
-                return self.load_js(file_list);
-            }).done(function() {
+        });
+    },
+    /**
+     * Loads and initializes a module the server left out of the startup,
+     * along with the ones it depends on
+     *
+     * @param {String} mod name of the module
+     * @returns {$.Deferred} resolved once the module is initialized
+     */
+    load_lazy_module: function(mod) {
+        var self = this;
+        var lazy = this.lazy_modules[mod];
+        if (!lazy) {
+            return $.when();
+        }
+        if (!lazy.loaded) {
+            lazy.loaded = $.when.apply($, _.map(lazy.depends, this.load_lazy_module, this)).then(function() {
+                self.load_css(lazy.assets.css);
+                return self.load_templates(mod, lazy.assets.templates);
+            }).then(function() {
+                return self.load_js(lazy.assets.js.slice());
+            }).then(function() {
+                self.module_list.push(mod);
                 self.on_modules_loaded();
-                self.trigger('module_loaded');
-                if (!Date.CultureInfo.pmDesignator) {
-                    // If no am/pm designator is specified but the openerp
-                    // datetime format uses %i, date.js won't be able to
-                    // correctly format a date. See bug#938497.
-                    Date.CultureInfo.amDesignator = 'AM';
-                    Date.CultureInfo.pmDesignator = 'PM';
-                }
             });
+        }
+        return lazy.loaded;
+    },
+    /**
+     * Loads the module providing the ``view_type`` views, if it was left out
+     * of the startup
+     *
+     * @param {String} view_type
+     * @returns {$.Deferred|null} the loading of the module, null if no module
+     *                            has to be loaded
+     */
+    load_view_module: function(view_type) {
+        var mod = _.find(_.keys(this.lazy_modules), function(mod) {
+            return _.has(this.lazy_modules[mod].views, view_type);
+        }, this);
+        if (!mod || _.include(this.module_list, mod)) {
+            return null;
+        }
+        return this.load_lazy_module(mod);
+    },
+    /**
+     * Translated label of the ``view_type`` views of a module left out of
+     * the startup, as listed by its manifest
+     *
+     * @param {String} view_type
+     * @returns {String}
+     */
+    lazy_view_label: function(view_type) {
+        var views = _.find(_.pluck(this.lazy_modules, 'views'), function(views) {
+            return _.has(views, view_type);
         });
+        return views ? instance.web._t(views[view_type]) : _.str.capitalize(view_type);
     },
     load_translations: function() {
         return instance.web._t.database.load_translations(this, this.module_list, this.user_context.lang);
@@ -370,6 +587,61 @@ instance.web.Session.include( /** @lends instance.web.Session# */{
         }
         return d;
     },
+    /**
+     * Loads the templates of the provided modules: precompiled by the
+     * server, or as xml files in debug mode and if precompiled templates
+     * can not be loaded
+     *
+     * @param {String} modules comma-separated list of modules
+     * @param {Array} [files] the templates files of the modules, if already
+     *                        known
+     */
+    load_templates: function(modules, files) {
+        var self = this;
+        var load_xml = function() {
+            return self.rpc('/web/webclient/qweblist', {mods: modules}).then(self.load_qweb.bind(self));
+        };
+        if (this.debug) {
+            return files ? this.load_qweb(files) : load_xml();
+        }
+        var loaded = $.Deferred();
+        this.qweb_mutex.exec(function() {
+            var listed = files ? $.when(files) : self.rpc('/web/webclient/qwebjslist', {mods: modules});
+            return listed.then(function(files) {
+                return self.load_qweb_js(files);
+            }).then(loaded.resolve, loaded.reject);
+        });
+        return loaded.then(null, load_xml);
+    },
+    /**
+     * Loads bundles of precompiled templates, fails if one of them can not
+     * be loaded or did not register its templates
+     */
+    load_qweb_js: function(files) {
+        var self = this;
+        var engine = instance.web.qweb;
+        var expected = engine.precompiled_count + files.length;
+        var head = document.head || document.getElementsByTagName('head')[0];
+        if (!files.length) {
+            return $.Deferred().reject();
+        }
+        return $.when.apply($, _.map(files, function(file) {
+            var d = $.Deferred();
+            var tag = document.createElement('script');
+            tag.type = 'text/javascript';
+            // keep the order of the files
+            tag.async = false;
+            tag.src = self.url(file, null);
+            tag.onload = function() { d.resolve(); };
+            tag.onerror = function() { d.reject(); };
+            head.appendChild(tag);
+            return d;
+        })).then(function() {
+            if (engine.precompiled_count !== expected) {
+                return $.Deferred().reject();
+            }
+        });
+    },
     load_qweb: function(files) {
         var self = this;
         _.each(files, function(file) {
@@ -21,6 +21,39 @@ instance.web.serialize_sort = function (criterion) {
         }).join(', ');
 };
 
+/**
+ * Rebuilds the records encoded in the ``columnar`` format by the dataset
+ * controllers (field names once, one array of values per field and the
+ * many2one pairs in a side table), other values are returned as they are.
+ *
+ * @param {Object|Array} payload the records, possibly encoded
+ * @returns {Array} the records
+ */
+instance.web.decode_records = function (payload) {
+    if (!payload || payload.format !== 'columnar') {
+        return payload;
+    }
+    var fields = payload.fields,
+        columns = payload.columns,
+        tables = _.map(fields, function (field) {
+            return payload.relations[field];
+        }),
+        records = new Array(payload.length);
+    for (var i = 0; i < payload.length; ++i) {
+        var record = {};
+        for (var j = 0; j < fields.length; ++j) {
+            var value = columns[j][i];
+            if (tables[j] && value !== false && value !== null) {
+                // copied as records are altered in place
+                value = tables[j][value].slice();
+            }
+            record[fields[j]] = value;
+        }
+        records[i] = record;
+    }
+    return records;
+};
+
 instance.web.Query = instance.web.Class.extend({
     init: function (model, fields) {
         this._model = model;
@@ -30,6 +63,8 @@ instance.web.Query = instance.web.Class.extend({
         this._limit = false;
         this._offset = 0;
         this._order_by = [];
+        this._count_mode = null;
+        this._cursor = null;
     },
     clone: function (to_set) {
         to_set = to_set || {};
@@ -39,6 +74,8 @@ instance.web.Query = instance.web.Class.extend({
         q._limit = this._limit;
         q._offset = this._offset;
         q._order_by = this._order_by;
+        q._count_mode = this._count_mode;
+        q._cursor = this._cursor;
 
         for(var key in to_set) {
             if (!to_set.hasOwnProperty(key)) { continue; }
@@ -54,6 +91,8 @@ instance.web.Query = instance.web.Class.extend({
             case 'limit':
             case 'offset':
             case 'order_by':
+            case 'count_mode':
+            case 'cursor':
                 q['_' + key] = to_set[key];
             }
         }
@@ -61,7 +100,7 @@ instance.web.Query = instance.web.Class.extend({
     },
     _execute: function () {
         var self = this;
-        return instance.session.rpc('/web/dataset/search_read', {
+        var params = {
             model: this._model.name,
             fields: this._fields || false,
             domain: instance.web.pyeval.eval('domains',
@@ -70,10 +109,23 @@ instance.web.Query = instance.web.Class.extend({
                     [this._model.context(this._context)]),
             offset: this._offset,
             limit: this._limit,
-            sort: instance.web.serialize_sort(this._order_by)
-        }).then(function (results) {
-            self._count = results.length;
-            return results.records;
+            sort: instance.web.serialize_sort(this._order_by),
+            format: 'columnar'
+        };
+        if (this._count_mode) {
+            params.count = this._count_mode;
+        }
+        if (this._cursor) {
+            params.cursor = this._cursor;
+        }
+        return instance.session.rpc('/web/dataset/search_read', params).then(function (results) {
+            // not counted in lazy mode, see count()
+            if (results.length !== null) {
+                self._count = results.length;
+            }
+            self._count_estimated = !!results.length_estimated;
+            self._next_cursor = results.cursor || null;
+            return instance.web.decode_records(results.records);
         }, null);
     },
     /**
@@ -192,6 +244,30 @@ instance.web.Query = instance.web.Class.extend({
     offset: function (offset) {
         return this.clone({offset: offset});
     },
+    /**
+     * Creates a new query with the provided counting mode of the matching
+     * records: ``exact`` (the default), ``estimate`` or ``lazy`` (counted by
+     * a separate call to count())
+     *
+     * @param {String} mode
+     * @returns {openerp.web.Query}
+     */
+    count_mode: function (mode) {
+        return this.clone({count_mode: mode});
+    },
+    /**
+     * Creates a new query paging through records by sort keys rather than
+     * by offset: the records following those of a previous query are
+     * fetched with the cursor that query got (``_next_cursor``, set if the
+     * server could page through the records that way), the first ones with
+     * ``true``.
+     *
+     * @param {String|Boolean} cursor
+     * @returns {openerp.web.Query}
+     */
+    cursor: function (cursor) {
+        return this.clone({cursor: cursor});
+    },
     /**
      * Creates a new query with the provided ordering parameters replacing
      * those of the current query
@@ -451,7 +527,8 @@ instance.web.DataSet =  instance.web.Class.extend(instance.web.PropertiesMixin,
         // TODO: reorder results to match ids list
         return this._model.call('read',
             [ids, fields || false],
-            {context: this.get_context(options.context)});
+            {context: this.get_context(options.context)},
+            {format: 'columnar'}).then(instance.web.decode_records);
     },
     /**
      * Read a slice of the records represented by this DataSet, based on its
@@ -724,22 +801,103 @@ instance.web.DataSetSearch =  instance.web.DataSet.extend({
      * @param {Array} [options.domain] domain data to add to the request payload, ANDed with the dataset's domain
      * @param {Number} [options.offset=0] The index from which selected records should be returned
      * @param {Number} [options.limit=null] The maximum number of records to return
+     * @param {String} [options.count='exact'] The counting mode of the records
+     *        matching the domain, see instance.web.Query#count_mode. The
+     *        dataset triggers ``length_changed`` once the records counted
+     *        lazily are.
+     * @param {Boolean} [options.cursor=false] Whether to read the slice
+     *        following the previous one by sort keys rather than by offset,
+     *        see instance.web.Query#cursor
+     * @param {Boolean} [options.stream=true] Whether to read all the records
+     *        (without limit nor offset) through stream_records
      * @returns {$.Deferred}
      */
     read_slice: function (fields, options) {
         options = options || {};
         var self = this;
+        var offset = options.offset || 0;
+        if (!options.limit && !offset && options.stream !== false
+                && instance.session.origin_server) {
+            return this.stream_records(fields, options).then(null, function () {
+                // incomplete response, read them the usual way
+                return self.read_slice(fields, _.extend({}, options, {stream: false}));
+            }).done(function (records) {
+                self.ids = _(records).pluck('id');
+                self._length = records.length;
+                self._length_estimated = false;
+            });
+        }
         var q = this._model.query(fields || false)
             .filter(options.domain)
             .context(options.context)
-            .offset(options.offset || 0)
-            .limit(options.limit || false);
+            .offset(offset)
+            .limit(options.limit || false)
+            .count_mode(options.count || null);
         q = q.order_by.apply(q, this._sort);
 
+        var cursor_key;
+        if (options.cursor && options.limit) {
+            cursor_key = JSON.stringify([this.domain, options.domain, this._sort]);
+            var next = this._next_slice;
+            q = q.cursor(next && next.key === cursor_key && next.offset === offset
+                         ? next.cursor : true);
+        }
+
         return q.all().done(function (records) {
-            // FIXME: not sure about that one, *could* have discarded count
-            q.count().done(function (count) { self._length = count; });
             self.ids = _(records).pluck('id');
+            self._next_slice = q._next_cursor && {
+                key: cursor_key,
+                offset: offset + records.length,
+                cursor: q._next_cursor
+            };
+            if (q._count !== undefined) {
+                self._length = q._count;
+                self._length_estimated = q._count_estimated;
+                return;
+            }
+            // there are at least the records up to this page
+            self._length = (options.offset || 0) + records.length;
+            self._length_estimated = true;
+            q.count().done(function (count) {
+                self._length = count;
+                self._length_estimated = false;
+                self.trigger('length_changed', count);
+            });
+        });
+    },
+    /**
+     * Reads all the records matching the domain from the streaming endpoint,
+     * which does not hold them all in the server's memory. Fails on server
+     * errors and truncated responses.
+     *
+     * @param {Array} [fields] fields to read, all of them by default
+     * @param {Object} [options] the domain and context of the records, see read_slice
+     * @returns {$.Deferred}
+     */
+    stream_records: function (fields, options) {
+        options = options || {};
+        var session = instance.session;
+        var data = JSON.stringify({
+            model: this.model,
+            fields: fields || false,
+            domain: instance.web.pyeval.eval('domains',
+                    [this._model.domain(options.domain)]),
+            context: instance.web.pyeval.eval('contexts',
+                    [this._model.context(options.context)]),
+            sort: instance.web.serialize_sort(this._sort)
+        });
+        session.trigger('request');
+        return $.ajax(session.url('/web/dataset/search_read/stream', null), {
+            type: 'POST',
+            dataType: 'json',
+            data: {data: data}
+        }).always(function () {
+            session.trigger('response');
+        }).then(function (response) {
+            if (response.error) {
+                return $.Deferred().reject();
+            }
+            return response.result.records;
         });
     },
     get_domain: function (other_domain) {
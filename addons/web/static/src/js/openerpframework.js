@@ -942,6 +942,8 @@ openerp.Session = openerp.Class.extend(openerp.PropertiesMixin, {
         * "session_id": Default to null. If specified, the specified session_id will be used
           by this session object. Specifying this option automatically implies that the option
           "override_session" is set to true.
+        * "coalesce_calls": Default to false. If true, the calls to models' methods issued
+          in the same tick are sent to the server in a single request (see call_kw).
      */
     init: function(parent, origin, options) {
         openerp.PropertiesMixin.init.call(this, parent);
@@ -949,6 +951,8 @@ openerp.Session = openerp.Class.extend(openerp.PropertiesMixin, {
         this.server = null;
         this.session_id = options.session_id || null;
         this.override_session = options.override_session || !!options.session_id || false;
+        this.coalesce_calls = options.coalesce_calls || false;
+        this.pending_calls = null;
         this.avoid_recursion = false;
         this.setup(origin);
     },
@@ -1088,6 +1092,72 @@ openerp.Session = openerp.Class.extend(openerp.PropertiesMixin, {
             });
         });
     },
+    /**
+     * Calls a method of a model. If ``coalesce_calls`` is set, calls without
+     * rpc options are queued, and those issued in the same tick are sent in
+     * a single /web/dataset/batch request, each of them succeeding or
+     * failing on its own.
+     *
+     * @param {String} model name of the model
+     * @param {String} method name of the method to call
+     * @param {Array} args positional arguments
+     * @param {Object} kwargs keyword arguments
+     * @param {Object} [options] additional options for the rpc() method
+     * @returns {jQuery.Deferred<>} call result
+     */
+    call_kw: function(model, method, args, kwargs, options) {
+        var call = {model: model, method: method, args: args, kwargs: kwargs};
+        if (options && options.format) {
+            // encoding of the records read, see instance.web.decode_records
+            call.format = options.format;
+            options = _.omit(options, 'format');
+        }
+        if (!this.coalesce_calls || !_.isEmpty(options)) {
+            return this.rpc('/web/dataset/call_kw/' + model + '/' + method, call, options);
+        }
+        if (!this.pending_calls) {
+            this.pending_calls = [];
+            setTimeout(_.bind(this.flush_calls, this), 0);
+        }
+        var def = $.Deferred();
+        this.pending_calls.push({call: call, deferred: def});
+        return def.promise();
+    },
+    /**
+     * Sends the queued calls, see call_kw
+     */
+    flush_calls: function() {
+        var self = this;
+        var pending = this.pending_calls;
+        this.pending_calls = null;
+        if (pending.length === 1) {
+            var call = pending[0].call;
+            return this.rpc('/web/dataset/call_kw/' + call.model + '/' + call.method, call)
+                .then(pending[0].deferred.resolve, pending[0].deferred.reject);
+        }
+        return this.rpc('/web/dataset/batch', {calls: _.pluck(pending, 'call')}).then(function(results) {
+            _.each(results, function(result, i) {
+                var def = pending[i].deferred;
+                if (result.error === undefined) {
+                    def.resolve(result.result);
+                    return;
+                }
+                if (result.error.code === 100) {
+                    self.uid = false;
+                }
+                // as rpc() does, let the caller disable the error report
+                var event = $.Event();
+                def.reject(result.error, event);
+                if (!event.isDefaultPrevented()) {
+                    self.trigger('error', result.error, event);
+                }
+            });
+        }, function(error, event) {
+            _.each(pending, function(p) {
+                p.deferred.reject(error, event);
+            });
+        });
+    },
     url: function(path, params) {
         params = _.extend(params || {});
         if (this.override_session || (! this.origin_server))
@@ -1155,13 +1225,7 @@ openerp.Model = openerp.Class.extend({
             kwargs = args;
             args = [];
         }
-        var call_kw = '/web/dataset/call_kw/' + this.name + '/' + method;
-        return this.session().rpc(call_kw, {
-            model: this.name,
-            method: method,
-            args: args,
-            kwargs: kwargs
-        }, options);
+        return this.session().call_kw(this.name, method, args, kwargs, options);
     }
 });
 
@@ -26,6 +26,8 @@ instance.web.ListView = instance.web.View.extend( /** @lends instance.web.ListVi
         'action_buttons': true,
         //whether the editable property of the view has to be disabled
         'disable_editable_mode': false,
+        // counting mode of the records, see instance.web.Query#count_mode
+        'count_mode': 'estimate',
     },
     view_type: 'tree',
     events: {
@@ -395,6 +397,7 @@ instance.web.ListView = instance.web.View.extend( /** @lends instance.web.ListVi
         // Not exactly clean
         if (dataset._length) {
             this.dataset._length = dataset._length;
+            this.dataset._length_estimated = dataset._length_estimated;
         }
 
         var total = dataset.size();
@@ -411,11 +414,31 @@ instance.web.ListView = instance.web.View.extend( /** @lends instance.web.ListVi
             if (range_stop > total) {
                 range_stop = total;
             }
-            spager = _.str.sprintf(_t("%d-%d of %d"), range_start, range_stop, total);
+            if (dataset._length_estimated) {
+                spager = _.str.sprintf(_t("%d-%d of ~%s"), range_start, range_stop,
+                                       this.format_estimate(total));
+            } else {
+                spager = _.str.sprintf(_t("%d-%d of %d"), range_start, range_stop, total);
+            }
         }
 
         this.$pager.find('.oe_list_pager_state').text(spager);
     },
+    /**
+     * Rounds an estimated number of records for display, e.g. 2.3M
+     *
+     * @param {Number} total
+     * @returns {String}
+     */
+    format_estimate: function (total) {
+        var units = [[1e9, 'G'], [1e6, 'M'], [1e3, 'k']];
+        for (var i = 0; i < units.length; ++i) {
+            if (total >= units[i][0]) {
+                return (total / units[i][0]).toFixed(1).replace(/\.0$/, '') + units[i][1];
+            }
+        }
+        return String(total);
+    },
     /**
      * Sets up the listview's columns: merges view and fields data, move
      * grouped-by columns to the front of the columns list and make them all
@@ -1478,6 +1501,16 @@ instance.web.ListView.Groups = instance.web.Class.extend( /** @lends instance.we
 
         var fields = _.pluck(_.select(this.columns, function(x) {return x.tag == "field";}), 'name');
         var options = { offset: page * limit, limit: limit, context: {bin_size: true} };
+        if (!this.datagroup.openable) {
+            // do not block the display of the records on counting them
+            options.count = view.options.count_mode;
+            // the next page follows the records of the current one
+            options.cursor = true;
+            dataset.off('length_changed', this);
+            dataset.on('length_changed', this, function () {
+                view.configure_pager(dataset);
+            });
+        }
         //TODO xmo: investigate why we need to put the setTimeout
         return $.async_when().then(function() {
             return dataset.read_slice(fields, options).then(function (records) {
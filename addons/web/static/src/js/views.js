@@ -560,12 +560,14 @@ instance.web.ViewManager =  instance.web.Widget.extend({
             if (x instanceof Array) {
                 var view_type = x[1];
                 var View = instance.web.views.get_object(view_type, true);
-                var view_label = View ? View.prototype.display_name : (void 'nope');
+                // views loaded on demand are not registered yet
+                var view_label = View ? View.prototype.display_name
+                                      : instance.session.lazy_view_label(view_type);
                 return {
                     view_id: x[0],
                     view_type: view_type,
                     label: view_label,
-                    button_label: View ? _.str.sprintf(_t('%(view_type)s view'), {'view_type': (view_label || view_type)}) : (void 'nope'),
+                    button_label: _.str.sprintf(_t('%(view_type)s view'), {'view_type': (view_label || view_type)}),
                 };
             } else {
                 return x;
@@ -618,6 +620,14 @@ instance.web.ViewManager =  instance.web.Widget.extend({
             self.trigger('switch_mode', view_type, no_store, view_options);
             return $.Deferred().reject();
         }
+        if (!view.controller) {
+            var loading = this.session.load_view_module(view_type);
+            if (loading) {
+                return loading.then(function() {
+                    return self.switch_mode(view_type, no_store, view_options);
+                });
+            }
+        }
         if (!no_store) {
             this.views_history.push(view_type);
         }
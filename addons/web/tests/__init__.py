@@ -1,8 +1,27 @@
 # -*- coding: utf-8 -*-
-from . import test_menu, test_serving_base, test_js
+from . import test_menu, test_serving_base, test_js, test_bundle_cache, \
+    test_manifest_index, test_jsmin, test_css, test_qweb, \
+    test_module_graph, test_db_list, test_home, test_bootstrap, \
+    test_translations, test_manifest_list, test_proxy, test_dataset, \
+    test_build_assets, test_bundle_routes
 
 fast_suite = []
 checks = [
     test_menu,
     test_serving_base,
+    test_bundle_cache,
+    test_manifest_index,
+    test_jsmin,
+    test_css,
+    test_qweb,
+    test_module_graph,
+    test_db_list,
+    test_home,
+    test_bootstrap,
+    test_translations,
+    test_manifest_list,
+    test_proxy,
+    test_dataset,
+    test_build_assets,
+    test_bundle_routes,
 ]
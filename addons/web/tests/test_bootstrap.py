@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+import mock
+import unittest2
+
+from openerp import http
+from openerp.http import request as req
+
+from . import common
+
+from ..controllers import main
+
+class TestBootstrap(common.MockRequestCase):
+    def setUp(self):
+        super(TestBootstrap, self).setUp()
+        req.session.uid = 1
+        req.session.db = 'db'
+        req.session.login = 'admin'
+        req.session.get_context.return_value = {'lang': 'fr_FR'}
+
+        def manifest_list(extension, mods=None, db=None, debug=False):
+            return ['/web/webclient/%s/%s' % (extension, mods)]
+
+        patchers = [
+            mock.patch.object(main, 'module_installed',
+                              return_value=['web', 'web_kanban', 'web_calendar', 'web_graph']),
+            mock.patch.object(main, 'manifest_list', side_effect=manifest_list),
+            mock.patch.object(main.WebClient, 'translations_url',
+                              return_value='/web/webclient/translations/0123'),
+            mock.patch.object(main.WebClient, 'translations_entry',
+                              return_value=('abcd', {})),
+            mock.patch.object(main.Menu, 'load_entry',
+                              return_value=('ef01', {'children': []})),
+        ]
+        self.mocks = {}
+        for patcher in patchers:
+            self.mocks[patcher.attribute] = patcher.start()
+            self.addCleanup(patcher.stop)
+
+        manifests = mock.patch.dict(http.addons_manifest, {
+            'web': {},
+            'web_kanban': {'depends': ['web']},
+            'web_calendar': {'depends': ['web']},
+            'web_graph': {'depends': ['web'], 'web_preload': False,
+                          'web_views': {'graph': 'Graph'}},
+        }, clear=True)
+        manifests.start()
+        self.addCleanup(manifests.stop)
+
+    def test_authenticated(self):
+        result = main.WebClient().bootstrap(mods=['web', 'web_kanban'])
+
+        self.assertEqual(result['session']['uid'], 1)
+        self.assertEqual(result['session']['user_context'], {'lang': 'fr_FR'})
+        self.assertEqual(result['templates'],
+                         ['/web/webclient/qwebjs/web,web_kanban'])
+        self.assertEqual(result['modules'], ['web', 'web_kanban', 'web_calendar'])
+        self.assertEqual(result['assets'], {
+            'css': ['/web/webclient/css/web_calendar'],
+            'js': ['/web/webclient/js/web_calendar'],
+            'templates': ['/web/webclient/qwebjs/web_calendar'],
+        })
+        self.assertEqual(result['menus'], {'children': []})
+        self.assertEqual(result['checksums'], {'translations': 'abcd', 'menus': 'ef01'})
+        self.assertEqual(result['translations_url'], '/web/webclient/translations/0123')
+        self.assertEqual(result['lazy'], {'web_graph': {
+            'views': {'graph': 'Graph'},
+            'depends': [],
+            'assets': {
+                'css': ['/web/webclient/css/web_graph'],
+                'js': ['/web/webclient/js/web_graph'],
+                'templates': ['/web/webclient/qwebjs/web_graph'],
+            },
+        }})
+        # modules loaded on demand are translated beforehand
+        self.mocks['translations_url'].assert_called_once_with(
+            mods=['web', 'web_kanban', 'web_calendar', 'web_graph'], lang='fr_FR')
+
+    def test_debug(self):
+        result = main.WebClient().bootstrap(mods=['web'], debug=True)
+
+        self.assertEqual(result['templates'], ['/web/webclient/qweb/web'])
+        self.assertEqual(result['assets']['templates'],
+                         ['/web/webclient/qweb/web_kanban,web_calendar'])
+
+    def test_everything_loaded(self):
+        result = main.WebClient().bootstrap(
+            mods=['web', 'web_kanban', 'web_calendar', 'web_graph'])
+
+        self.assertEqual(result['assets'],
+                         {'css': [], 'js': [], 'templates': []})
+        self.assertEqual(result['lazy'], {})
+
+    def test_anonymous(self):
+        req.session.uid = None
+        result = main.WebClient().bootstrap(mods=['web'])
+
+        self.assertEqual(sorted(result), ['session', 'templates'])
+        self.assertEqual(result['session']['user_context'], {})
+        self.assertFalse(self.mocks['module_installed'].called)
+        self.assertFalse(self.mocks['load_entry'].called)
+
+    def test_cached_menus(self):
+        result = main.WebClient().bootstrap(mods=['web'], cached={'menus': 'ef01'})
+        self.assertNotIn('menus', result)
+        result = main.WebClient().bootstrap(mods=['web'], cached={'menus': '0123'})
+        self.assertEqual(result['menus'], {'children': []})
+
+    def test_checksums(self):
+        self.assertEqual(main.WebClient().checksums(),
+                         {'translations': 'abcd', 'menus': 'ef01'})
+
+class TestModuleLazy(unittest2.TestCase):
+    def setUp(self):
+        patcher = mock.patch.dict(http.addons_manifest, {
+            'web': {},
+            'graph': {'depends': ['web'], 'web_preload': False, 'web_views': {'graph': 'Graph'}},
+            'graph_extra': {'depends': ['graph'], 'web_preload': False,
+                            'web_views': {'graph': 'Graph'}},
+            'board': {'depends': ['graph_extra']},
+            'hello': {'depends': ['web'], 'web_preload': False},
+        }, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_lazy(self):
+        self.assertEqual(main.module_lazy(['web', 'graph', 'graph_extra']),
+                         set(['graph', 'graph_extra']))
+
+    def test_dependency(self):
+        # a module loaded at startup needs its dependencies
+        self.assertEqual(main.module_lazy(['web', 'graph', 'graph_extra', 'board']),
+                         set())
+
+    def test_without_views(self):
+        # no view type would trigger its loading
+        self.assertEqual(main.module_lazy(['web', 'hello']), set())
+        self.assertEqual(main.module_lazy(['web', 'graph', 'hello']), set(['graph']))
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+import mock
+import unittest2
+
+from openerp import http
+
+from ..cli import build_assets
+from ..controllers import main
+
+class TestBuildAssets(unittest2.TestCase):
+    def setUp(self):
+        def manifest_glob(extension, addons=None, db=None, include_remotes=False):
+            return [('/fs/%s.%s' % (m, extension), '/%s.%s' % (m, extension))
+                    for m in addons.split(',')]
+
+        patchers = [
+            mock.patch.dict(http.addons_manifest, {
+                'web': {},
+                'web_kanban': {'depends': ['web'], 'auto_install': True},
+                'sale': {'depends': ['web']},
+                'stock': {'depends': ['web']},
+            }, clear=True),
+            mock.patch.object(main, 'config', {}),
+            mock.patch.object(main.openerp.conf, 'server_wide_modules', ['web']),
+            mock.patch.object(main, 'manifest_glob', side_effect=manifest_glob),
+            mock.patch.object(main, 'bundle_checksum',
+                              side_effect=lambda paths, cache=None: '+'.join(p[4:] for p in paths)),
+            mock.patch.object(main, 'module_boot', side_effect=lambda db=None: {
+                'db1': ['web', 'web_kanban', 'sale'],
+                'db2': ['web', 'web_kanban', 'stock'],
+            }[db]),
+            mock.patch.object(main, 'build_bundle',
+                              side_effect=lambda extension, files, cache=None: repr(files)),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.cache = mock.Mock()
+        self.cache.get.return_value = None
+
+    def test_parts(self):
+        manifest = build_assets.BuildAssets().build(self.cache, ['db1', 'db2'])
+        # the fragments are memoized in the same store as the bundles
+        for call in main.bundle_checksum.call_args_list + main.build_bundle.call_args_list:
+            self.assertIs(call[1]['cache'], self.cache)
+
+        for db in ['db1', 'db2']:
+            for extension in ['js', 'css']:
+                # the pages request the bundles which were prebuilt
+                self.assertEqual(
+                    ['/web/webclient/%s/%s' % (extension, part['checksum'])
+                     for part in manifest[db][extension]],
+                    [url.split('?')[0] for url in main.manifest_list(extension, db=db)])
+        self.assertEqual(manifest['db1']['js'], [
+            {'mods': 'web,web_kanban', 'checksum': 'web.js+web_kanban.js'},
+            {'mods': 'sale', 'checksum': 'sale.js'},
+        ])
+
+        stored = [c[0][0] for c in self.cache.set.call_args_list]
+        self.assertIn('web.js+web_kanban.js.js', stored)
+        self.assertIn('stock.js.js', stored)
+
+    def test_name(self):
+        self.assertIs(main.openerp.cli.commands['build-assets'], build_assets.BuildAssets)
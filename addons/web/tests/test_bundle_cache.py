@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+import gzip
+import os
+import shutil
+import tempfile
+import zlib
+from cStringIO import StringIO
+
+import mock
+import unittest2
+
+from ..controllers import main
+from ..controllers.main import BundleCache, bundle_compress
+
+class TestBundleCache(unittest2.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_memory_lru(self):
+        cache = BundleCache(max_bytes=10)
+        cache.set('a', '1234')
+        cache.set('b', '1234')
+        self.assertEqual(cache.get('a'), '1234')
+        # 'b' is now the least recently used entry
+        cache.set('c', '1234')
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), '1234')
+        self.assertEqual(cache.get('c'), '1234')
+        self.assertEqual(cache.size, 8)
+
+        stats = cache.stats()
+        self.assertEqual(stats['hits'], 3)
+        self.assertEqual(stats['misses'], 1)
+
+    def test_oversized(self):
+        cache = BundleCache(max_bytes=2)
+        cache.set('a', '1234')
+        self.assertEqual(cache.size, 0)
+        self.assertIsNone(cache.get('a'))
+
+    def test_shared_disk(self):
+        writer = BundleCache(self.path)
+        writer.set('abcdef.js', 'content')
+        self.assertTrue(os.path.isfile(os.path.join(self.path, 'ab', 'abcdef.js')))
+
+        reader = BundleCache(self.path)
+        built = []
+        content = reader.get_or_build('abcdef.js', lambda: built.append(1))
+        self.assertEqual(content, 'content')
+        self.assertEqual(built, [])
+        self.assertEqual(reader.disk_hits, 1)
+        # promoted to the memory layer
+        self.assertEqual(reader.get('abcdef.js'), 'content')
+        self.assertEqual(reader.hits, 1)
+
+    def test_build_once(self):
+        cache = BundleCache(self.path)
+        built = []
+        def build():
+            built.append(1)
+            return 'minified'
+        self.assertEqual(cache.get_or_build('k', build), 'minified')
+        self.assertEqual(cache.get_or_build('k', build), 'minified')
+        self.assertEqual(len(built), 1)
+        self.assertEqual(os.listdir(os.path.join(self.path, 'k')), ['k'])
+
+    def test_unsafe_directory(self):
+        # e.g. planted by another user in a shared temporary directory
+        os.chmod(self.path, 0777)
+        cache = BundleCache(self.path)
+        with open(os.path.join(self.path, 'planted.js'), 'wb') as fp:
+            fp.write('alert(1);')
+        os.mkdir(os.path.join(self.path, 'pl'))
+        os.rename(os.path.join(self.path, 'planted.js'),
+                  os.path.join(self.path, 'pl', 'planted.js'))
+        self.assertIsNone(cache.get('planted.js'))
+        cache.set('abcdef.js', 'content')
+        self.assertFalse(os.path.exists(os.path.join(self.path, 'ab')))
+        self.assertIsNone(cache.path)
+
+    def test_create_directory(self):
+        path = os.path.join(self.path, 'bundles')
+        BundleCache(path).set('abcdef.js', 'content')
+        self.assertEqual(os.stat(path).st_mode & 0777, 0700)
+
+    def test_prune(self):
+        cache = BundleCache(self.path, max_disk_bytes=30)
+        for index, key in enumerate(['aa1', 'bb2', 'cc3']):
+            cache.set(key, '12345678')
+            os.utime(cache._filename(key), (index, index))
+        # reading an entry makes it the most recently used
+        BundleCache(self.path).get('aa1')
+        cache.set('dd4', '12345678')
+        self.assertEqual(sorted(os.listdir(self.path)), ['aa', 'bb', 'cc', 'dd'])
+        self.assertTrue(os.path.exists(cache._filename('aa1')))
+        self.assertTrue(os.path.exists(cache._filename('dd4')))
+        self.assertFalse(os.path.exists(cache._filename('bb2')))
+        self.assertFalse(os.path.exists(cache._filename('cc3')))
+        self.assertEqual(cache.disk_size, 16)
+
+    def test_data_dir(self):
+        with mock.patch.object(main, 'config', {'data_dir': '/var/lib/openerp'}):
+            self.assertEqual(main.bundle_path(), '/var/lib/openerp/web_bundles')
+
+class TestBundleCompress(unittest2.TestCase):
+    content = 'var a = 1;\n' * 100
+
+    def test_gzip(self):
+        compressed = bundle_compress(self.content, 'gzip')
+        self.assertEqual(
+            gzip.GzipFile(fileobj=StringIO(compressed)).read(), self.content)
+        # stable output, whatever the time it is built at
+        self.assertEqual(compressed, bundle_compress(self.content, 'gzip'))
+
+    def test_deflate(self):
+        self.assertEqual(
+            zlib.decompress(bundle_compress(self.content, 'deflate')),
+            self.content)
+
+class TestMinifyJs(unittest2.TestCase):
+    sources = [
+        '\xef\xbb\xbfvar a = 1 // no trailing semicolon',
+        '(function () {\n    return /re;gex/.test("a;b");\n})()\n',
+        '/* comment */ var c = a\n+ +b;',
+    ]
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.files = []
+        for i, source in enumerate(self.sources):
+            fname = os.path.join(self.path, '%d.js' % i)
+            with open(fname, 'wb') as fp:
+                fp.write(source)
+            self.files.append(fname)
+        self.patcher = mock.patch.object(main, 'bundle_cache', BundleCache())
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        shutil.rmtree(self.path)
+
+    def test_minify(self):
+        # minifying the whole concatenation would comment out the second
+        # file, behind the first one's trailing line comment
+        self.assertEqual(
+            main.minify_js(self.files),
+            'var a=1;(function(){return/re;gex/.test("a;b");})();var c=a\n+ +b;')
+
+    def test_memoized(self):
+        main.minify_js(self.files)
+        with open(self.files[1], 'ab') as fp:
+            fp.write('var d;')
+        rjsmin = mock.Mock(wraps=main.rjsmin)
+        with mock.patch.dict(main.JS_MINIFIERS, rjsmin=rjsmin):
+            self.assertEqual(
+                main.minify_js(self.files),
+                'var a=1;(function(){return/re;gex/.test("a;b");})()\nvar d;;var c=a\n+ +b;')
+            rjsmin.assert_called_once_with(self.sources[1] + 'var d;')
+
+    def test_pipeline_version(self):
+        main.minify_js(self.files)
+        checksum = main.bundle_checksum(self.files)
+        rjsmin = mock.Mock(wraps=main.rjsmin)
+        version = main.BUNDLE_PIPELINE_VERSION + '.1'
+        with mock.patch.object(main, 'BUNDLE_PIPELINE_VERSION', version), \
+                mock.patch.dict(main.JS_MINIFIERS, rjsmin=rjsmin):
+            # same sources, built by another version of the pipeline
+            self.assertNotEqual(main.bundle_checksum(self.files), checksum)
+            main.minify_js(self.files)
+            self.assertEqual(rjsmin.call_count, len(self.files))
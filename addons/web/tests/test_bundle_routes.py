@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+import datetime
+
+import mock
+from werkzeug.test import EnvironBuilder
+from werkzeug.wrappers import Request, Response
+
+from openerp.http import request as req
+
+from . import common
+
+from ..controllers import main
+
+CURRENT = 'c' * 40
+PREVIOUS = 'b' * 40
+OUTDATED = 'a' * 40
+
+class TestChecksummedBundles(common.MockRequestCase):
+    def setUp(self):
+        super(TestChecksummedBundles, self).setUp()
+        self.request()
+        req.make_response = lambda content, headers=None: Response(content, headers=headers)
+
+        self.content = 'var current;'
+        patchers = [
+            mock.patch.object(main, 'bundle_cache', main.BundleCache()),
+            mock.patch.object(main, 'manifest_glob', return_value=[('/fs/a.js', '/a.js')]),
+            mock.patch.object(main, 'bundle_checksum', return_value=CURRENT),
+            mock.patch.object(main, 'get_last_modified',
+                              return_value=datetime.datetime(2013, 5, 1)),
+            mock.patch.object(main, 'build_bundle',
+                              side_effect=lambda extension, files: self.content),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def request(self, **kwargs):
+        req.httprequest = Request(EnvironBuilder(**kwargs).get_environ())
+
+    def test_current(self):
+        response = main.WebClient().css(mods='web', checksum=CURRENT)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, self.content)
+        self.assertEqual(response.headers['Cache-Control'],
+                         'public, max-age=%d, immutable' % main.BUNDLE_MAX_AGE)
+        self.assertEqual(response.headers['ETag'], '"%s"' % CURRENT)
+
+        self.request(headers={'If-None-Match': '"%s"' % CURRENT})
+        response = main.WebClient().css(mods='web', checksum=CURRENT)
+        self.assertEqual(response.status_code, 304)
+
+    def test_stale(self):
+        # e.g. a page generated before an update of the sources
+        response = main.WebClient().css(mods='web', checksum=OUTDATED)
+        self.assertEqual(response.status_code, 200)
+        # the current bundle, to be revalidated
+        self.assertEqual(response.data, self.content)
+        self.assertNotIn('immutable', response.headers['Cache-Control'])
+        self.assertTrue(response.cache_control.must_revalidate)
+        self.assertEqual(response.cache_control.max_age, 0)
+        self.assertEqual(response.headers['ETag'], '"%s"' % CURRENT)
+
+    def test_previous_build(self):
+        # bundles are content-addressed, a stored one is served as is
+        main.bundle_cache.set(PREVIOUS + '.css', 'var previous;')
+        response = main.WebClient().css(mods='web', checksum=PREVIOUS)
+        self.assertEqual(response.data, 'var previous;')
+        self.assertIn('immutable', response.headers['Cache-Control'])
+        self.assertFalse(main.build_bundle.called)
+
+    def test_unchecksummed(self):
+        response = main.WebClient().js(mods='web')
+        self.assertNotIn('immutable', response.headers['Cache-Control'])
+        self.assertTrue(response.cache_control.must_revalidate)
+
+    def test_invalid_checksum(self):
+        req.not_found.return_value = Response(status=404)
+        for checksum in ['current', '../../' + CURRENT, CURRENT.upper()]:
+            self.assertEqual(main.WebClient().css(mods='web', checksum=checksum).status_code, 404)
+            self.assertEqual(main.WebClient().jsmap(checksum, mods='web').status_code, 404)
+        self.assertFalse(main.bundle_checksum.called)
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
+
+import mock
+import unittest2
+
+from openerp import http
+
+from ..controllers import main
+
+class TestCss(unittest2.TestCase):
+    def setUp(self):
+        self.addons_path = tempfile.mkdtemp()
+        self.static = os.path.join(self.addons_path, 'foo', 'static', 'src', 'css')
+        os.makedirs(self.static)
+        manifest = {'addons_path': self.addons_path}
+        self.patchers = [
+            mock.patch.dict(http.addons_manifest, {'foo': manifest}),
+            mock.patch.object(main, 'bundle_cache', main.BundleCache()),
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+        shutil.rmtree(self.addons_path)
+
+    def write(self, name, content):
+        path = os.path.join(self.static, name)
+        with open(path, 'wb') as fp:
+            fp.write(content)
+        return path, '/foo/static/src/css/' + name
+
+    def test_minify(self):
+        self.assertEqual(
+            main.minify_css('/* c */ a , b  {\n  color: red ;\n'
+                            '  content: "a ; b  /* x */";\n}\n'
+                            '.x { width: calc(1px + 2%) }'),
+            'a,b{color:red;content:"a ; b  /* x */"}'
+            '.x{width:calc(1px + 2%)}')
+
+    def test_rewrite_urls(self):
+        files = [self.write('a.css', '.a { background: url(../img/a.png) }')]
+        content, _ = main.concat_css(files)
+        self.assertEqual(
+            content, '.a{background:url(/foo/static/src/css/../img/a.png)}')
+
+    def test_inline_imports(self):
+        self.write('b.css', '@charset "utf-8";\n.b { color: blue }')
+        self.write('c.css', '@import "a.css";\n.c { color: red }')
+        files = [
+            self.write('a.css', '@charset "utf-8";\n'
+                                '@import url("b.css") print;\n'
+                                '@import "c.css";\n'
+                                '@import url(//example.com/remote.css);\n'
+                                '.a { color: green }'),
+        ]
+        content, checksum = main.concat_css(files)
+        # the cyclic import of a.css is left as is, and moved to the top
+        self.assertEqual(
+            content,
+            '@charset "utf-8";@import "/foo/static/src/css/a.css";'
+            '@import url(//example.com/remote.css);'
+            '@media print{.b{color:blue}}.c{color:red}.a{color:green}')
+
+        # changing an imported file changes the checksum of the bundle
+        self.write('b.css', '.b { color: black }')
+        main.manifest_index.invalidate()
+        self.assertNotEqual(main.concat_css(files)[1], checksum)
+
+    def test_imports_relative_to_file(self):
+        # same content in two directories, importing different files
+        other = os.path.join(self.static, 'other')
+        os.makedirs(other)
+        a, _ = self.write('a.css', '@import "b.css";')
+        b = os.path.join(other, 'a.css')
+        with open(b, 'wb') as fp:
+            fp.write('@import "b.css";')
+        self.assertEqual(main.css_imports(a), [os.path.join(self.static, 'b.css')])
+        self.assertEqual(main.css_imports(b), [os.path.join(other, 'b.css')])
@@ -0,0 +1,398 @@
+# -*- coding: utf-8 -*-
+import base64
+
+import mock
+import simplejson
+from werkzeug.wrappers import Response
+
+from openerp.http import request as req
+
+from . import common
+
+from ..controllers import main
+
+class TestBatch(common.MockRequestCase):
+    def setUp(self):
+        super(TestBatch, self).setUp()
+        self.dataset = main.DataSet()
+
+        def call_kw(model, method, args, kwargs):
+            if method == 'fail':
+                raise ValueError('failed')
+            return [model, method, args, kwargs]
+        patcher = mock.patch.object(main.DataSet, '_call_kw', side_effect=call_kw)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_results(self):
+        results = self.dataset.batch([
+            {'model': 'res.partner', 'method': 'read', 'args': [[1], ['name']], 'kwargs': {}},
+            {'model': 'res.users', 'method': 'name_get', 'args': [[1]]},
+        ])
+        self.assertEqual(results, [
+            {'result': ['res.partner', 'read', [[1], ['name']], {}]},
+            {'result': ['res.users', 'name_get', [[1]], {}]},
+        ])
+
+    def test_isolated_failure(self):
+        results = self.dataset.batch([
+            {'model': 'res.partner', 'method': 'write', 'args': [], 'kwargs': {}},
+            {'model': 'res.partner', 'method': 'fail', 'args': [], 'kwargs': {}},
+            {'model': 'res.partner', 'method': 'read', 'args': [], 'kwargs': {}},
+        ])
+        self.assertEqual(results[0], {'result': ['res.partner', 'write', [], {}]})
+        self.assertEqual(results[1]['error']['code'], 200)
+        self.assertEqual(results[2], {'result': ['res.partner', 'read', [], {}]})
+
+        # only the failed call is rolled back
+        self.assertEqual([c[0][0] for c in req.cr.execute.call_args_list], [
+            'SAVEPOINT "web_dataset_batch_0"',
+            'RELEASE SAVEPOINT "web_dataset_batch_0"',
+            'SAVEPOINT "web_dataset_batch_1"',
+            'ROLLBACK TO SAVEPOINT "web_dataset_batch_1"',
+            'SAVEPOINT "web_dataset_batch_2"',
+            'RELEASE SAVEPOINT "web_dataset_batch_2"',
+        ])
+
+class TestSearchReadCount(common.MockRequestCase):
+    def setUp(self):
+        super(TestSearchReadCount, self).setUp()
+        self.dataset = main.DataSet()
+        self.model = req.session.model.return_value
+        self.model.search_read.return_value = [{'id': 1}, {'id': 2}]
+        self.model.search_count.return_value = 42
+
+    def test_exact(self):
+        result = self.dataset.do_search_read('res.partner', limit=2)
+        self.assertEqual(result['length'], 42)
+        self.assertNotIn('length_estimated', result)
+
+    def test_partial_page(self):
+        result = self.dataset.do_search_read('res.partner', offset=10, limit=5, count='lazy')
+        self.assertEqual(result['length'], 12)
+        self.assertFalse(self.model.search_count.called)
+
+    def test_lazy(self):
+        result = self.dataset.do_search_read('res.partner', limit=2, count='lazy')
+        self.assertIsNone(result['length'])
+        self.assertFalse(self.model.search_count.called)
+
+    def test_estimate(self):
+        with mock.patch.object(main.DataSet, 'estimate_count', return_value=2300000):
+            result = self.dataset.do_search_read('res.partner', limit=2, count='estimate')
+        self.assertEqual(result['length'], 2300000)
+        self.assertTrue(result['length_estimated'])
+        self.assertFalse(self.model.search_count.called)
+
+    def test_estimate_below_page(self):
+        # the planner's statistics lag behind
+        with mock.patch.object(main, 'COUNT_ESTIMATE_THRESHOLD', 10), \
+                mock.patch.object(main.DataSet, 'estimate_count', return_value=10):
+            result = self.dataset.do_search_read(
+                'res.partner', offset=8, limit=2, count='estimate')
+        self.assertEqual(result['length'], 11)
+        self.assertTrue(result['length_estimated'])
+
+    def test_small_estimate(self):
+        with mock.patch.object(main.DataSet, 'estimate_count', return_value=12):
+            result = self.dataset.do_search_read('res.partner', limit=2, count='estimate')
+        self.assertEqual(result['length'], 42)
+        self.assertNotIn('length_estimated', result)
+
+    def test_no_estimate(self):
+        with mock.patch.object(main.DataSet, 'estimate_count', return_value=None):
+            result = self.dataset.do_search_read('res.partner', limit=2, count='estimate')
+        self.assertEqual(result['length'], 42)
+
+class TestEstimateCount(common.MockRequestCase):
+    def setUp(self):
+        super(TestEstimateCount, self).setUp()
+        self.dataset = main.DataSet()
+        self.model = req.registry.get.return_value
+        self.model.check_access_rights.return_value = True
+        self.model._where_calc.return_value.get_sql.return_value = \
+            ('"res_partner"', '("res_partner"."active" = %s)', [True])
+
+    def test_plan(self):
+        req.cr.fetchone.return_value = [
+            'Seq Scan on res_partner  (cost=0.00..52014.00 rows=2301234 width=0)']
+        self.assertEqual(self.dataset.estimate_count('res.partner', []), 2301234)
+        req.cr.execute.assert_any_call(
+            'EXPLAIN SELECT 1 FROM "res_partner" WHERE ("res_partner"."active" = %s)', [True])
+
+    def test_no_access(self):
+        self.model.check_access_rights.return_value = False
+        self.assertIsNone(self.dataset.estimate_count('res.partner', []))
+        self.assertFalse(req.cr.execute.called)
+
+    def test_failure(self):
+        self.model._apply_ir_rules.side_effect = ValueError('invalid')
+        self.assertIsNone(self.dataset.estimate_count('res.partner', []))
+        self.assertEqual(req.cr.execute.call_args[0][0],
+                         'ROLLBACK TO SAVEPOINT "web_estimate_count"')
+
+def column_info(type_, **kwargs):
+    column = mock.Mock(_type=type_, translate=False, _classic_write=True, store=False, password=False)
+    column.configure_mock(**kwargs)
+    return mock.Mock(column=column, parent_model=None)
+
+class TestKeyset(common.MockRequestCase):
+    def setUp(self):
+        super(TestKeyset, self).setUp()
+        self.dataset = main.DataSet()
+        self.model = req.registry.get.return_value
+        self.model._order = 'date desc, id'
+        self.model._table = 'sale_order'
+        req.context = {'lang': 'en_US'}
+        self.model._all_columns = {
+            'name': column_info('char'),
+            'date': column_info('date'),
+            'sequence': column_info('integer'),
+            'partner_id': column_info('many2one'),
+            'description': column_info('text', translate=True),
+            'total': column_info('float', _classic_write=False),
+        }
+
+    def test_order(self):
+        self.assertEqual(self.dataset.keyset_order('sale.order'),
+                         [('date', 'desc'), ('id', 'asc')])
+        self.assertEqual(self.dataset.keyset_order('sale.order', 'sequence, name DESC'),
+                         [('sequence', 'asc'), ('name', 'desc'), ('id', 'asc')])
+        self.assertEqual(self.dataset.keyset_order('sale.order', 'id desc, name'),
+                         [('id', 'desc')])
+
+    def test_unsupported_order(self):
+        self.model._all_columns['password'] = column_info('char')
+        for sort in ['partner_id', 'description', 'total', 'unknown', 'password',
+                     'name, sequence DESC NULLS LAST']:
+            self.assertIsNone(self.dataset.keyset_order('sale.order', sort), sort)
+
+    def test_unreadable_order(self):
+        self.model.check_field_access_rights.side_effect = main.openerp.exceptions.AccessError('x', 'y')
+        self.assertIsNone(self.dataset.keyset_order('sale.order', 'name'))
+        self.model.check_field_access_rights.assert_called_once_with(
+            req.cr, req.uid, 'read', ['name'], context=req.context)
+
+    def test_domain(self):
+        keys = [('date', 'desc'), ('name', 'asc'), ('id', 'asc')]
+        cursor = self.dataset.keyset_cursor('sale.order', keys, 42)
+        self.assertEqual(simplejson.loads(base64.urlsafe_b64decode(cursor)),
+                         [[list(key) for key in keys], 42])
+
+        self.model.search.return_value = [42]
+        req.cr.fetchone.return_value = ('2013-05-01', 'SO042', 42)
+        self.assertEqual(self.dataset.keyset_domain('sale.order', keys, cursor), [
+            '|', '|',
+            ('date', '<', '2013-05-01'),
+            '&', ('date', '=', '2013-05-01'), '|', ('name', '>', 'SO042'), ('name', '=', False),
+            '&', '&', ('date', '=', '2013-05-01'), ('name', '=', 'SO042'), ('id', '>', 42),
+        ])
+        self.model.search.assert_called_once_with(
+            req.cr, req.uid, [('id', '=', 42)], context={'lang': 'en_US', 'active_test': False})
+        req.cr.execute.assert_called_once_with(
+            'SELECT "date", "name", "id" FROM "sale_order" WHERE id = %s', (42,))
+
+    def test_domain_null(self):
+        keys = [('date', 'desc'), ('name', 'asc'), ('id', 'asc')]
+        cursor = self.dataset.keyset_cursor('sale.order', keys, 42)
+        self.model.search.return_value = [42]
+        req.cr.fetchone.return_value = (None, None, 42)
+
+        self.assertEqual(self.dataset.keyset_domain('sale.order', keys, cursor), [
+            '|',
+            ('date', '!=', False),
+            '&', '&', ('date', '=', False), ('name', '=', False), ('id', '>', 42),
+        ])
+
+    def test_domain_unreadable_record(self):
+        keys = [('date', 'desc'), ('id', 'asc')]
+        cursor = self.dataset.keyset_cursor('sale.order', keys, 42)
+        self.model.search.return_value = []
+        self.assertIsNone(self.dataset.keyset_domain('sale.order', keys, cursor))
+        self.assertFalse(req.cr.execute.called)
+
+    def test_invalid_cursor(self):
+        cursor = self.dataset.keyset_cursor('sale.order', [('date', 'desc'), ('id', 'asc')], 42)
+        self.assertRaises(ValueError, self.dataset.keyset_domain,
+                          'sale.order', [('date', 'asc'), ('id', 'asc')], cursor)
+        self.assertRaises(ValueError, self.dataset.keyset_domain,
+                          'sale.order', [('date', 'desc'), ('id', 'asc')], 'garbage')
+        forged = base64.urlsafe_b64encode(simplejson.dumps([[['id', 'asc']], "1 OR 1=1"]))
+        self.assertRaises(ValueError, self.dataset.keyset_domain,
+                          'sale.order', [('id', 'asc')], forged)
+
+    def test_search_read(self):
+        Model = req.session.model.return_value
+        Model.search_read.return_value = [{'id': 3}, {'id': 4}]
+        Model.search_count.return_value = 10
+        self.model.search.return_value = [4]
+        req.cr.fetchone.return_value = ('2013-05-01', 4)
+
+        first = self.dataset.do_search_read(
+            'sale.order', ['name'], limit=2, domain=[('state', '=', 'done')], cursor=True)
+        Model.search_read.assert_called_with(
+            [('state', '=', 'done')], ['name'], 0, 2, 'date desc, id asc', req.context)
+        self.assertTrue(first['cursor'])
+        self.assertEqual(first['length'], 10)
+
+        Model.search_read.return_value = [{'id': 5}]
+        second = self.dataset.do_search_read(
+            'sale.order', ['name'], offset=2, limit=2, domain=[('state', '=', 'done')],
+            cursor=first['cursor'])
+        Model.search_read.assert_called_with(
+            ['|', ('date', '<', '2013-05-01'),
+             '&', ('date', '=', '2013-05-01'), ('id', '>', 4),
+             ('state', '=', 'done')],
+            ['name'], 0, 2, 'date desc, id asc', req.context)
+        self.assertIs(second['cursor'], False)
+        self.assertEqual(second['length'], 3)
+
+    def test_search_read_offset(self):
+        Model = req.session.model.return_value
+        Model.search_read.return_value = [{'id': 3}, {'id': 4}]
+        result = self.dataset.do_search_read(
+            'sale.order', ['name'], offset=4, limit=2, sort='partner_id', cursor='token')
+        Model.search_read.assert_called_with(None, ['name'], 4, 2, 'partner_id', req.context)
+        self.assertNotIn('cursor', result)
+
+class TestStream(common.MockRequestCase):
+    def setUp(self):
+        super(TestStream, self).setUp()
+        self.dataset = main.DataSet()
+        self.model = req.registry.get.return_value
+        self.model._table = 'res_partner'
+        req.session.context = {'lang': 'en_US'}
+        req.make_response = lambda content, headers=None: Response(content, headers=headers)
+
+        patcher = mock.patch.object(main, 'STREAM_CHUNK_SIZE', 2)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(main.DataSet, 'keyset_order',
+                                    return_value=[('name', 'asc'), ('id', 'asc')])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        req.registry.cursor.return_value = mock.MagicMock()
+        self.cr = req.registry.cursor.return_value.__enter__.return_value
+        req.cr.fetchone.return_value = ('b', 2)
+
+    def stream(self, **params):
+        params.setdefault('model', 'res.partner')
+        response = self.dataset.stream(simplejson.dumps(params))
+        self.assertFalse(response.is_sequence)
+        return simplejson.loads(''.join(response.response))
+
+    def test_search_read(self):
+        self.model.search_read.side_effect = [
+            [{'id': 1, 'name': 'a'}, {'id': 2, 'name': 'b'}],
+            [{'id': 3, 'name': 'c'}],
+        ]
+        result = self.stream(fields=['name'], domain=[('active', '=', True)])
+        self.assertEqual(result['result'], {
+            'length': 3,
+            'records': [{'id': 1, 'name': 'a'}, {'id': 2, 'name': 'b'},
+                        {'id': 3, 'name': 'c'}],
+        })
+        first, second = self.model.search_read.call_args_list
+        self.assertIs(first[0][0], req.cr)
+        self.assertEqual(first[0][2:], ([['active', '=', True]], ['name'], 0, 2,
+                                        'name asc, id asc', {'lang': 'en_US'}))
+        # following chunks are read once the request is over
+        self.assertIs(second[0][0], self.cr)
+        self.assertEqual(second[0][2], [
+            '|', '|', ('name', '>', 'b'), ('name', '=', False),
+            '&', ('name', '=', 'b'), ('id', '>', 2),
+            ['active', '=', True]])
+
+    def test_offset(self):
+        main.DataSet.keyset_order.return_value = None
+        self.model.search_read.side_effect = [[{'id': 1}, {'id': 2}], []]
+        result = self.stream(sort='partner_id')
+        self.assertEqual(result['result']['length'], 2)
+        self.assertEqual([c[0][4] for c in self.model.search_read.call_args_list], [0, 2])
+
+    def test_read(self):
+        self.model.read.side_effect = lambda cr, uid, ids, fields, context: \
+            [{'id': id} for id in ids]
+        result = self.stream(ids=[5, 4, 3], fields=['name'])
+        self.assertEqual(result['result']['records'], [{'id': 5}, {'id': 4}, {'id': 3}])
+        self.assertEqual([c[0][2] for c in self.model.read.call_args_list], [[5, 4], [3]])
+
+    def test_error(self):
+        self.model.search_read.side_effect = ValueError('invalid domain')
+        response = self.dataset.stream(simplejson.dumps({'model': 'res.partner'}))
+        self.assertEqual(simplejson.loads(response.data)['error']['code'], 200)
+
+    def test_truncated(self):
+        self.model.search_read.side_effect = [[{'id': 1}, {'id': 2}], ValueError('gone')]
+        response = self.dataset.stream(simplejson.dumps({'model': 'res.partner'}))
+        self.assertRaises(ValueError, simplejson.loads, ''.join(response.response))
+
+class TestColumnar(common.MockRequestCase):
+    records = [
+        {'id': 1, 'name': 'a', 'partner_id': [7, 'Agrolait'], 'tag_ids': [1, 2], 'range': [1, 'a']},
+        {'id': 2, 'name': 'b', 'partner_id': False, 'tag_ids': [], 'range': False},
+        {'id': 3, 'name': 'c', 'partner_id': [7, 'Agrolait'], 'tag_ids': [3, 4], 'range': [1, 'a']},
+        {'id': 4, 'name': 'd', 'partner_id': [9, 'ASUSTeK'], 'tag_ids': [], 'range': False},
+    ]
+
+    def setUp(self):
+        super(TestColumnar, self).setUp()
+        req.registry.get.return_value._all_columns = {
+            'name': column_info('char'),
+            'partner_id': column_info('many2one'),
+            'tag_ids': column_info('many2many'),
+            # shaped like a many2one value
+            'range': column_info('serialized'),
+        }
+
+    def test_columns(self):
+        payload = main.columnar(self.records, many2one=['partner_id'])
+        self.assertEqual(payload['length'], 4)
+        columns = dict(zip(payload['fields'], payload['columns']))
+        self.assertEqual(columns, {
+            'id': [1, 2, 3, 4],
+            'name': ['a', 'b', 'c', 'd'],
+            'partner_id': [0, False, 0, 1],
+            'tag_ids': [[1, 2], [], [3, 4], []],
+            'range': [[1, 'a'], False, [1, 'a'], False],
+        })
+        self.assertEqual(payload['relations'], {
+            'partner_id': [[7, 'Agrolait'], [9, 'ASUSTeK']],
+        })
+
+    def test_field_types(self):
+        payload = main.format_records('res.partner', self.records, 'columnar')
+        req.registry.get.assert_called_with('res.partner')
+        self.assertEqual(payload['relations'].keys(), ['partner_id'])
+
+    def test_empty(self):
+        payload = main.columnar([], ['name'])
+        self.assertEqual(payload['fields'], ['name'])
+        self.assertEqual(payload['columns'], [[]])
+
+    def test_format(self):
+        self.assertIs(main.format_records('res.partner', self.records), self.records)
+        self.assertEqual(main.format_records('res.partner', {'id': 1}, 'columnar'), {'id': 1})
+        self.assertEqual(main.format_records('res.partner', self.records, 'columnar')['format'],
+                         'columnar')
+        self.assertRaises(ValueError, main.format_records, 'res.partner', self.records, 'xml')
+
+    def test_search_read(self):
+        Model = req.session.model.return_value
+        Model.search_read.return_value = self.records[:2]
+        result = main.DataSet().search_read('res.partner', ['name', 'partner_id'],
+                                            format='columnar')
+        self.assertEqual(result['length'], 2)
+        self.assertEqual(result['records']['format'], 'columnar')
+
+    def test_call_kw(self):
+        dataset = main.DataSet()
+        with mock.patch.object(main.DataSet, '_call_kw', return_value=self.records):
+            self.assertEqual(dataset.call_kw('res.partner', 'read', [[1, 2, 3, 4]], {},
+                                             format='columnar')['length'], 4)
+            self.assertIs(dataset.call_kw('res.partner', 'copy_data', [1], {},
+                                          format='columnar'), self.records)
+            results = dataset.batch([{'model': 'res.partner', 'method': 'read',
+                                      'args': [], 'format': 'columnar'}])
+        self.assertEqual(results[0]['result']['format'], 'columnar')
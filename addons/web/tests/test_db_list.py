@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+import mock
+import unittest2
+
+from ..controllers import main
+
+class TestDatabaseListCache(unittest2.TestCase):
+    def setUp(self):
+        self.httprequest = mock.Mock(environ={'HTTP_HOST': 'example.com'})
+        patcher = mock.patch.object(main.http, 'db_list', return_value=['a', 'b'])
+        self.db_list = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_ttl(self):
+        cache = main.DatabaseListCache(ttl=60)
+        self.assertEqual(cache.get(True, self.httprequest), ['a', 'b'])
+        self.assertEqual(cache.get(True, self.httprequest), ['a', 'b'])
+        self.assertEqual(self.db_list.call_count, 1)
+
+        with mock.patch.object(main.time, 'time', return_value=main.time.time() + 61):
+            cache.get(True, self.httprequest)
+        self.assertEqual(self.db_list.call_count, 2)
+
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 2))
+        self.assertAlmostEqual(stats['hit_rate'], 1 / 3.)
+
+    def test_keys(self):
+        cache = main.DatabaseListCache(ttl=60)
+        with mock.patch.object(main, 'config', {'dbfilter': '^%d$'}):
+            cache.get(True, self.httprequest)
+            cache.get(False, self.httprequest)
+            cache.get(True, mock.Mock(environ={'HTTP_HOST': 'demo.example.com'}))
+            cache.get(True, mock.Mock(environ={'HTTP_HOST': 'example.org:8069'}))
+        self.assertEqual(self.db_list.call_count, 3)
+
+    def test_hosts(self):
+        # the host does not matter to the default dbfilter
+        cache = main.DatabaseListCache(ttl=60)
+        with mock.patch.object(main, 'config', {}):
+            for index in range(10):
+                cache.get(True, mock.Mock(environ={'HTTP_HOST': 'h%d.example.com' % index}))
+        self.assertEqual(self.db_list.call_count, 1)
+        self.assertEqual(cache.stats()['entries'], 1)
+
+    def test_bounded(self):
+        cache = main.DatabaseListCache(ttl=60, max_entries=3)
+        with mock.patch.object(main, 'config', {'dbfilter': '%h'}):
+            for index in range(10):
+                cache.get(True, mock.Mock(environ={'HTTP_HOST': 'h%d' % index}))
+            self.assertEqual(cache.stats()['entries'], 3)
+
+            # expired entries are dropped
+            with mock.patch.object(main.time, 'time', return_value=main.time.time() + 61):
+                cache.get(True, mock.Mock(environ={'HTTP_HOST': 'other'}))
+            self.assertEqual(cache.stats()['entries'], 1)
+
+    def test_invalidate(self):
+        cache = main.DatabaseListCache(ttl=60)
+        cache.get(True, self.httprequest)
+        cache.invalidate()
+        cache.get(True, self.httprequest)
+        self.assertEqual(self.db_list.call_count, 2)
+
+    def test_errors_not_cached(self):
+        cache = main.DatabaseListCache(ttl=60)
+        self.db_list.side_effect = main.openerp.exceptions.AccessDenied()
+        with self.assertRaises(main.openerp.exceptions.AccessDenied):
+            cache.get(False, self.httprequest)
+        self.db_list.side_effect = None
+        self.assertEqual(cache.get(False, self.httprequest), ['a', 'b'])
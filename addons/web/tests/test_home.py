@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+import mock
+from werkzeug.test import EnvironBuilder
+from werkzeug.wrappers import Request, Response
+
+from openerp.http import request as req
+
+from . import common
+
+from ..controllers import main
+
+class TestWebClientShell(common.MockRequestCase):
+    def setUp(self):
+        super(TestWebClientShell, self).setUp()
+        req.make_response = lambda content, headers=None: Response(content, headers=headers)
+        req.session.db = 'db'
+
+        def manifest_list(extension, mods=None, db=None, debug=False):
+            if debug:
+                return ['/web/static/src/%s/a.%s' % (extension, extension)]
+            return ['/web/webclient/%s/0123' % extension]
+
+        patchers = [
+            mock.patch.object(main, 'db_list', return_value=['db']),
+            mock.patch.object(main, 'db_monodb', return_value='db'),
+            mock.patch.object(main, 'module_boot', return_value=['web', 'web_kanban']),
+            mock.patch.object(main, 'manifest_list', side_effect=manifest_list),
+            mock.patch.object(main, 'bundle_cache', main.BundleCache()),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def get(self, headers=None, **query):
+        query.setdefault('db', 'db')
+        req.httprequest = Request(EnvironBuilder(
+            path='/web', query_string=query, headers=headers or {}).get_environ())
+        return main.Home().web_client(**query)
+
+    def test_etag(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('/web/webclient/js/0123', response.data)
+        etag, weak = response.get_etag()
+        self.assertFalse(weak)
+        self.assertIn('max-age=0', response.headers['Cache-Control'])
+
+        response = self.get(headers={'If-None-Match': '"%s"' % etag})
+        self.assertEqual(response.status_code, 304)
+
+        self.assertNotEqual(self.get(debug='1').get_etag()[0], etag)
+
+    def test_preload(self):
+        self.assertEqual(
+            self.get().headers['Link'],
+            '</web/webclient/css/0123>; rel=preload; as=style, '
+            '</web/webclient/js/0123>; rel=preload; as=script, '
+            '</web/webclient/qwebjs/0123>; rel=preload; as=script')
+        self.assertNotIn('Link', self.get(debug='1').headers)
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+import logging
+import os
+import time
+
+import unittest2
+
+from ..controllers.main import base64_vlq, js_source_mapping, jsmin, rjsmin
+
+_logger = logging.getLogger(__name__)
+
+ADDONS_PATH = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+def static_js_files():
+    for addon in sorted(os.listdir(ADDONS_PATH)):
+        static = os.path.join(ADDONS_PATH, addon, 'static')
+        for root, _dirs, files in os.walk(static):
+            for f in sorted(files):
+                if f.endswith('.js'):
+                    yield os.path.join(root, f)
+
+class TestJsMin(unittest2.TestCase):
+    def assertSameAsRjsmin(self, script):
+        self.assertEqual(jsmin(script), rjsmin(script))
+
+    def test_strings(self):
+        self.assertSameAsRjsmin('var a = "b  /* c */ // d";\nvar e = \'f\\\' g\';')
+        self.assertSameAsRjsmin('var a = "multi\\\nline";')
+        # unterminated strings are kept as-is
+        self.assertSameAsRjsmin('var a = "b\nc";')
+
+    def test_regex(self):
+        self.assertSameAsRjsmin('x = /a b[/ ]\\/c/g.test(d) / 2 / e;')
+        self.assertSameAsRjsmin('function f() { return /* c */ /a/.test(b); }')
+        self.assertSameAsRjsmin('a = b\n/c/.exec(d)')
+        self.assertSameAsRjsmin('areturn /a/')
+
+    def test_whitespace(self):
+        self.assertSameAsRjsmin('a + +b; c - -d; e+ ++f; g = h\n(i)\n[j]')
+        self.assertSameAsRjsmin('var a = b // comment\n  , c /* multi\nline */ = d\r\n\r\ne')
+        self.assertSameAsRjsmin('\xc3\xa9t\xc3\xa9 = \xc3\xa0 \xc3\xb4;\n\te = 1 /* unterminated')
+
+    def test_static_files(self):
+        """ Both engines give the same output on all the shipped js files,
+        logs their respective timings as a benchmark
+        """
+        timings = {jsmin: 0, rjsmin: 0}
+        size = 0
+        for fname in static_js_files():
+            with open(fname, 'rb') as fp:
+                script = fp.read()
+            size += len(script)
+            results = []
+            for minifier in (rjsmin, jsmin):
+                start = time.time()
+                results.append(minifier(script))
+                timings[minifier] += time.time() - start
+            self.assertEqual(results[1], results[0],
+                             "tokenizer and rjsmin differ on %s" % fname)
+        _logger.info("Minified %d bytes of js: rjsmin %.3fs, tokenizer %.3fs",
+                     size, timings[rjsmin], timings[jsmin])
+
+class TestSourceMap(unittest2.TestCase):
+    def test_vlq(self):
+        self.assertEqual(
+            [base64_vlq(v) for v in [0, 1, -1, 15, 16, -16, 123, 1000]],
+            ['A', 'C', 'D', 'e', 'gB', 'hB', '2H', 'w+B'])
+
+    def test_mapping(self):
+        script = 'var a = 1;\n\n/* comment */\nfunction f() {\n    return a;\n}\nf()\n'
+        # minified: 'var a=1;function f(){return a;}\nf()'
+        self.assertEqual(js_source_mapping(script), (1, 3, [
+            [0, 0, 0, 0],
+            [0, 8, 3, 0],
+            [0, 21, 4, 4],
+            [0, 30, 5, 0],
+            [1, 0, 6, 0],
+        ]))
+
+    def test_mapping_utf16(self):
+        # columns count UTF-16 code units: 1 for "é", 2 for "𝄞"
+        script = 'var a = "\xc3\xa9\xf0\x9d\x84\x9e"; f(a);\n  g(a)\n'
+        # minified: 'var a="é𝄞";f(a);g(a)'
+        self.assertEqual(js_source_mapping(script), (0, 21, [
+            [0, 0, 0, 0],
+            [0, 17, 1, 2],
+        ]))
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import os
+import shutil
+import tempfile
+
+import mock
+import unittest2
+
+from openerp import http
+
+from ..controllers import main
+
+class TestManifestIndex(unittest2.TestCase):
+    def setUp(self):
+        self.addons_path = tempfile.mkdtemp()
+        self.static = os.path.join(self.addons_path, 'foo', 'static', 'src', 'js')
+        os.makedirs(self.static)
+        self.write('a.js', 'var a;')
+        manifest = {
+            'addons_path': self.addons_path,
+            'js': ['static/src/js/*.js', '//example.com/remote.js'],
+        }
+        self.patcher = mock.patch.dict(http.addons_manifest, {'foo': manifest})
+        self.patcher.start()
+        self.index = main.ManifestIndex()
+
+    def tearDown(self):
+        self.patcher.stop()
+        shutil.rmtree(self.addons_path)
+
+    def write(self, name, content, mtime=None):
+        path = os.path.join(self.static, name)
+        with open(path, 'wb') as fp:
+            fp.write(content)
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+        return path
+
+    def test_glob(self):
+        self.assertEqual(self.index.glob('foo', 'js'), [
+            (os.path.join(self.static, 'a.js'), '/foo/static/src/js/a.js'),
+            (None, '//example.com/remote.js'),
+        ])
+        self.assertEqual(self.index.glob('foo', 'css'), [])
+        self.assertEqual(self.index.glob('bar', 'js'), [])
+
+    def test_glob_new_file(self):
+        self.index.glob('foo', 'js')
+        self.write('b.js', 'var b;')
+        # make sure the directory is seen as modified
+        os.utime(self.static, (0, 0))
+        self.assertEqual(
+            [web for _, web in self.index.glob('foo', 'js')],
+            ['/foo/static/src/js/a.js', '/foo/static/src/js/b.js',
+             '//example.com/remote.js'])
+
+    def test_stat(self):
+        path = self.write('b.js', 'var b;', mtime=1000)
+        self.assertEqual(self.index.stat(path),
+                         (1000, 6, hashlib.sha1('var b;').hexdigest()))
+        with mock.patch.object(main, 'open', create=True) as m:
+            self.index.stat(path)
+            self.assertFalse(m.called, "unchanged files should not be read")
+
+        self.write('b.js', 'var bb;', mtime=1000)
+        self.assertEqual(self.index.stat(path),
+                         (1000, 7, hashlib.sha1('var bb;').hexdigest()))
+
+    def test_interval(self):
+        index = main.ManifestIndex(interval=3600)
+        path = self.write('b.js', 'var b;', mtime=1000)
+        index.stat(path)
+        self.write('b.js', 'var bb;', mtime=2000)
+        self.assertEqual(index.stat(path)[0], 1000)
+        index.invalidate(path)
+        self.assertEqual(index.stat(path)[0], 2000)
+
+    def test_watcher_poll(self):
+        watcher = main.AssetsWatcher(self.index, 'poll')
+        path = self.write('b.js', 'var b;', mtime=1000)
+        self.index.glob('foo', 'js')
+        self.index.stat(path)
+        self.index.interval = float('inf')
+
+        with mock.patch.object(watcher, 'changed', wraps=watcher.changed) as changed:
+            watcher.poll()
+            self.assertFalse(changed.called)
+
+            self.write('b.js', 'var bb;', mtime=2000)
+            self.assertEqual(self.index.stat(path)[0], 1000)
+            watcher.poll()
+            changed.assert_called_once_with(path)
+        self.assertEqual(self.index.stat(path)[0], 2000)
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+import mock
+import unittest2
+
+from openerp import http
+
+from ..controllers import main
+
+class TestManifestList(unittest2.TestCase):
+    def setUp(self):
+        def manifest_glob(extension, addons=None, db=None, include_remotes=False):
+            files = [('/fs/%s.js' % m, '/%s.js' % m) for m in addons.split(',')]
+            if 'remote' in addons.split(','):
+                files.append((None, '//example.com/remote.js'))
+            return files
+
+        patchers = [
+            mock.patch.dict(http.addons_manifest, {
+                'web': {},
+                'web_kanban': {'depends': ['web'], 'auto_install': True},
+                'web_kanban_gauge': {'depends': ['web_kanban'], 'auto_install': True},
+                'sale': {'depends': ['web']},
+                'sale_kanban': {'depends': ['sale', 'web_kanban'], 'auto_install': True},
+                'remote': {'depends': ['web']},
+            }, clear=True),
+            mock.patch.object(main, 'config', {}),
+            mock.patch.object(main.openerp.conf, 'server_wide_modules', ['web']),
+            mock.patch.object(main, 'manifest_glob', side_effect=manifest_glob),
+            mock.patch.object(main, 'bundle_checksum',
+                              side_effect=lambda paths, cache=None: '+'.join(p[4:-3] for p in paths)),
+            mock.patch.object(main, 'module_boot',
+                              return_value=['web', 'web_kanban', 'sale', 'sale_kanban']),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_base_modules(self):
+        self.assertEqual(main.bundle_base_modules(),
+                         set(['web', 'web_kanban', 'web_kanban_gauge']))
+
+    def test_configured_base_modules(self):
+        main.config['web_base_bundle_modules'] = 'web, sale'
+        self.assertEqual(main.bundle_base_modules(), set(['web', 'sale']))
+
+    def test_split(self):
+        self.assertEqual(main.manifest_list('js', db='db'), [
+            '/web/webclient/js/web+web_kanban?mods=web%2Cweb_kanban',
+            '/web/webclient/js/sale+sale_kanban?mods=sale%2Csale_kanban',
+        ])
+
+    def test_shared_base(self):
+        # databases with the same base modules share its bundle
+        self.assertEqual(
+            main.manifest_list('js', mods='web,web_kanban,sale')[0],
+            main.manifest_list('js', mods='web,web_kanban,remote')[0])
+
+    def test_single_part(self):
+        self.assertEqual(main.manifest_list('js', mods='sale'),
+                         ['/web/webclient/js/sale?mods=sale'])
+
+    def test_remotes(self):
+        self.assertEqual(main.manifest_list('js', mods='web,remote'), [
+            '/web/webclient/js/web?mods=web',
+            '/web/webclient/js/remote?mods=remote',
+            '//example.com/remote.js',
+        ])
+
+    def test_debug(self):
+        self.assertEqual(main.manifest_list('js', mods='web,sale', debug=True),
+                         ['/web.js', '/sale.js'])
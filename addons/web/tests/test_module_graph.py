@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+import contextlib
+
+import mock
+import unittest2
+
+from openerp import http
+
+from ..controllers import main
+
+class FakeModel(object):
+    def __init__(self, records):
+        self.records = records
+        self.reads = 0
+
+    def search(self, cr, uid, domain):
+        return [r['id'] for r in self.records]
+
+    def read(self, cr, uid, ids, fields):
+        self.reads += 1
+        return [r for r in self.records if r['id'] in ids]
+
+class FakeRegistry(dict):
+    base_registry_signaling_sequence = 1
+
+    @contextlib.contextmanager
+    def cursor(self):
+        yield None
+
+class TestModuleGraphCache(unittest2.TestCase):
+    def setUp(self):
+        self.registry = self.make_registry()
+        self.patchers = [
+            mock.patch.dict(http.addons_manifest, dict.fromkeys(['web', 'a', 'b'], {})),
+            mock.patch.object(main.openerp.modules.registry, 'RegistryManager', create=True),
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+        main.openerp.modules.registry.RegistryManager.get.side_effect = lambda db: self.registry
+        self.cache = main.ModuleGraphCache()
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+
+    def make_registry(self):
+        return FakeRegistry({
+            'ir.module.module': FakeModel([
+                {'id': 1, 'name': 'b'}, {'id': 2, 'name': 'a'}, {'id': 3, 'name': 'web'}]),
+            'ir.module.module.dependency': FakeModel([
+                {'id': 1, 'name': 'a', 'module_id': (1, 'B')},
+                {'id': 2, 'name': 'web', 'module_id': (1, 'B')},
+                {'id': 3, 'name': 'web', 'module_id': (2, 'A')}]),
+        })
+
+    def test_sorted(self):
+        self.assertEqual(self.cache.get('db'), ['web', 'a', 'b'])
+        # a single read of the dependencies
+        self.assertEqual(self.registry['ir.module.module.dependency'].reads, 1)
+
+    def test_cached(self):
+        self.cache.get('db')
+        self.cache.get('db')
+        self.assertEqual(self.registry['ir.module.module'].reads, 1)
+
+    def test_registry_change(self):
+        self.cache.get('db')
+        # new registry, e.g. after a module installation
+        self.registry = self.make_registry()
+        self.cache.get('db')
+        self.assertEqual(self.registry['ir.module.module'].reads, 1)
+
+        self.registry.base_registry_signaling_sequence = 2
+        self.cache.get('db')
+        self.assertEqual(self.registry['ir.module.module'].reads, 2)
+
+    def test_error(self):
+        read = self.registry['ir.module.module'].read
+        self.registry['ir.module.module'].read = mock.Mock(side_effect=Exception('database error'))
+        self.assertRaises(Exception, self.cache.get, 'db')
+        self.assertEqual(main.module_installed_bypass_session('other'), [])
+        # nothing cached in the meantime
+        self.registry['ir.module.module'].read = read
+        self.assertEqual(self.cache.get('db'), ['web', 'a', 'b'])
+
+    def test_addons_change(self):
+        self.cache.get('db')
+        # e.g. addons loaded after a first request
+        http.addons_manifest['c'] = {}
+        self.cache.get('db')
+        self.assertEqual(self.registry['ir.module.module'].reads, 2)
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
+
+import mock
+import unittest2
+
+from openerp import http
+
+from . import common
+
+from ..controllers import main
+
+class TestStaticFileCache(unittest2.TestCase):
+    def setUp(self):
+        self.addons_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.addons_path)
+        self.static = os.path.join(self.addons_path, 'foo', 'static', 'src', 'xml')
+        os.makedirs(self.static)
+        patcher = mock.patch.dict(http.addons_manifest, {'foo': {'addons_path': self.addons_path}})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = main.StaticFileCache(max_bytes=10)
+
+    def write(self, name, content, mtime):
+        path = os.path.join(self.static, name)
+        with open(path, 'wb') as fp:
+            fp.write(content)
+        os.utime(path, (mtime, mtime))
+
+    def test_get(self):
+        self.write('a.xml', '<a/>', 1000)
+        self.assertEqual(self.cache.get('/foo/static/src/xml/a.xml'), '<a/>')
+        self.assertEqual(self.cache.size, 4)
+
+        with mock.patch('__builtin__.open') as open_:
+            self.assertEqual(self.cache.get('/foo/static/src/xml/a.xml'), '<a/>')
+            self.assertFalse(open_.called)
+
+    def test_modified(self):
+        self.write('a.xml', '<a/>', 1000)
+        self.cache.get('/foo/static/src/xml/a.xml')
+        self.write('a.xml', '<b/>', 2000)
+        self.assertEqual(self.cache.get('/foo/static/src/xml/a.xml'), '<b/>')
+        self.assertEqual(self.cache.size, 4)
+
+    def test_bounded(self):
+        self.write('a.xml', '<a/>', 1000)
+        self.write('b.xml', '<bb/>', 1000)
+        self.write('c.xml', '<c/>', 1000)
+        self.write('big.xml', '<big-file/>', 1000)
+        for name in ['a', 'b', 'c', 'big']:
+            self.cache.get('/foo/static/src/xml/%s.xml' % name)
+        self.assertEqual(self.cache.size, 9)
+        # too big to be kept, but still served
+        self.assertEqual(self.cache.get('/foo/static/src/xml/big.xml'), '<big-file/>')
+
+    def test_not_static(self):
+        self.assertIsNone(self.cache.get('/foo/static/src/xml/missing.xml'))
+        self.assertIsNone(self.cache.get('/foo/static/../../foo/__openerp__.py'))
+        self.assertIsNone(self.cache.get('/foo/controllers/main.py'))
+        self.assertIsNone(self.cache.get('/web/webclient/qweb'))
+        self.assertIsNone(self.cache.get('//example.com/foo/static/a.xml'))
+
+class TestProxyLoad(common.MockRequestCase):
+    def test_fallback(self):
+        with mock.patch.object(main, 'static_file_cache') as cache, \
+                mock.patch('werkzeug.test.Client') as Client:
+            cache.get.return_value = None
+            Client.return_value.get.return_value.data = 'dynamic'
+            self.assertEqual(main.Proxy().load('/web/webclient/qweb'), 'dynamic')
+
+            cache.get.return_value = 'static'
+            self.assertEqual(main.Proxy().load('/foo/static/a.xml'), 'static')
+            self.assertEqual(Client.call_count, 1)
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+import re
+
+import unittest2
+
+from ..controllers import qweb
+
+def xml(node):
+    return re.sub(r'>\s+<', '><', node.to_xml()).strip()
+
+class TestSelect(unittest2.TestCase):
+    def setUp(self):
+        self.root = qweb.parse(
+            '<t><ul class="a b"><li>1</li><li id="x">2</li></ul>'
+            '<hr/><p><hr title="y"/></p><hr/></t>')
+
+    def select(self, selector):
+        return [xml(n) for n in qweb.select(selector, self.root)]
+
+    def test_simple(self):
+        self.assertEqual(self.select('li'), ['<li>1</li>', '<li id="x">2</li>'])
+        self.assertEqual(self.select('ul.b li#x'), ['<li id="x">2</li>'])
+        self.assertEqual(self.select('hr[title="y"]'), ['<hr title="y"/>'])
+        self.assertEqual(self.select('ul li:first-child'), ['<li>1</li>'])
+        self.assertEqual(self.select('.c'), [])
+
+    def test_positional(self):
+        self.assertEqual(self.select('hr:first'), ['<hr/>'])
+        self.assertEqual(self.select('hr:eq(1)'), ['<hr title="y"/>'])
+        self.assertEqual(self.select('> hr:last'), ['<hr/>'])
+        self.assertEqual(self.select('> :last'), ['<hr/>'])
+        self.assertEqual(len(self.select('t > hr')), 0)
+
+    def test_unsupported(self):
+        for selector in ['li:not(.a)', 'li:first span', 'a, b', 'li + li']:
+            with self.assertRaises(qweb.QWebUnsupported):
+                qweb.select(selector, self.root)
+
+class TestPrecompile(unittest2.TestCase):
+    def test_extend(self):
+        template = qweb.parse('<t t-name="e"><ul><li>one</li></ul></t>')
+        for extension in [
+                '<t t-extend="e"><t t-jquery="ul" t-operation="append"><li>3</li></t></t>',
+                '<t t-extend="e"><t t-jquery="ul li:first-child" t-operation="replace"><li>2</li></t></t>',
+                '<t t-extend="e"><t t-jquery="ul" t-operation="prepend"><li>1</li></t>'
+                '<t t-jquery="ul" t-operation="before"><hr/></t>'
+                '<t t-jquery="ul" t-operation="after"><hr/></t></t>',
+                '<t t-extend="e"><t t-jquery="hr:eq(1)" t-operation="replace"><footer/></t></t>',
+                '<t t-extend="e"><t t-jquery="footer" t-operation="inner"><b>end</b></t></t>']:
+            qweb.extend(template, qweb.parse(extension))
+        self.assertEqual(
+            xml(template),
+            '<t t-name="e"><hr/><ul><li>1</li><li>2</li><li>3</li></ul>'
+            '<footer><b>end</b></footer></t>')
+
+        with self.assertRaises(qweb.QWebUnsupported):
+            qweb.extend(template, qweb.parse(
+                '<t t-extend="e"><t t-jquery="ul">this.attr("class", "main");</t></t>'))
+
+    def test_format_expression(self):
+        self.assertEqual(qweb.format_expression("a and b.c(d) or 'e f'"),
+                         "dict['a'] && dict['b'].c(dict['d']) || 'e f'")
+        self.assertEqual(qweb.string_interpolation("x-#{a}-y"),
+                         "'x-' + (dict['a']) + '-y'")
+
+    def test_compile(self):
+        code = qweb.compile_template(qweb.parse(
+            '<t t-name="a"><div title="Hi" t-att-id="x">\n  Hello\n</div></t>'))
+        self.assertIn("r.push('<div');", code)
+        self.assertIn("r.push(context.engine.tools.gen_attribute(['title', _t('Hi')]));", code)
+        self.assertIn("r.push(context.engine.tools.gen_attribute(['id', (dict['x'])]));", code)
+        self.assertIn("r.push('\\n  ' + _t('Hello') + '\\n');", code)
+
+        with self.assertRaises(qweb.QWebUnsupported):
+            qweb.compile_template(qweb.parse('<t t-name="b"><t t-js="d">d.a = 1;</t></t>'))
+
+    def test_precompile(self):
+        code = qweb.precompile([
+            '<templates><t t-name="a"><p>a</p></t>'
+            '<t t-name="b"><t t-js="d">d.a = 1;</t></t></templates>',
+            '<templates><t t-extend="a"><t t-jquery="p" t-operation="append">!</t></t>'
+            '<t t-extend="other"><t t-jquery="p" t-operation="append">!</t></t></templates>',
+        ])
+        self.assertTrue(code.startswith('(function () {'))
+        # extended and compiled
+        self.assertIn(r'"a": [function(dict) {', code)
+        self.assertIn(r'"<t t-name=\"a\"><p>a!</p></t>"]', code)
+        # left to the client
+        self.assertIn(r'"b": [null, "<t t-name=\"b\"><t t-js=\"d\">d.a = 1;</t></t>", []]', code)
+        self.assertIn(r'<templates><t t-extend=\"other\">', code)
+
+    def test_precompile_unsupported_extended(self):
+        code = qweb.precompile([
+            '<templates><t t-name="b"><t t-js="d">d.a = 1;</t><p/></t></templates>',
+            '<templates><t t-extend="b"><t t-jquery="p" t-operation="append">!</t></t></templates>',
+        ])
+        # the extension is left to the client along with the template
+        self.assertIn(r'"b": [null, "<t t-name=\"b\"><t t-js=\"d\">d.a = 1;</t><p/></t>", '
+                      r'["<t t-extend=\"b\"><t t-jquery=\"p\" t-operation=\"append\">!</t></t>"]]',
+                      code)
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
+
+import mock
+import unittest2
+from werkzeug.test import EnvironBuilder
+from werkzeug.wrappers import Request, Response
+
+from openerp.http import request as req
+
+from . import common
+
+from ..controllers import main
+
+class FakeRegistry(object):
+    db_name = 'db'
+    base_cache_signaling_sequence = 1
+    _any_cache_cleared = False
+
+class TestRegistryCache(unittest2.TestCase):
+    def setUp(self):
+        self.registry = FakeRegistry()
+        self.cache = main.RegistryCache(max_entries=2)
+        self.builds = 0
+
+    def build(self):
+        self.builds += 1
+        return {'modules': {'web': {'messages': []}}, 'lang_parameters': None}
+
+    def get(self, lang='fr_FR', mods=('web', 'base')):
+        return self.cache.get(self.registry, (lang, mods), self.build)
+
+    def test_cached(self):
+        checksum, bundle = self.get()
+        self.assertEqual(self.get(), (checksum, bundle))
+        self.assertEqual(self.builds, 1)
+        self.get(lang='en_US')
+        self.assertEqual(self.builds, 2)
+
+    def test_signaling(self):
+        self.get()
+        self.registry.base_cache_signaling_sequence = 2
+        self.get()
+        self.assertEqual(self.builds, 2)
+
+    def test_cleared(self):
+        self.get()
+        self.registry._any_cache_cleared = True
+        self.get()
+        self.get()
+        self.assertEqual(self.builds, 3)
+
+    def test_new_registry(self):
+        self.get()
+        self.registry = FakeRegistry()
+        self.get()
+        self.assertEqual(self.builds, 2)
+
+    def test_lru(self):
+        self.get(lang='a')
+        self.get(lang='b')
+        self.get(lang='a')
+        self.get(lang='c')
+        self.get(lang='a')
+        self.assertEqual(self.builds, 3)
+        self.get(lang='b')
+        self.assertEqual(self.builds, 4)
+
+    def test_invalidate(self):
+        self.get()
+        self.cache.invalidate('other')
+        self.get()
+        self.cache.invalidate('db')
+        self.get()
+        self.assertEqual(self.builds, 2)
+
+class TestTranslationsRoute(common.MockRequestCase):
+    def setUp(self):
+        super(TestTranslationsRoute, self).setUp()
+        req.make_response = lambda content, headers=None: Response(content, headers=headers)
+        req.context = {'lang': 'fr_FR'}
+        self.bundle = {'modules': {}, 'lang_parameters': None}
+        patchers = [
+            mock.patch.object(main, 'translations_cache', main.RegistryCache()),
+            mock.patch.object(main, 'translations_bundle', side_effect=lambda *a: self.bundle),
+            mock.patch.object(main, 'bundle_cache', main.BundleCache()),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        req.registry = FakeRegistry()
+
+    def get(self, key, headers=None):
+        req.httprequest = Request(EnvironBuilder(
+            path='/web/webclient/translations/' + key,
+            headers=headers or {}).get_environ())
+        return main.WebClient().translations_get(key)
+
+    def test_modules_order(self):
+        self.assertEqual(main.WebClient().translations_entry(['web', 'base'], 'fr_FR'),
+                         main.WebClient().translations_entry(['base', 'web'], 'fr_FR'))
+        self.assertEqual(main.translations_bundle.call_count, 1)
+
+    def test_url(self):
+        url = main.WebClient().translations_url(mods=['web', 'base'])
+        # the modules are not part of the url
+        self.assertRegexpMatches(url, r'^/web/webclient/translations/[0-9a-f]{40}$')
+        self.assertEqual(main.WebClient().translations_url(mods=['base', 'web'], lang='fr_FR'), url)
+        self.assertNotEqual(main.WebClient().translations_url(mods=['web'], lang='fr_FR'), url)
+        self.assertNotEqual(main.WebClient().translations_url(mods=['web', 'base'], lang='de_DE'), url)
+
+    def test_cacheable(self):
+        key = main.WebClient().translations_url(mods=['web', 'base']).rsplit('/', 1)[1]
+        response = self.get(key)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(main.simplejson.loads(response.data), self.bundle)
+        self.assertEqual(response.headers['Cache-Control'],
+                         'private, max-age=%d, immutable' % main.BUNDLE_MAX_AGE)
+        self.assertEqual(response.get_etag(), (key, False))
+
+        response = self.get(key, headers={'If-None-Match': '"%s"' % key})
+        self.assertEqual(response.status_code, 304)
+
+    def test_stale(self):
+        key = main.WebClient().translations_url(mods=['web', 'base']).rsplit('/', 1)[1]
+        # the translations were updated since the url was generated
+        main.translations_cache.invalidate()
+        self.bundle = {'modules': {'web': {'messages': []}}, 'lang_parameters': None}
+
+        response = self.get(key)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(main.simplejson.loads(response.data), self.bundle)
+        self.assertIn('private', response.headers['Cache-Control'])
+        self.assertNotIn('immutable', response.headers['Cache-Control'])
+
+    def test_unknown(self):
+        req.not_found.return_value = Response(status=404)
+        self.assertEqual(self.get('0' * 40).status_code, 404)
+        self.assertEqual(self.get('../' + '0' * 40).status_code, 404)
+        self.assertFalse(main.translations_bundle.called)
+
+class TestLocalTranslations(unittest2.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.path = os.path.join(self.dir, 'fr.po')
+        self.write('Bonjour', 1000)
+
+    def write(self, string, mtime):
+        with open(self.path, 'w') as f:
+            f.write('#. openerp-web\nmsgid "Hello"\nmsgstr "%s"\n' % string)
+        os.utime(self.path, (mtime, mtime))
+
+    def test_parsed_once(self):
+        with mock.patch.object(main.babel.messages.pofile, 'read_po',
+                               wraps=main.babel.messages.pofile.read_po) as read_po:
+            messages = main._local_web_translations(self.path)
+            self.assertEqual(messages, [{'id': 'Hello', 'string': 'Bonjour'}])
+            main._local_web_translations(self.path)
+            self.assertEqual(read_po.call_count, 1)
+
+            self.write('Salut', 2000)
+            messages = main._local_web_translations(self.path)
+            self.assertEqual(messages, [{'id': 'Hello', 'string': 'Salut'}])
+            self.assertEqual(read_po.call_count, 2)
+
+    def test_missing(self):
+        self.assertIsNone(main._local_web_translations(self.path + '.missing'))
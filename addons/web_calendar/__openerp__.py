@@ -20,5 +20,8 @@ OpenERP Web Calendar view.
     'qweb': [
         'static/src/xml/*.xml',
     ],
-    'auto_install': True
+    'auto_install': True,
+    # loaded on first use of the view
+    'web_preload': False,
+    'web_views': {'calendar': 'Calendar'},
 }
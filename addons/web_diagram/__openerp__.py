@@ -22,4 +22,7 @@ Openerp Web Diagram view.
         'static/src/xml/*.xml',
     ],
     'auto_install': True,
+    # loaded on first use of the view
+    'web_preload': False,
+    'web_views': {'diagram': 'Diagram'},
 }
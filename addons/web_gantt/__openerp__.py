@@ -17,5 +17,8 @@ OpenERP Web Gantt chart view.
     'qweb': [
         'static/src/xml/*.xml',
     ],
-    'auto_install': True
+    'auto_install': True,
+    # loaded on first use of the view
+    'web_preload': False,
+    'web_views': {'gantt': 'Gantt'},
 }
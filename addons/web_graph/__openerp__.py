@@ -53,5 +53,8 @@ Graph Views for Web Client.
     'qweb' : [
         'static/src/xml/*.xml',
     ],
-    'auto_install': True
+    'auto_install': True,
+    # loaded on first use of the view
+    'web_preload': False,
+    'web_views': {'graph': 'Graph'},
 }